@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+import requests_mock
+from plexapi import utils
+from plexapi.server import PlexServer
+from tests.fakeserver import payloads
+from tests.fakeserver.fixtures import fakeplex, fakeserver  # noqa: F401
+
+BASEURL = 'http://plex.bench:32400'
+# Number of items in each synthetic section, ex: PLEXAPI_BENCHMARK_SIZES=1000,10000,100000
+SIZES = [int(size) for size in os.environ.get('PLEXAPI_BENCHMARK_SIZES', '1000,10000').split(',')]
+LIBTYPES = list(payloads.SECTIONS)
+# Rounds are scaled down for large sections so each benchmark handles about this many items
+ITEMS_PER_BENCHMARK = 5000
+# Number of items served by the mocked sections (set by the section fixture)
+TOTALS = {libtype: SIZES[0] for libtype in LIBTYPES}
+
+
+def rounds(size):
+    """ Returns the number of benchmark rounds to run for a section of the specified size. """
+    return max(1, ITEMS_PER_BENCHMARK // size)
+
+
+@pytest.fixture(scope='session', params=LIBTYPES)
+def libtype(request):
+    return request.param
+
+
+@pytest.fixture(scope='session', params=SIZES, ids=lambda size: '%sk' % (size // 1000) if size >= 1000 else str(size))
+def size(request):
+    return request.param
+
+
+@pytest.fixture(scope='session')
+def payload(libtype, size):
+    return payloads.buildSection(libtype, size)
+
+
+@pytest.fixture(scope='session')
+def plex():
+    """ PlexServer serving the synthetic sections from an in process requests_mock adapter.
+        Section pages honor X-Plex-Container-Start and X-Plex-Container-Size and are cached,
+        so building the payloads is not part of the measured time.
+    """
+    pages = {}
+
+    def _all(request, context):
+        key = int(request.path.split('/')[3])
+        libtype = next(libtype for libtype, s in payloads.SECTIONS.items() if s['key'] == key)
+        params = {k.lower(): v[0] for k, v in parse_qs(urlparse(request.url).query).items()}
+        total = TOTALS[libtype]
+        start = int(params.get('x-plex-container-start', 0))
+        size = int(params.get('x-plex-container-size', total))
+        page = (libtype, start, size, total)
+        if page not in pages:
+            pages[page] = payloads.buildSection(libtype, size, start, total)
+        return pages[page]
+
+    adapter = requests_mock.Adapter()
+    adapter.register_uri('GET', BASEURL + '/', content=b'<MediaContainer friendlyName="bench" machineIdentifier="bench"/>')
+    adapter.register_uri('GET', BASEURL + '/library', content=b'<MediaContainer identifier="com.plexapp.plugins.library"/>')
+    adapter.register_uri('GET', BASEURL + '/library/sections', content=payloads.buildSections())
+    adapter.register_uri('GET', re.compile(r'/library/sections/\d+/all'), content=_all)
+    session = requests.Session()
+    session.mount(BASEURL, adapter)
+    utils.loadPlexObjects()
+    return PlexServer(BASEURL, 'token', session=session)
+
+
+@pytest.fixture()
+def section(plex, libtype, size):
+    """ Library section of the mocked server holding `size` synthetic items. """
+    TOTALS[libtype] = size
+    return plex.library.section(payloads.SECTIONS[libtype]['title'])
+
+
+@pytest.fixture(scope='session')
+def fakeserver_size():
+    """ The fake server serves sections of the smallest benchmarked size. """
+    return SIZES[0]
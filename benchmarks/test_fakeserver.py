@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import plexapi
+import pytest
+from plexapi import utils
+
+from tests.fakeserver import payloads
+
+
+@pytest.mark.parametrize('method', ['sessions', 'monitor'])
+def test_fakeserver_sessions(benchmark, fakeplex, fakeserver, method):
+    # 50 concurrent streams: full objects from sessions() vs the fields diffed by the monitor
+    from plexapi.monitor import SessionMonitor
+    fakeserver.sessions = 50
+    try:
+        poll = fakeplex.sessions if method == 'sessions' else SessionMonitor(fakeplex).poll
+        assert len(benchmark(poll)) in (0, 50)
+    finally:
+        fakeserver.sessions = 2
+
+
+@pytest.mark.parametrize('method', ['history', 'analytics'])
+def test_fakeserver_history_analytics(benchmark, fakeplex, fakeserver, method):
+    # plays per user from history() objects vs the columns of WatchHistory
+    pytest.importorskip('numpy')
+    from collections import Counter
+    from plexapi.analytics import WatchHistory
+
+    def perUser():
+        if method == 'history':
+            return dict(Counter(item.accountID for item in fakeplex.history()))
+        return WatchHistory(fakeplex).plays('accountID')
+
+    plays = benchmark(perUser)
+    assert sum(plays.values()) == fakeserver.history
+
+
+def test_fakeserver_load(benchmark, fakeplex, fakeserver):
+    # fetch 200 items through the shared executor with 10ms of latency per request
+    fakeserver.latency = 0.01
+    keys = [payloads.ratingKey('photo', i) for i in range(min(fakeserver.sizes['photo'], 200))]
+    items = benchmark.pedantic(utils.parallel, args=(fakeplex.fetchItem, [(key,) for key in keys]), rounds=3)
+    assert [int(item.ratingKey) for item in items] == keys
+    benchmark.extra_info['max_workers'] = plexapi.MAX_WORKERS
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import tracemalloc
+from xml.etree import ElementTree
+
+from .conftest import rounds
+
+
+def test_parse(benchmark, payload, size):
+    data = benchmark.pedantic(ElementTree.fromstring, args=(payload,), rounds=rounds(size))
+    assert len(data) == size
+
+
+def test_findItems(benchmark, plex, payload, size):
+    data = ElementTree.fromstring(payload)
+    items = benchmark.pedantic(plex.findItems, args=(data,), rounds=rounds(size))
+    assert len(items) == size
+    # memory retained per built object (excluding the already parsed xml)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        items = plex.findItems(data)
+        benchmark.extra_info['bytes_per_item'] = (tracemalloc.get_traced_memory()[0] - before) // size
+    finally:
+        tracemalloc.stop()
+
+
+def test_loadData(benchmark, plex, payload, size):
+    data = ElementTree.fromstring(payload)
+    pairs = list(zip(plex.findItems(data), data))
+
+    def _loadData():
+        for item, elem in pairs:
+            item._loadData(elem)
+
+    benchmark.pedantic(_loadData, rounds=rounds(size))
+
+
+def test_checkAttrs(benchmark, plex, payload, size):
+    data = ElementTree.fromstring(payload)
+    filters = {'title__icontains': '7', 'year__gte': 1990, 'Genre__tag': 'Drama'}
+
+    def _filter():
+        return [elem for elem in data if plex._checkAttrs(elem, **filters)]
+
+    benchmark.pedantic(_filter, rounds=rounds(size))
+
+
+def test_buildItem(benchmark, plex):
+    # 100k small elements, so the time is dominated by the class lookup of _buildItem
+    tags = ['<Genre tag="Drama"/>', '<Role tag="Actor"/>', '<Stream id="1" streamType="1" codec="h264"/>',
+            '<Stream id="2" streamType="2" codec="aac"/>', '<Stream id="3" streamType="3" codec="srt"/>']
+    data = ElementTree.fromstring('<MediaContainer>%s</MediaContainer>' % ''.join(tags * 20000))
+
+    def _build():
+        return [plex._buildItem(elem) for elem in data]
+
+    items = benchmark.pedantic(_build, rounds=3)
+    assert len(items) == 100000
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from .conftest import rounds
+
+
+@pytest.mark.parametrize('container_size', [100, 1000])
+def test_search(benchmark, section, size, container_size):
+    items = benchmark.pedantic(section.search, kwargs={'container_size': container_size}, rounds=rounds(size))
+    assert len(items) == size
+    benchmark.extra_info['requests'] = -(-size // container_size)
+
+
+def test_search_maxresults(benchmark, section, size):
+    maxresults = size // 10
+    items = benchmark.pedantic(section.search, kwargs={'maxresults': maxresults}, rounds=rounds(size))
+    assert len(items) == maxresults
+
+
+def test_search_fields(benchmark, section, size):
+    # the same pages as test_search, only building the projected attributes and elements
+    items = benchmark.pedantic(section.search, kwargs={'container_size': 1000, 'fields': ['title', 'year']},
+                               rounds=rounds(size))
+    assert len(items) == size
+
+
+def test_toColumns(benchmark, section, size):
+    # the same pages as test_search, exported to columns without building objects
+    pytest.importorskip('numpy')
+    fields = ['ratingKey', 'title', 'addedAt', 'Media.bitrate', 'Part.size', 'Part.file']
+    columns = benchmark.pedantic(section.toColumns, args=(fields,), kwargs={'container_size': 1000},
+                                 rounds=rounds(size))
+    assert len(columns['ratingKey']) == size
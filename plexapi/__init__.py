@@ -1,9 +1,9 @@
 # -*- coding: utf-8 -*-
+import importlib
 import logging
 import os
-from logging.handlers import RotatingFileHandler
-from platform import uname
-from uuid import getnode
+import sys
+from types import ModuleType
 
 from plexapi.config import PlexConfig, reset_base_headers
 from plexapi.utils import SecretsFilter
@@ -18,18 +18,73 @@ PROJECT = 'PlexAPI'
 VERSION = '4.0.0'
 TIMEOUT = CONFIG.get('plexapi.timeout', 30, int)
 X_PLEX_CONTAINER_SIZE = CONFIG.get('plexapi.container_size', 100, int)
+MAX_WORKERS = CONFIG.get('plexapi.max_workers', 16, int)
 X_PLEX_ENABLE_FAST_CONNECT = CONFIG.get('plexapi.enable_fast_connect', False, bool)
+CONNECTION_CACHE_PATH = os.path.expanduser(CONFIG.get('plexapi.connection_cache_path',
+    os.path.join(os.path.dirname(CONFIG_PATH), 'connections.json')))
+CONNECTION_CACHE_TTL = CONFIG.get('plexapi.connection_cache_ttl', 86400, int)
+MYPLEX_CACHE_TTL = CONFIG.get('plexapi.myplex_cache_ttl', 300, int)
 
 # Plex Header Configuation
 X_PLEX_PROVIDES = CONFIG.get('header.provides', 'controller')
-X_PLEX_PLATFORM = CONFIG.get('header.platform', CONFIG.get('header.platorm', uname()[0]))
-X_PLEX_PLATFORM_VERSION = CONFIG.get('header.platform_version', uname()[2])
 X_PLEX_PRODUCT = CONFIG.get('header.product', PROJECT)
 X_PLEX_VERSION = CONFIG.get('header.version', VERSION)
-X_PLEX_DEVICE = CONFIG.get('header.device', X_PLEX_PLATFORM)
-X_PLEX_DEVICE_NAME = CONFIG.get('header.device_name', uname()[1])
-X_PLEX_IDENTIFIER = CONFIG.get('header.identifier', str(hex(getnode())))
-BASE_HEADERS = reset_base_headers()
+
+
+def _uname(index):
+    from platform import uname
+    return uname()[index]
+
+
+def _identifier():
+    from uuid import getnode
+    return str(hex(getnode()))
+
+
+# Headers probing the system are computed on first access (see _PlexAPIModule)
+_DEFERRED = {
+    'X_PLEX_PLATFORM': lambda: CONFIG.get('header.platform') or CONFIG.get('header.platorm') or _uname(0),
+    'X_PLEX_PLATFORM_VERSION': lambda: CONFIG.get('header.platform_version') or _uname(2),
+    'X_PLEX_DEVICE': lambda: CONFIG.get('header.device') or sys.modules[__name__].X_PLEX_PLATFORM,
+    'X_PLEX_DEVICE_NAME': lambda: CONFIG.get('header.device_name') or _uname(1),
+    'X_PLEX_IDENTIFIER': lambda: CONFIG.get('header.identifier') or _identifier(),
+    'BASE_HEADERS': reset_base_headers,
+}
+# Submodules are imported on first access, ex: `import plexapi; plexapi.server.PlexServer(..)`
+_SUBMODULES = ('alert', 'analytics', 'audio', 'base', 'cassette', 'client', 'config', 'downloads', 'exceptions', 'gdm',
+               'index', 'library', 'livetv', 'media', 'monitor', 'myplex', 'photo', 'playlist', 'playqueue',
+               'profiler', 'server', 'settings', 'sonos', 'sync', 'utils', 'video')
+
+
+class _PlexAPIModule(ModuleType):
+    """ Module type of the plexapi package computing the deferred header settings and
+        importing submodules on first access. Assigning a setting before it was first
+        accessed (ex: `plexapi.X_PLEX_IDENTIFIER = '..'`) skips probing the system.
+    """
+
+    def __getattr__(self, name):
+        if name in _DEFERRED:
+            value = _DEFERRED[name]()
+            setattr(self, name, value)
+            return value
+        if name in _SUBMODULES:
+            return importlib.import_module('%s.%s' % (__name__, name))
+        raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+
+sys.modules[__name__].__class__ = _PlexAPIModule
+
+
+def profile(cprofile=False):
+    """ Returns a :class:`~plexapi.profiler.Profile` context manager splitting the time spent
+        in PlexAPI between the network, XML parsing and building objects, per endpoint.
+
+        Parameters:
+            cprofile (bool): Also collect cProfile stacks of the build phase.
+    """
+    from plexapi.profiler import Profile
+    return Profile(cprofile=cprofile)
+
 
 # Logging Configuration
 log = logging.getLogger('plexapi')
@@ -41,6 +96,7 @@ loghandler = logging.NullHandler()
 if logfile:  # pragma: no cover
     logbackups = CONFIG.get('log.backup_count', 3, int)
     logbytes = CONFIG.get('log.rotate_bytes', 512000, int)
+    from logging.handlers import RotatingFileHandler
     loghandler = RotatingFileHandler(os.path.expanduser(logfile), 'a', logbytes, logbackups)
 
 loghandler.setFormatter(logging.Formatter(logformat))
@@ -1,8 +1,273 @@
 # -*- coding: utf-8 -*-
 import json
+import random
 import threading
+import time
+from collections import deque
 
-from plexapi import log
+from plexapi import log, utils
+from plexapi.exceptions import BadRequest, Unsupported
+
+LIBRARY_IDENTIFIER = 'com.plexapp.plugins.library'
+STATE_PROCESSED = 5
+STATE_DELETED = 9
+# AlertListener overflow policies
+DROP_OLDEST = 'dropOldest'
+COALESCE = 'coalesce'
+
+
+class AlertEvent(object):
+    """ Base class of the typed events built from the entries of the notifications received
+        by an :class:`~plexapi.alert.AlertListener`, see :func:`~plexapi.alert.alertEvents`.
+
+        Attributes:
+            TYPE (str): Type of the notifications holding these events.
+            KEY (str): Key of the entries in the notification.
+            data (dict): Raw notification entry.
+    """
+    TYPE = None
+    KEY = None
+
+    def __init__(self, data):
+        self.data = data
+        self._loadData(data)
+
+    def __repr__(self):
+        return '<%s>' % ':'.join(str(p) for p in [self.__class__.__name__, self.id, self.state] if p is not None)
+
+    def _loadData(self, data):
+        raise NotImplementedError('Abstract method not implemented.')
+
+    @property
+    def id(self):
+        """ Identifier of the item, activity or session the event is about. """
+        return None
+
+    @property
+    def state(self):
+        """ State of the item, activity or session, if the event reports one. """
+        return None
+
+
+class TimelineEntry(AlertEvent):
+    """ Library item processing progress (type `timeline`).
+
+        Attributes:
+            identifier (str): Plugin sending the entry, `com.plexapp.plugins.library` for items.
+            itemID (int): ratingKey of the item.
+            parentItemID (int): ratingKey of the parent item.
+            rootItemID (int): ratingKey of the root item (ex: the show of an episode).
+            sectionID (int): Key of the library section, -1 for items outside the library.
+            state (int): Processing state, see :class:`~plexapi.alert.AlertListener`.
+            type (int): Search type of the item, see :func:`~plexapi.utils.searchType`.
+            title (str): Title of the item.
+            metadataState (str): Metadata refresh state (ex: queued, processing).
+            mediaState (str): Media analysis state (ex: analyzing).
+            updatedAt (datetime): Datetime the item was updated.
+    """
+    TYPE = 'timeline'
+    KEY = 'TimelineEntry'
+
+    def _loadData(self, data):
+        self.identifier = data.get('identifier')
+        self.itemID = utils.cast(int, data.get('itemID'))
+        self.parentItemID = utils.cast(int, data.get('parentItemID'))
+        self.rootItemID = utils.cast(int, data.get('rootItemID'))
+        self.sectionID = utils.cast(int, data.get('sectionID'))
+        self._state = utils.cast(int, data.get('state'))
+        self.type = utils.cast(int, data.get('type'))
+        self.title = data.get('title')
+        self.metadataState = data.get('metadataState')
+        self.mediaState = data.get('mediaState')
+        self.updatedAt = utils.toDatetime(data.get('updatedAt'))
+
+    @property
+    def id(self):
+        return self.itemID
+
+    @property
+    def state(self):
+        return self._state
+
+
+class ActivityNotification(AlertEvent):
+    """ Progress of a server activity such as a library scan (type `activity`).
+
+        Attributes:
+            event (str): started, updated or ended.
+            uuid (str): Identifier of the activity.
+            type (str): Kind of activity (ex: library.update.section).
+            title (str): Title of the activity.
+            subtitle (str): Details of the current step.
+            progress (int): Progress percentage.
+            cancellable (bool): True if the activity can be cancelled.
+            userID (int): ID of the user who started the activity.
+            sectionID (int): Key of the library section the activity runs on, if any.
+    """
+    TYPE = 'activity'
+    KEY = 'ActivityNotification'
+
+    def _loadData(self, data):
+        activity = data.get('Activity') or {}
+        self.event = data.get('event')
+        self.uuid = data.get('uuid') or activity.get('uuid')
+        self.type = activity.get('type')
+        self.title = activity.get('title')
+        self.subtitle = activity.get('subtitle')
+        self.progress = utils.cast(int, activity.get('progress'))
+        self.cancellable = utils.cast(bool, activity.get('cancellable'))
+        self.userID = utils.cast(int, activity.get('userID'))
+        self.sectionID = utils.cast(int, (activity.get('Context') or {}).get('librarySectionID'))
+
+    @property
+    def id(self):
+        return self.uuid
+
+    @property
+    def state(self):
+        return self.event
+
+
+class PlaySessionStateNotification(AlertEvent):
+    """ State of a playback session (type `playing`).
+
+        Attributes:
+            sessionKey (str): Key of the session.
+            clientIdentifier (str): Identifier of the player.
+            ratingKey (int): ratingKey of the item being played.
+            key (str): API URL of the item being played.
+            guid (str): Guid of the item.
+            url (str): Url of the item.
+            viewOffset (int): Position of the playback in milliseconds.
+            playQueueItemID (int): ID of the item in the play queue.
+            state (str): playing, paused, buffering or stopped.
+            transcodeSession (str): Key of the transcode session, if any.
+    """
+    TYPE = 'playing'
+    KEY = 'PlaySessionStateNotification'
+
+    def _loadData(self, data):
+        self.sessionKey = data.get('sessionKey')
+        self.clientIdentifier = data.get('clientIdentifier')
+        self.ratingKey = utils.cast(int, data.get('ratingKey'))
+        self.key = data.get('key')
+        self.guid = data.get('guid')
+        self.url = data.get('url')
+        self.viewOffset = utils.cast(int, data.get('viewOffset'))
+        self.playQueueItemID = utils.cast(int, data.get('playQueueItemID'))
+        self._state = data.get('state')
+        self.transcodeSession = data.get('transcodeSession')
+
+    @property
+    def id(self):
+        return self.sessionKey
+
+    @property
+    def state(self):
+        return self._state
+
+
+class StatusNotification(AlertEvent):
+    """ Server status message, ex: a library scan finished (type `status`).
+
+        Attributes:
+            title (str): Title of the message.
+            description (str): Description of the message.
+            notificationName (str): Name of the notification (ex: LIBRARY_UPDATE).
+    """
+    TYPE = 'status'
+    KEY = 'StatusNotification'
+
+    def _loadData(self, data):
+        self.title = data.get('title')
+        self.description = data.get('description')
+        self.notificationName = data.get('notificationName')
+
+    @property
+    def id(self):
+        return self.notificationName
+
+
+# Event classes keyed by the notification type
+ALERTTYPES = {cls.TYPE: cls for cls in (TimelineEntry, ActivityNotification, PlaySessionStateNotification,
+                                        StatusNotification)}
+
+
+def alertEvents(data):
+    """ Returns the typed events (:class:`~plexapi.alert.AlertEvent`) of a notification
+        received by the :class:`~plexapi.alert.AlertListener`, an empty list for the
+        notification types without event class.
+
+        Parameters:
+            data (dict): NotificationContainer received from the server.
+    """
+    cls = ALERTTYPES.get(data.get('type'))
+    if cls is None:
+        return []
+    return [cls(entry) for entry in data.get(cls.KEY) or []]
+
+
+class AlertSubscription(object):
+    """ Typed events an :class:`~plexapi.alert.AlertListener` passes to a callback, created
+        with :func:`~plexapi.alert.AlertListener.subscribe`. The filters are evaluated on the
+        websocket thread, so the events not matching them are never queued.
+
+        Parameters:
+            callback (func): Function called with each matching event.
+            types (list): Event classes (or notification types) to receive, default all.
+            window (float): Seconds to collect the events before dispatching them, only the
+                latest event of each item, activity or session is dispatched (default 0).
+            **filters (dict): Values the event attributes must have, a list or tuple to allow
+                several values, ex: sectionID=1, state=(5, 9).
+
+        Attributes:
+            coalesced (int): Number of events replaced by a newer one within the window.
+    """
+
+    def __init__(self, callback, types=None, window=0, **filters):
+        self.callback = callback
+        self.types = tuple(ALERTTYPES[t] if isinstance(t, str) else t for t in types or ALERTTYPES.values())
+        self.window = window
+        self.filters = {k: tuple(v) if isinstance(v, (list, tuple, set)) else (v,) for k, v in filters.items()}
+        self.coalesced = 0
+        self._pending = {}
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def matches(self, event):
+        """ Returns True if the event is of a subscribed type and matches all the filters. """
+        return isinstance(event, self.types) and all(
+            getattr(event, attr, None) in values for attr, values in self.filters.items())
+
+    def _collect(self, event, push):
+        """ Keeps the event until the window expires, then calls push(events) with the
+            latest event of each item. Returns True if the event replaced an older one.
+        """
+        key = (event.__class__, event.id)
+        with self._lock:
+            replaced = key in self._pending
+            if replaced:
+                del self._pending[key]
+                self.coalesced += 1
+            self._pending[key] = event
+            if self._timer is None:
+                self._timer = threading.Timer(self.window, self._flush, (push,))
+                self._timer.daemon = True
+                self._timer.start()
+        return replaced
+
+    def _flush(self, push):
+        with self._lock:
+            events, self._pending, self._timer = list(self._pending.values()), {}, None
+        if events:
+            push(self, events)
+
+    def _cancel(self, push):
+        with self._lock:
+            timer = self._timer
+        if timer:
+            timer.cancel()
+        self._flush(push)
 
 
 class AlertListener(threading.Thread):
@@ -12,6 +277,18 @@ class AlertListener(threading.Thread):
         alerts you must call .start() on the object once it's created. When calling
         `PlexServer.startAlertListener()`, the thread will be started for you.
 
+        Besides the raw notifications passed to the callback, the listener dispatches typed
+        :class:`~plexapi.alert.AlertEvent` to the callbacks subscribed with
+        :func:`~plexapi.alert.AlertListener.subscribe`, ex: the processed items of a section::
+
+            listener = plex.startAlertListener()
+            listener.subscribe(print, [TimelineEntry], sectionID=1, state=5)
+
+        When the connection drops (ex: the server restarts), the listener reconnects after a
+        jittered exponential backoff until it is stopped. Received messages are queued and
+        the callback is called from a pool of dispatch threads, so a slow callback does not
+        stall the websocket. Messages are dispatched in order with a single worker only.
+
         Known `state`-values for timeline entries, with identifier=`com.plexapp.plugins.library`:
 
             :0: The item was created
@@ -29,15 +306,52 @@ class AlertListener(threading.Thread):
             callback (func): Callback function to call on received messages. The callback function
                 will be sent a single argument 'data' which will contain a dictionary of data
                 received from the server. :samp:`def my_callback(data): ...`
+            reconnect (bool): Reconnect when the connection drops (default True).
+            backoff (float): Seconds to wait before the first reconnect attempt, doubled on every
+                failed attempt (default 1).
+            maxBackoff (float): Max seconds to wait between reconnect attempts (default 60).
+            queueSize (int): Max number of messages waiting to be dispatched (default 1000).
+            workers (int): Number of threads calling the callback (default 1).
+            overflow (str): What to do with a new message when the queue is full: `dropOldest`
+                (default) drops the oldest queued message, `coalesce` replaces the queued message
+                about the same items (ex: the progress of an activity) and drops the oldest one
+                if there is none.
+            lateAfter (float): Messages dispatched more than this many seconds after they were
+                received are counted as late (default 5).
+
+        Attributes:
+            received (int): Number of messages received.
+            dispatched (int): Number of messages passed to the callback.
+            dropped (int): Number of messages dropped because the queue was full.
+            coalesced (int): Number of queued messages replaced by a newer one.
+            late (int): Number of messages dispatched after `lateAfter` seconds.
+            reconnects (int): Number of reconnect attempts.
     """
     key = '/:/websockets/notifications'
 
-    def __init__(self, server, callback=None):
+    def __init__(self, server, callback=None, reconnect=True, backoff=1, maxBackoff=60, queueSize=1000,
+                 workers=1, overflow=DROP_OLDEST, lateAfter=5):
         super(AlertListener, self).__init__()
+        if overflow not in (DROP_OLDEST, COALESCE):
+            raise BadRequest('Unknown overflow policy: %s' % overflow)
         self.daemon = True
         self._server = server
         self._callback = callback
         self._ws = None
+        self._reconnect = reconnect
+        self._backoff = backoff
+        self._maxBackoff = maxBackoff
+        self._queueSize = queueSize
+        self._numWorkers = workers
+        self._overflow = overflow
+        self._lateAfter = lateAfter
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._stopped = threading.Event()
+        self._connected = False
+        self._workers = []
+        self._subscriptions = []
+        self.received = self.dispatched = self.dropped = self.coalesced = self.late = self.reconnects = 0
 
     def run(self):
         try:
@@ -45,20 +359,146 @@ class AlertListener(threading.Thread):
         except ImportError:
             log.warning("Can't use the AlertListener without websocket")
             return
+        self._startWorkers()
         # create the websocket connection
         url = self._server.url(self.key, includeToken=True).replace('http', 'ws')
-        log.info('Starting AlertListener: %s', url)
-        self._ws = websocket.WebSocketApp(url, on_message=self._onMessage,
-                                          on_error=self._onError)
-        self._ws.run_forever()
+        attempts = 0
+        while not self._stopped.is_set():
+            log.info('Starting AlertListener: %s', url)
+            self._connected = False
+            self._ws = websocket.WebSocketApp(url, on_open=self._onOpen, on_message=self._onMessage,
+                                              on_error=self._onError)
+            self._ws.run_forever()
+            if self._stopped.is_set() or not self._reconnect:
+                break
+            attempts = 0 if self._connected else attempts + 1
+            delay = min(self._maxBackoff, self._backoff * 2 ** attempts) * random.uniform(0.5, 1)
+            log.warning('AlertListener disconnected, reconnecting in %.1fs', delay)
+            self._stopped.wait(delay)
+            self.reconnects += 1
+        # the workers return once the queue is empty and the listener is stopped
+        self._stopped.set()
+        self._stopWorkers()
 
     def stop(self):
         """ Stop the AlertListener thread. Once the notifier is stopped, it cannot be directly
             started again. You must call :func:`plexapi.server.PlexServer.startAlertListener()`
-            from a PlexServer instance.
+            from a PlexServer instance. The messages already received are still dispatched.
         """
         log.info('Stopping AlertListener.')
-        self._ws.close()
+        for subscription in list(self._subscriptions):
+            subscription._cancel(self._push)
+        self._stopped.set()
+        if self._ws:
+            self._ws.close()
+        self._stopWorkers()
+
+    def subscribe(self, callback, types=None, window=0, **filters):
+        """ Calls callback with the typed events matching the types and filters, see
+            :class:`~plexapi.alert.AlertSubscription` for the parameters. Returns the
+            subscription, to pass to :func:`~plexapi.alert.AlertListener.unsubscribe`.
+        """
+        subscription = AlertSubscription(callback, types, window, **filters)
+        with self._cond:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """ Stops calling the callback of the subscription. """
+        with self._cond:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    @property
+    def pending(self):
+        """ Number of messages waiting to be dispatched. """
+        return len(self._queue)
+
+    def _startWorkers(self):
+        for num in range(self._numWorkers):
+            worker = threading.Thread(target=self._dispatch, name='AlertListener-%s' % num)
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def _stopWorkers(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def _dispatch(self):
+        """ Worker loop passing the queued messages to the callback until the listener is
+            stopped and the queue is empty.
+        """
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopped.is_set():
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                received, callback, data = self._queue.popleft()
+                if time.time() - received > self._lateAfter:
+                    self.late += 1
+            try:
+                callback(data)
+            except Exception as err:
+                log.error('AlertListener Callback Error: %s', err)
+            with self._cond:
+                self.dispatched += 1
+
+    def _enqueue(self, data):
+        """ Queues the notification for the callback and its typed events for the matching
+            subscriptions (or collects them until their window expires).
+        """
+        with self._cond:
+            self.received += 1
+            subscriptions = list(self._subscriptions)
+            if self._callback is not None:
+                self._put(time.time(), self._callback, data)
+        if not subscriptions:
+            return
+        for event in alertEvents(data):
+            for subscription in subscriptions:
+                if not subscription.matches(event):
+                    continue
+                if subscription.window > 0:
+                    subscription._collect(event, self._push)
+                else:
+                    self._push(subscription, [event])
+
+    def _push(self, subscription, events):
+        with self._cond:
+            received = time.time()
+            for event in events:
+                self._put(received, subscription.callback, event)
+
+    def _put(self, received, callback, data):
+        """ Adds a message to the queue, applying the overflow policy if it is full.
+            Must be called holding self._cond.
+        """
+        if len(self._queue) >= self._queueSize:
+            if self._overflow == COALESCE and self._coalesce(callback, data):
+                return
+            self._queue.popleft()
+            self.dropped += 1
+        self._queue.append((received, callback, data))
+        self._cond.notify()
+
+    def _coalesce(self, callback, data):
+        """ Replaces the queued message for the callback about the same items as data,
+            keeping its position. Returns False if there is none.
+        """
+        key = _coalesceKey(data)
+        if key is None:
+            return False
+        for i, (received, queuedCallback, queued) in enumerate(self._queue):
+            if queuedCallback == callback and _coalesceKey(queued) == key:
+                self._queue[i] = (received, callback, data)
+                self.coalesced += 1
+                return True
+        return False
+
+    def _onOpen(self, *args):
+        self._connected = True
 
     def _onMessage(self, *args):
         """ Called when websocket message is received.
@@ -71,8 +511,7 @@ class AlertListener(threading.Thread):
         try:
             data = json.loads(message)['NotificationContainer']
             log.debug('Alert: %s %s %s', *data)
-            if self._callback:
-                self._callback(data)
+            self._enqueue(data)
         except Exception as err:  # pragma: no cover
             log.error('AlertListener Msg Error: %s', err)
 
@@ -85,3 +524,252 @@ class AlertListener(threading.Thread):
         """
         err = args[-1]
         log.error('AlertListener Error: %s' % err)
+
+
+class AlertStream(object):
+    """ Asynchronous iterator over the notifications of a PlexServer, the asyncio
+        counterpart of the :class:`~plexapi.alert.AlertListener` returned by
+        :func:`~plexapi.server.PlexServer.alerts`::
+
+            async with plex.alerts([TimelineEntry], state=5) as alerts:
+                async for entry in alerts:
+                    print(entry.itemID)
+
+        The websocket is read by a task of the running event loop, so many servers can be
+        listened to from a single thread. The events wait in a bounded asyncio.Queue; once
+        it is full the websocket is no longer read until the consumer catches up. The
+        connection is reopened after a jittered exponential backoff when it drops.
+
+        NOTE: You need websockets installed in order to use this feature.
+        >> pip install websockets
+
+        Parameters:
+            server (:class:`~plexapi.server.PlexServer`): PlexServer to listen to.
+            types (list): Event classes (or notification types) to yield, default all.
+            raw (bool): Yield the NotificationContainer dicts instead of typed events.
+            reconnect (bool): Reconnect when the connection drops (default True).
+            backoff (float): Seconds to wait before the first reconnect attempt (default 1).
+            maxBackoff (float): Max seconds to wait between reconnect attempts (default 60).
+            queueSize (int): Max number of events waiting to be consumed (default 1000).
+            **filters (dict): Values the event attributes must have, see
+                :class:`~plexapi.alert.AlertSubscription`.
+
+        Attributes:
+            received (int): Number of messages received.
+            reconnects (int): Number of reconnect attempts.
+    """
+    key = '/:/websockets/notifications'
+
+    def __init__(self, server, types=None, raw=False, reconnect=True, backoff=1, maxBackoff=60, queueSize=1000,
+                 **filters):
+        self._server = server
+        self._subscription = None if raw else AlertSubscription(None, types, **filters)
+        self._reconnect = reconnect
+        self._backoff = backoff
+        self._maxBackoff = maxBackoff
+        self._queueSize = queueSize
+        self._queue = None
+        self._task = None
+        self._closed = False
+        self._buffered = []  # events taken from the queue by a cancelled __anext__
+        self.received = self.reconnects = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        import asyncio
+        self._start()
+        if self._buffered:
+            return self._buffered.pop(0)
+        while self._queue.empty() and not self._task.done():
+            getter = asyncio.ensure_future(self._queue.get())
+            try:
+                await asyncio.wait([getter, self._task], return_when=asyncio.FIRST_COMPLETED)
+            except BaseException:
+                # the caller was cancelled (ex: asyncio.wait_for), the getter must not consume
+                # the next event in the background; keep it for the next call if it already did
+                if getter.done() and not getter.cancelled():
+                    self._buffered.append(getter.result())
+                getter.cancel()
+                raise
+            if getter.done():
+                return getter.result()
+            getter.cancel()
+        if not self._queue.empty():
+            return self._queue.get_nowait()
+        if not self._task.cancelled() and self._task.exception():
+            raise self._task.exception()
+        raise StopAsyncIteration
+
+    async def __aenter__(self):
+        self._start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        """ Closes the websocket and stops the iteration once the queued events are consumed. """
+        import asyncio
+        self._closed = True
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def _start(self):
+        import asyncio
+        if self._task is None:
+            self._queue = asyncio.Queue(self._queueSize)
+            self._task = asyncio.ensure_future(self._read())
+
+    async def _read(self):
+        import asyncio
+        try:
+            import websockets
+        except ImportError:
+            raise Unsupported("Can't use the AlertStream without websockets")
+        url = self._server.url(self.key, includeToken=True).replace('http', 'ws')
+        attempts = 0
+        while not self._closed:
+            log.info('Starting AlertStream: %s', url)
+            connected = False
+            try:
+                async with websockets.connect(url, max_size=None) as ws:
+                    connected = True
+                    async for message in ws:
+                        self.received += 1
+                        data = json.loads(message)['NotificationContainer']
+                        for event in self._events(data):
+                            await self._queue.put(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                log.error('AlertStream Error: %s', err)
+            if self._closed or not self._reconnect:
+                return
+            attempts = 0 if connected else attempts + 1
+            delay = min(self._maxBackoff, self._backoff * 2 ** attempts) * random.uniform(0.5, 1)
+            log.warning('AlertStream disconnected, reconnecting in %.1fs', delay)
+            await asyncio.sleep(delay)
+            self.reconnects += 1
+
+    def _events(self, data):
+        if self._subscription is None:
+            return [data]
+        return [event for event in alertEvents(data) if self._subscription.matches(event)]
+
+
+class AlertInvalidator(object):
+    """ AlertListener callback translating the library `timeline` notifications into
+        invalidations of the caches attached to a :class:`~plexapi.server.PlexServer`,
+        such as a :class:`~plexapi.index.LibraryIndex`::
+
+            index = LibraryIndex(plex)
+            invalidator = AlertInvalidator(plex, index)
+            plex.startAlertListener(invalidator)
+
+        Items reaching state 5 (processed) are reported as updated and items reaching
+        state 9 (deleted) as deleted. The entries received within `delay` seconds are
+        coalesced, so a library scan results in a few batched invalidations instead of
+        one per entry. Each target must implement `invalidate(updated, deleted)`, both
+        arguments being dicts of {ratingKey (int): sectionID (int)}.
+
+        Parameters:
+            server (:class:`~plexapi.server.PlexServer`): Server the notifications come from.
+            *targets: Objects to invalidate, see :func:`~plexapi.alert.AlertInvalidator.attach`.
+            callback (func): Callback also receiving every notification (optional).
+            delay (float): Seconds to collect entries before invalidating the targets,
+                0 invalidates them on every notification (default 0.5).
+    """
+
+    def __init__(self, server, *targets, callback=None, delay=0.5):
+        self._server = server
+        self._targets = list(targets)
+        self._callback = callback
+        self._delay = delay
+        self._updated = {}
+        self._deleted = {}
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def __call__(self, data):
+        if self._callback:
+            self._callback(data)
+        if data.get('type') != TimelineEntry.TYPE:
+            return
+        found = False
+        with self._lock:
+            for entry in alertEvents(data):
+                if entry.identifier not in (None, LIBRARY_IDENTIFIER) or entry.itemID is None:
+                    continue
+                if entry.state == STATE_DELETED:
+                    self._updated.pop(entry.itemID, None)
+                    self._deleted[entry.itemID] = entry.sectionID
+                elif entry.state == STATE_PROCESSED:
+                    self._deleted.pop(entry.itemID, None)
+                    self._updated[entry.itemID] = entry.sectionID
+                else:
+                    continue
+                found = True
+            if found and self._delay > 0 and self._timer is None:
+                self._timer = threading.Timer(self._delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if found and self._delay <= 0:
+            self.flush()
+
+    def attach(self, target):
+        """ Adds a target to invalidate, an object with an `invalidate(updated, deleted)` method. """
+        with self._lock:
+            if target not in self._targets:
+                self._targets.append(target)
+
+    def detach(self, target):
+        """ Removes a target added with :func:`~plexapi.alert.AlertInvalidator.attach`. """
+        with self._lock:
+            if target in self._targets:
+                self._targets.remove(target)
+
+    def flush(self):
+        """ Invalidates the targets with the entries collected so far. Returns the number
+            of updated and deleted items.
+        """
+        with self._lock:
+            updated, deleted, targets = self._updated, self._deleted, list(self._targets)
+            self._updated, self._deleted, self._timer = {}, {}, None
+        if not updated and not deleted:
+            return 0
+        log.debug('Invalidating %s updated and %s deleted items', len(updated), len(deleted))
+        for target in targets:
+            try:
+                target.invalidate(updated, deleted)
+            except Exception as err:
+                log.error('Failed to invalidate %s: %s', target, err)
+        return len(updated) + len(deleted)
+
+    def stop(self):
+        """ Cancels the pending timer and invalidates the targets with the collected entries. """
+        with self._lock:
+            timer = self._timer
+        if timer:
+            timer.cancel()
+        self.flush()
+
+
+def _coalesceKey(data):
+    """ Returns the (type, ids) of the items a notification or event is about, None if unknown. """
+    if isinstance(data, AlertEvent):
+        return (data.TYPE, (data.id,)) if data.id is not None else None
+    ids = []
+    for name, entries in data.items():
+        if isinstance(entries, list):
+            for entry in entries:
+                entryid = entry.get('itemID') or entry.get('uuid') or entry.get('sessionKey')
+                if entryid is None:
+                    return None
+                ids.append(entryid)
+    return (data.get('type'), tuple(ids)) if ids else None
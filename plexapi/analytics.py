@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+from array import array
+
+from plexapi import X_PLEX_CONTAINER_SIZE, log, utils
+from plexapi.exceptions import BadRequest, Unsupported
+
+# History columns: (name, array typecode, XML attribute)
+COLUMNS = (
+    ('viewedAt', 'q', 'viewedAt'),
+    ('accountID', 'q', 'accountID'),
+    ('ratingKey', 'q', 'ratingKey'),
+    ('librarySectionID', 'q', 'librarySectionID'),
+    ('duration', 'q', 'duration'),
+)
+# Keys computed from viewedAt for the group-by aggregations
+TIMEKEYS = ('day', 'hour', 'weekday')
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise Unsupported("Can't use the history analytics without numpy")
+    return numpy
+
+
+class WatchHistory(object):
+    """ Watched history of a PlexServer loaded into columnar NumPy arrays, with vectorized
+        group-by aggregations for the analytics of large histories::
+
+            history = WatchHistory(plex, mindate=datetime.now() - timedelta(days=365))
+            history.plays('accountID')      # {accountID: number of plays}
+            history.watchTime('day')        # {date: seconds watched}
+            history.topTitles(10)
+
+        The history pages are read straight from the XML into typed arrays, without building
+        a PlexAPI object per play. Missing values (ex: the ratingKey of deleted items or the
+        duration of the plays of some clients) are stored as 0.
+
+        NOTE: You need numpy installed in order to use this feature.
+        >> pip install numpy
+
+        Parameters:
+            server (:class:`~plexapi.server.PlexServer`): Server to load the history of.
+            mindate (datetime): Min datetime to load plays from.
+            accountID (int/str) Only load the history of a specific account ID.
+            librarySectionID (int/str) Only load the history of a specific library section ID.
+            utcoffset (int): Seconds added to viewedAt to compute the days and hours (default 0, UTC).
+            container_size (int): Number of plays requested per page.
+
+        Attributes:
+            viewedAt (numpy.ndarray): Epoch seconds of each play (int64).
+            accountID (numpy.ndarray): Account of each play (int64).
+            ratingKey (numpy.ndarray): Item of each play (int64).
+            librarySectionID (numpy.ndarray): Section of each play (int64).
+            duration (numpy.ndarray): Duration of the played items in milliseconds (int64).
+            titles (dict): Titles of the played items by ratingKey (Show - Episode for episodes).
+    """
+    key = '/status/sessions/history/all'
+
+    def __init__(self, server, mindate=None, accountID=None, librarySectionID=None, utcoffset=0,
+                 container_size=X_PLEX_CONTAINER_SIZE):
+        np = _numpy()
+        self._server = server
+        self.utcoffset = utcoffset
+        self.titles = {}
+        columns = {name: array(typecode) for name, typecode, _ in COLUMNS}
+        args = {'sort': 'viewedAt:desc'}
+        if accountID:
+            args['accountID'] = accountID
+        if librarySectionID:
+            args['librarySectionID'] = librarySectionID
+        if mindate:
+            args['viewedAt>'] = int(mindate.timestamp())
+        args['X-Plex-Container-Start'] = 0
+        args['X-Plex-Container-Size'] = container_size
+        while True:
+            data = server.query('%s%s' % (self.key, utils.joinArgs(args)))
+            elems = list(data) if data is not None else []
+            for elem in elems:
+                self._append(columns, elem.attrib)
+            if len(elems) < container_size:
+                break
+            args['X-Plex-Container-Start'] += container_size
+        for name, _, _ in COLUMNS:
+            setattr(self, name, np.frombuffer(columns[name], dtype=np.int64) if columns[name]
+                    else np.zeros(0, dtype=np.int64))
+        log.debug('Loaded %s plays of history', len(self))
+
+    def __len__(self):
+        return len(self.viewedAt)
+
+    def _append(self, columns, attrib):
+        for name, _, attr in COLUMNS:
+            value = attrib.get(attr)
+            columns[name].append(int(value) if value and value.lstrip('-').isdigit() else 0)
+        ratingKey = columns['ratingKey'][-1]
+        if ratingKey and ratingKey not in self.titles:
+            title = attrib.get('title')
+            if attrib.get('grandparentTitle'):
+                title = '%s - %s' % (attrib['grandparentTitle'], title)
+            self.titles[ratingKey] = title
+
+    def keys(self, by):
+        """ Returns the array of the group keys of each play.
+
+            Parameters:
+                by (str): accountID, ratingKey or librarySectionID, or day (numpy.datetime64
+                    days, dates in the dicts), hour (0-23) or weekday (0 for Monday to 6) of the plays.
+        """
+        np = _numpy()
+        if by in TIMEKEYS:
+            local = self.viewedAt + self.utcoffset
+            if by == 'day':
+                return (local // 86400).astype('datetime64[D]')
+            if by == 'hour':
+                return local // 3600 % 24
+            return (local // 86400 + 3) % 7  # 1970-01-01 was a Thursday
+        if by not in ('accountID', 'ratingKey', 'librarySectionID'):
+            raise BadRequest('Unknown history group: %s' % by)
+        return np.asarray(getattr(self, by))
+
+    def aggregate(self, by, weights=None):
+        """ Returns the (keys, values) arrays of the sorted group keys and the number of plays
+            of each group, or the sum of the weights of its plays.
+
+            Parameters:
+                by (str): Group, see :func:`~plexapi.analytics.WatchHistory.keys`.
+                weights (numpy.ndarray): Value of each play to sum (optional).
+        """
+        np = _numpy()
+        keys, inverse = np.unique(self.keys(by), return_inverse=True)
+        values = np.bincount(inverse.ravel(), weights=weights, minlength=len(keys))
+        return keys, values
+
+    def plays(self, by):
+        """ Returns a dict of {group key: number of plays}. """
+        keys, counts = self.aggregate(by)
+        return dict(zip(keys.tolist(), counts.tolist()))
+
+    def watchTime(self, by):
+        """ Returns a dict of {group key: seconds watched} computed from the durations. """
+        keys, sums = self.aggregate(by, self.duration / 1000.0)
+        return dict(zip(keys.tolist(), sums.tolist()))
+
+    def topTitles(self, limit=10, by='plays'):
+        """ Returns the list of (title, value) of the most played items.
+
+            Parameters:
+                limit (int): Number of items to return.
+                by (str): Sort by number of `plays` (default) or `watchTime`.
+        """
+        np = _numpy()
+        keys, values = self.aggregate('ratingKey', self.duration / 1000.0 if by == 'watchTime' else None)
+        mask = keys != 0
+        keys, values = keys[mask], values[mask]
+        order = np.argsort(-values, kind='stable')[:limit]
+        return [(self.titles.get(int(keys[i]), str(keys[i])), values[i].item()) for i in order]
+
+    def concurrency(self, bucket=3600):
+        """ Returns the (starts, counts) arrays of the start of each time bucket (epoch
+            seconds) and the number of plays running during it. A play runs from viewedAt
+            minus its duration to viewedAt.
+
+            Parameters:
+                bucket (int): Size of the time buckets in seconds (default 3600).
+        """
+        np = _numpy()
+        if not len(self):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        ends = self.viewedAt // bucket
+        starts = (self.viewedAt - self.duration // 1000) // bucket
+        first = starts.min()
+        deltas = np.zeros(ends.max() - first + 2, dtype=np.int64)
+        np.add.at(deltas, starts - first, 1)
+        np.add.at(deltas, ends - first + 1, -1)
+        counts = np.cumsum(deltas)[:-1]
+        return (np.arange(len(counts), dtype=np.int64) + first) * bucket, counts
+
+
+# Types of the known attributes exported by LibrarySection.toColumns, str by default
+COLUMNTYPES = {
+    'int': ('ratingKey', 'parentRatingKey', 'grandparentRatingKey', 'librarySectionID', 'id', 'year', 'index',
+            'parentIndex', 'duration', 'viewCount', 'skipCount', 'viewOffset', 'leafCount', 'viewedLeafCount',
+            'childCount', 'bitrate', 'size', 'width', 'height', 'audioChannels', 'channels', 'samplingRate',
+            'bitDepth'),
+    'float': ('rating', 'audienceRating', 'userRating', 'aspectRatio', 'loudness'),
+    'datetime': ('addedAt', 'updatedAt', 'lastViewedAt', 'lastRatedAt'),
+    'date': ('originallyAvailableAt',),
+    'bool': ('optimizedForStreaming', 'has64bitOffsets', 'hasThumbnail', 'selected'),
+}
+# Path of the nested elements whose first occurrence is exported, other child tags are joined
+NESTED = {'Media': 'Media', 'Part': 'Media/Part', 'Stream': 'Media/Part/Stream'}
+NAT = -2 ** 63  # numpy.datetime64('NaT') as int64
+
+
+class ColumnBuilder(object):
+    """ Accumulates attributes of XML elements into typed columns, see
+        :func:`~plexapi.library.LibrarySection.toColumns`.
+
+        A field is an attribute of the element (ex: title) or `Tag.attribute` for the child
+        elements: the first Media, Part (of the first media) or Stream (ex: Part.file), or the
+        comma separated values of the other tags (ex: Genre.tag). Missing int values are 0,
+        missing float values NaN and missing datetimes NaT.
+
+        Parameters:
+            fields (list or dict): Fields to export, or a dict of {field: type} to set the type
+                (int, float, datetime, date, bool or str) of the fields not in COLUMNTYPES.
+    """
+
+    def __init__(self, fields):
+        types = {attr: ftype for ftype, attrs in COLUMNTYPES.items() for attr in attrs}
+        if not isinstance(fields, dict):
+            fields = {field: types.get(field.rsplit('.', 1)[-1], 'str') for field in fields}
+        self.fields = []
+        for field, ftype in fields.items():
+            if ftype not in COLUMNTYPES and ftype != 'str':
+                raise BadRequest('Unknown column type: %s' % ftype)
+            tag, _, attr = field.rpartition('.')
+            self.fields.append((field, tag, attr, ftype))
+        self._values = {field: array('q') if ftype in ('int', 'datetime') else array('d') if ftype == 'float'
+                        else array('b') if ftype == 'bool' else [] for field, _, _, ftype in self.fields}
+
+    def __len__(self):
+        return len(self._values[self.fields[0][0]]) if self.fields else 0
+
+    def projection(self):
+        """ Returns the attributes and elements needed to fill the columns, see
+            :func:`~plexapi.utils.projectionArgs`. Nested attributes (ex: Part.file) are
+            included too, in case the server projects the attributes of the children.
+        """
+        names = set()
+        for _, tag, attr, _ in self.fields:
+            names.add(attr)
+            if tag:
+                names.add(NESTED.get(tag, tag).split('/')[0])
+        return sorted(names)
+
+    def append(self, elem):
+        """ Appends the fields of an element (a row). """
+        for field, tag, attr, ftype in self.fields:
+            if not tag:
+                value = elem.attrib.get(attr)
+            elif tag in NESTED:
+                child = elem.find(NESTED[tag])
+                value = child.attrib.get(attr) if child is not None else None
+            else:
+                value = ','.join(child.attrib.get(attr, '') for child in elem.findall(tag)) or None
+            self._values[field].append(_convert(value, ftype))
+
+    def columns(self, arrow=False):
+        """ Returns a dict of {field: numpy.ndarray}, or a pyarrow.Table if arrow is True. """
+        np = _numpy()
+        columns = {}
+        for field, _, _, ftype in self.fields:
+            values = self._values[field]
+            if ftype == 'int':
+                columns[field] = np.array(values, dtype=np.int64)
+            elif ftype == 'float':
+                columns[field] = np.array(values, dtype=np.float64)
+            elif ftype == 'datetime':
+                columns[field] = np.array(values, dtype=np.int64).view('datetime64[s]')
+            elif ftype == 'date':
+                columns[field] = np.array(values, dtype='datetime64[D]')
+            elif ftype == 'bool':
+                columns[field] = np.array(values, dtype=np.bool_)
+            else:
+                columns[field] = np.array(values, dtype=object)
+        if not arrow:
+            return columns
+        try:
+            import pyarrow
+        except ImportError:
+            raise Unsupported("Can't export Arrow columns without pyarrow")
+        return pyarrow.table({field: pyarrow.array(values) for field, values in columns.items()})
+
+
+def _convert(value, ftype):
+    """ Returns the XML attribute value converted for a column of type ftype. """
+    if ftype == 'str':
+        return value
+    if ftype == 'date':
+        return value or 'NaT'
+    if not value:
+        return NAT if ftype == 'datetime' else float('nan') if ftype == 'float' else 0
+    try:
+        if ftype == 'float':
+            return float(value)
+        if ftype == 'bool':
+            return value not in ('0', 'false')
+        return int(value)
+    except ValueError:
+        return NAT if ftype == 'datetime' else float('nan') if ftype == 'float' else 0
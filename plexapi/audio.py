@@ -169,7 +169,7 @@ class Artist(Audio):
         """ Alias of :func:`~plexapi.audio.Artist.track`. """
         return self.track(title)
 
-    def download(self, savepath=None, keep_original_name=False, **kwargs):
+    def download(self, savepath=None, keep_original_name=False, maxworkers=4, **kwargs):
         """ Downloads all tracks for this artist to the specified location.
 
             Parameters:
@@ -177,16 +177,14 @@ class Artist(Audio):
                 keep_original_name (bool): Set True to keep the original filename as stored in
                     the Plex server. False will create a new filename with the format
                     "<Atrist> - <Album> <Track>".
+                maxworkers (int): Max number of files downloaded at the same time (default 4).
                 kwargs (dict): If specified, a :func:`~plexapi.audio.Track.getStreamURL()` will
                     be returned and the additional arguments passed in will be sent to that
                     function. If kwargs is not specified, the media items will be downloaded
                     and saved to disk.
         """
-        filepaths = []
-        for album in self.albums():
-            for track in album.tracks():
-                filepaths += track.download(savepath, keep_original_name, **kwargs)
-        return filepaths
+        tracks = [track for album in self.albums() for track in album.tracks()]
+        return utils.downloadItems(tracks, savepath, keep_original_name, maxworkers, **kwargs)
 
 
 @utils.registerPlexObject
@@ -252,7 +250,7 @@ class Album(Audio):
         """ Return :func:`~plexapi.audio.Artist` of this album. """
         return self.fetchItem(self.parentKey)
 
-    def download(self, savepath=None, keep_original_name=False, **kwargs):
+    def download(self, savepath=None, keep_original_name=False, maxworkers=4, **kwargs):
         """ Downloads all tracks for this artist to the specified location.
 
             Parameters:
@@ -260,15 +258,13 @@ class Album(Audio):
                 keep_original_name (bool): Set True to keep the original filename as stored in
                     the Plex server. False will create a new filename with the format
                     "<Atrist> - <Album> <Track>".
+                maxworkers (int): Max number of files downloaded at the same time (default 4).
                 kwargs (dict): If specified, a :func:`~plexapi.audio.Track.getStreamURL()` will
                     be returned and the additional arguments passed in will be sent to that
                     function. If kwargs is not specified, the media items will be downloaded
                     and saved to disk.
         """
-        filepaths = []
-        for track in self.tracks():
-            filepaths += track.download(savepath, keep_original_name, **kwargs)
-        return filepaths
+        return utils.downloadItems(self.tracks(), savepath, keep_original_name, maxworkers, **kwargs)
 
     def _defaultSyncTitle(self):
         """ Returns str, default title for a new syncItem. """
@@ -71,10 +71,10 @@ class PlexObject(object):
         initpath = initpath or self._initpath
         if cls is not None:
             return cls(self._server, elem, initpath)
-        # cls is not specified, try looking it up in PLEXOBJECTS
-        etype = elem.attrib.get('type', elem.attrib.get('streamType'))
-        ehash = '%s.%s' % (elem.tag, etype) if etype else elem.tag
-        ecls = utils.PLEXOBJECTS.get(ehash, utils.PLEXOBJECTS.get(elem.tag))
+        # cls is not specified, try looking up its (tag, type) in PLEXDISPATCH
+        attrib = elem.attrib
+        etype = attrib.get('type') or attrib.get('streamType')
+        ecls = utils.PLEXDISPATCH.get((elem.tag, etype)) or utils.lookupPlexObject(elem.tag, etype)
         # log.debug('Building %s as %s', elem.tag, ecls.__name__)
         if ecls is not None:
             return ecls(self._server, elem, initpath)
@@ -142,7 +142,8 @@ class PlexObject(object):
         clsname = cls.__name__ if cls else 'None'
         raise NotFound('Unable to find elem: cls=%s, attrs=%s' % (clsname, kwargs))
 
-    def fetchItems(self, ekey, cls=None, container_start=None, container_size=None, **kwargs):
+    def fetchItems(self, ekey, cls=None, container_start=None, container_size=None, fields=None, exclude=None,
+                   **kwargs):
         """ Load the specified key to find and build all items with the specified tag
             and attrs. See :func:`~plexapi.base.PlexObject.fetchItem` for more details
             on how this is used.
@@ -150,17 +151,30 @@ class PlexObject(object):
             Parameters:
                 container_start (None, int): offset to get a subset of the data
                 container_size (None, int): How many items in data
+                fields (None, list): Only return these attributes and child elements of the items
+                    (ex: ['title', 'year', 'Media']), the other attributes are reloaded on access.
+                exclude (None, list): Don't return these attributes and child elements (ex: ['summary', 'Role']).
 
+            Raises:
+                :class:`plexapi.exceptions.BadRequest`: When filtering on a field removed by fields or exclude.
         """
         url_kw = {}
         if container_start is not None:
             url_kw["X-Plex-Container-Start"] = container_start
         if container_size is not None:
             url_kw["X-Plex-Container-Size"] = container_size
+        url_kw.update(utils.projectionArgs(fields, exclude))
+        if fields or exclude:
+            # the filters below can't look at the fields the server leaves out
+            for attr in kwargs:
+                attr = self._getAttrOperator(attr)[0]
+                if not utils.isProjected(attr, fields, exclude):
+                    raise BadRequest('Unable to filter on %s, it is not in the projected fields' % attr)
 
         if ekey is None:
             raise BadRequest('ekey was not provided')
         data = self._server.query(ekey, params=url_kw)
+        utils.projectElements(data, fields, exclude)
         items = self.findItems(data, cls, ekey, **kwargs)
 
         librarySectionID = data.attrib.get('librarySectionID')
@@ -446,6 +460,16 @@ class PlexPartialObject(PlexObject):
         """
         return self._server.history(maxresults=maxresults, mindate=mindate, ratingKey=self.ratingKey)
 
+    def iterHistory(self, cursor=None, mindate=None):
+        """ Returns a :class:`~plexapi.server.HistoryIterator` over the Play History of this
+            media item, oldest first.
+
+            Parameters:
+                cursor (str): Cursor of a previous iteration to resume from (optional).
+                mindate (datetime): Min datetime to return results from.
+        """
+        return self._server.iterHistory(cursor, mindate, ratingKey=self.ratingKey)
+
     def posters(self):
         """ Returns list of available poster objects. :class:`~plexapi.media.Poster`. """
 
@@ -596,6 +620,7 @@ class Playable(object):
             transcodeSessions (:class:`~plexapi.media.TranscodeSession`): Transcode Session object
                 if item is being transcoded (None otherwise).
             viewedAt (datetime): Datetime item was last viewed (history).
+            historyKey (str): API URL of the history entry (history).
             playlistItemID (int): Playlist item ID (only populated for :class:`~plexapi.playlist.Playlist` items).
     """
 
@@ -607,6 +632,7 @@ class Playable(object):
         self.session = self.findItems(data, etag='Session')                         # session
         self.viewedAt = utils.toDatetime(data.attrib.get('viewedAt'))               # history
         self.accountID = utils.cast(int, data.attrib.get('accountID'))              # history
+        self.historyKey = data.attrib.get('historyKey')                             # history
         self.playlistItemID = utils.cast(int, data.attrib.get('playlistItemID'))    # playlist
 
     def isFullObject(self):
@@ -704,11 +730,11 @@ class Playable(object):
                 filename = '%s.%s' % (self._prettyfilename(), location.container)
             # So this seems to be a alot slower but allows transcode.
             if kwargs:
-                download_url = self.getStreamURL(**kwargs)
+                download_url, size = self.getStreamURL(**kwargs), None
             else:
-                download_url = self._server.url('%s?download=1' % location.key)
+                download_url, size = self._server.url('%s?download=1' % location.key), location.size
             filepath = utils.download(download_url, self._server._token, filename=filename,
-                savepath=savepath, session=self._server._session)
+                savepath=savepath, session=self._server._session, size=size)
             if filepath:
                 filepaths.append(filepath)
         return filepaths
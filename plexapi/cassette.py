@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+import base64
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from plexapi import log
+
+AUTO = 'auto'
+RECORD = 'record'
+REPLAY = 'replay'
+REDACTED = 'REDACTED'
+# Attributes holding tokens in Plex and plex.tv responses, redacted before saving
+TOKEN_ATTRS = re.compile(r'\b(authToken|authenticationToken|accessToken|token)="([^"]+)"')
+SKIP_HEADERS = {'set-cookie', 'x-plex-token'}
+
+
+class Cassette(object):
+    """ Records the HTTP interactions of a requests session to a gzip compressed JSON file
+        and replays them later without network access. Plug it into the session used by a
+        :class:`~plexapi.server.PlexServer` or :class:`~plexapi.myplex.MyPlexAccount`::
+
+            with Cassette('tests.json.gz') as cassette:
+                plex = PlexServer(baseurl, token, session=cassette.session())
+
+        Requests are matched on method, url (without the X-Plex-Token) and body. A request
+        sent several times replays the recorded responses in order, repeating the last one
+        once they are used up. Tokens are redacted from the saved urls and responses and
+        request headers are not saved.
+
+        Parameters:
+            path (str): Path of the cassette file.
+            mode (str): `record` to send the requests and save the responses, `replay` to only
+                answer from the cassette or `auto` (default) to replay if the file exists and
+                record otherwise.
+            latency (float): Factor applied to the recorded response times when replaying,
+                0 replays as fast as possible (default 1, the recorded timings).
+
+        Attributes:
+            mode (str): Either `record` or `replay`.
+            interactions (list): Recorded interactions (dicts).
+            misses (list): Requests (method, url) that were not found when replaying.
+    """
+
+    def __init__(self, path, mode=AUTO, latency=1):
+        if mode not in (AUTO, RECORD, REPLAY):
+            raise ValueError('Unknown cassette mode: %s' % mode)
+        self.path = path
+        self.mode = mode
+        if mode == AUTO:
+            self.mode = REPLAY if os.path.exists(path) else RECORD
+        self.latency = latency
+        self.interactions = []
+        self.misses = []
+        self._responses = defaultdict(list)
+        self._lock = threading.Lock()
+        if self.mode == REPLAY:
+            self.load()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.save()
+
+    def session(self, session=None):
+        """ Returns the session (default a new requests.Session) with every mounted adapter
+            wrapped so its requests are recorded or replayed by this cassette.
+        """
+        session = session or requests.Session()
+        for prefix, adapter in list(session.adapters.items()):
+            if not isinstance(adapter, CassetteAdapter):
+                session.mount(prefix, CassetteAdapter(self, adapter))
+        return session
+
+    def load(self):
+        """ Loads the interactions from the cassette file. """
+        with gzip.open(self.path, 'rt', encoding='utf-8') as handle:
+            self.interactions = json.load(handle)['interactions']
+        self._responses.clear()
+        for interaction in self.interactions:
+            self._responses[_matchKey(interaction['method'], interaction['url'], interaction['body'])].append(interaction)
+        log.debug('Loaded %s interactions from cassette %s', len(self.interactions), self.path)
+
+    def save(self):
+        """ Saves the recorded interactions to the cassette file (only when recording). """
+        if self.mode != RECORD:
+            return
+        dirname = os.path.dirname(self.path)
+        if dirname and not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        tmppath = '%s.%s.tmp' % (self.path, os.getpid())
+        with self._lock:
+            with gzip.open(tmppath, 'wt', encoding='utf-8') as handle:
+                json.dump({'version': 1, 'interactions': self.interactions}, handle)
+        os.replace(tmppath, self.path)
+        log.debug('Saved %s interactions to cassette %s', len(self.interactions), self.path)
+
+    def record(self, request, response):
+        """ Adds the request and its (fully read) response to the cassette. """
+        tokens = _requestTokens(request)
+        content = response.content
+        try:
+            body, encoding = _redact(content.decode('utf-8'), tokens), 'utf-8'
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(content).decode('ascii'), 'base64'
+        interaction = {
+            'method': request.method,
+            'url': _redactUrl(request.url),
+            'body': _bodyHash(request.body),
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {k: _redact(v, tokens) for k, v in response.headers.items() if k.lower() not in SKIP_HEADERS},
+            'content': body,
+            'encoding': encoding,
+            'elapsed': response.elapsed.total_seconds(),
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def replay(self, request):
+        """ Returns the recorded response matching the request or raises a
+            requests.ConnectionError if the cassette has none.
+        """
+        url = _redactUrl(request.url)
+        with self._lock:
+            recorded = self._responses.get(_matchKey(request.method, url, _bodyHash(request.body)))
+            if not recorded:
+                self.misses.append((request.method, url))
+                raise requests.ConnectionError('No recorded response in cassette %s for %s %s'
+                    % (self.path, request.method, url), request=request)
+            interaction = recorded.pop(0) if len(recorded) > 1 else recorded[0]
+        if self.latency and interaction['elapsed']:
+            time.sleep(interaction['elapsed'] * self.latency)
+        content = interaction['content']
+        response = requests.Response()
+        response.status_code = interaction['status']
+        response.reason = interaction['reason']
+        response.headers = CaseInsensitiveDict(interaction['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = base64.b64decode(content) if interaction['encoding'] == 'base64' else content.encode('utf-8')
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=interaction['elapsed'])
+        return response
+
+
+class CassetteAdapter(BaseAdapter):
+    """ Transport adapter recording or replaying the requests sent through the wrapped
+        adapter with a :class:`~plexapi.cassette.Cassette`.
+
+        Parameters:
+            cassette (:class:`~plexapi.cassette.Cassette`): Cassette to record to or replay from.
+            adapter (requests.adapters.BaseAdapter): Adapter sending the requests when
+                recording (default a new HTTPAdapter).
+    """
+
+    def __init__(self, cassette, adapter=None):
+        super(CassetteAdapter, self).__init__()
+        self.cassette = cassette
+        self.adapter = adapter or HTTPAdapter()
+
+    def send(self, request, **kwargs):
+        if self.cassette.mode == REPLAY:
+            return self.cassette.replay(request)
+        response = self.adapter.send(request, **kwargs)
+        self.cassette.record(request, response)
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+
+def _requestTokens(request):
+    """ Returns the tokens sent with the request (header or url). """
+    tokens = {request.headers.get('X-Plex-Token')}
+    tokens.update(v for k, v in parse_qsl(urlsplit(request.url).query) if k.lower() == 'x-plex-token')
+    return {token for token in tokens if token}
+
+
+def _redact(text, tokens):
+    """ Returns the text with the request tokens and the tokens found in it redacted. """
+    for token in tokens | set(match.group(2) for match in TOKEN_ATTRS.finditer(text)):
+        text = text.replace(token, REDACTED)
+    return text
+
+
+def _redactUrl(url):
+    """ Returns the url without the X-Plex-Token query parameter. """
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() != 'x-plex-token']
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _bodyHash(body):
+    if not body:
+        return None
+    if not isinstance(body, bytes):
+        body = body.encode('utf-8') if isinstance(body, str) else repr(body).encode('utf-8')
+    return hashlib.sha1(body).hexdigest()
+
+
+def _matchKey(method, url, body):
+    return method.upper(), url, body
@@ -2,8 +2,9 @@
 import time
 from xml.etree import ElementTree
 
+import plexapi
 import requests
-from plexapi import BASE_HEADERS, CONFIG, TIMEOUT, log, logfilter, utils
+from plexapi import CONFIG, TIMEOUT, log, logfilter, utils
 from plexapi.base import PlexObject
 from plexapi.exceptions import BadRequest, NotFound, Unauthorized, Unsupported
 from plexapi.playqueue import PlayQueue
@@ -124,7 +125,7 @@ class PlexClient(PlexObject):
 
     def _headers(self, **kwargs):
         """ Returns a dict of all default headers for Client requests. """
-        headers = BASE_HEADERS
+        headers = plexapi.BASE_HEADERS.copy()
         if self._token:
             headers['X-Plex-Token'] = self._token
         headers.update(kwargs)
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+import bisect
+import itertools
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+from plexapi import log, utils
+
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+QUEUED = 'queued'
+DOWNLOADING = 'downloading'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+
+class DownloadJob(object):
+    """ Represents a single :class:`~plexapi.media.MediaPart` scheduled on a
+        :class:`~plexapi.downloads.DownloadManager`.
+
+        Attributes:
+            part (:class:`~plexapi.media.MediaPart`): Media part being downloaded.
+            url (str): Download url of the part.
+            host (str): Host (netloc) the part is downloaded from.
+            filename (str): Filename the part is saved as.
+            savepath (str): Directory the part is saved to.
+            priority (int): Jobs with a lower priority are started first.
+            state (str): One of queued, downloading, completed or failed.
+            downloaded (int): Number of bytes downloaded so far.
+            total (int): Size of the part in bytes (from :attr:`~plexapi.media.MediaPart.size`).
+            filepath (str): Local path of the downloaded file (once completed).
+            error (Exception): Error raised while downloading (if failed).
+    """
+
+    def __init__(self, part, filename=None, savepath=None, priority=0):
+        self.part = part
+        self.url = part._server.url('%s?download=1' % part.key)
+        self.host = urlparse(self.url).netloc
+        self.filename = filename or os.path.basename(part.file.replace('\\', '/'))
+        self.savepath = savepath
+        self.priority = priority
+        self.state = QUEUED
+        self.downloaded = 0
+        self.total = part.size or 0
+        self.filepath = None
+        self.error = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<%s:%s:%s>' % (self.__class__.__name__, self.filename, self.state)
+
+
+class DownloadManager(object):
+    """ Schedules many :class:`~plexapi.media.MediaPart` downloads (built on
+        :func:`~plexapi.utils.download`) with a global bandwidth cap, a limit on the number
+        of concurrent downloads per host and priority ordering. A single aggregated progress
+        bar replaces the per file status bar when `showstatus` is True.
+
+        Parameters:
+            maxworkers (int): Max number of concurrent downloads (default 4).
+            maxperhost (int): Max number of concurrent downloads from a single server (default 2).
+            ratelimit (int): Global bandwidth cap in bytes per second (default unlimited).
+            savepath (str): Default directory to save files to (default current working dir).
+            showstatus (bool): Display a single progress bar for all downloads.
+            **kwargs (dict): Additional options passed into :func:`~plexapi.utils.download`
+                (resume, retries, chunksize, checksum, manifest, ..).
+
+        Example:
+
+            .. code-block:: python
+
+                from plexapi.downloads import DownloadManager
+                manager = DownloadManager(maxworkers=4, ratelimit=10 * 1024 * 1024)
+                manager.add(plex.library.section('TV Shows').get('The 100').episodes())
+                manager.add(plex.library.section('Movies').get('Cars'), priority=-1)
+                jobs = manager.run()
+    """
+
+    def __init__(self, maxworkers=4, maxperhost=2, ratelimit=None, savepath=None, showstatus=False, **kwargs):
+        self.maxworkers = maxworkers
+        self.maxperhost = maxperhost
+        self.savepath = savepath
+        self.showstatus = showstatus
+        self.jobs = []
+        self._kwargs = kwargs
+        self._limiter = utils.RateLimiter(ratelimit, burst=ratelimit)
+        self._pending = []  # sorted list of (priority, seq, job)
+        self._active = {}   # host -> number of running downloads
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._stopped = False
+        self._started = None
+        self._bar = None
+
+    def add(self, items, priority=0, savepath=None, filename=None):
+        """ Queue media parts for download. Returns the list of created
+            :class:`~plexapi.downloads.DownloadJob` objects.
+
+            Parameters:
+                items (list): Playable media items (movies, episodes, tracks, ..) or
+                    :class:`~plexapi.media.MediaPart` objects to download.
+                priority (int): Jobs with a lower priority are started first (default 0).
+                savepath (str): Directory to save these files to (default manager savepath).
+                filename (str): Filename to save a single part as (default original filename).
+        """
+        if not isinstance(items, (list, tuple)):
+            items = [items]
+        jobs = []
+        for item in items:
+            parts = list(item.iterParts()) if hasattr(item, 'iterParts') else [item]
+            for part in parts:
+                jobs.append(DownloadJob(part, filename, savepath or self.savepath, priority))
+        with self._cond:
+            for job in jobs:
+                bisect.insort(self._pending, (job.priority, next(self._counter), job))
+            self.jobs += jobs
+            if self._bar is not None:  # pragma: no cover
+                self._bar.total = self.total
+            self._cond.notify_all()
+        return jobs
+
+    def start(self):
+        """ Start the worker threads. Jobs added afterwards are picked up as well. """
+        self._stopped = False
+        self._started = self._started or time.monotonic()
+        if self.showstatus and tqdm and self._bar is None:  # pragma: no cover
+            self._bar = tqdm(unit='B', unit_scale=True, total=self.total, desc='Downloading')
+        while len(self._threads) < self.maxworkers:
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def join(self):
+        """ Block until every queued job has completed or failed. The workers are started
+            if they are not running yet.
+        """
+        if not self._threads:
+            self.start()
+        with self._cond:
+            while self._pending or any(self._active.values()):
+                self._cond.wait()
+        if self._bar is not None:  # pragma: no cover
+            self._bar.close()
+            self._bar = None
+        return self.jobs
+
+    def run(self):
+        """ Start the workers, wait for all jobs to finish and return the list of jobs. """
+        return self.start().join()
+
+    def stop(self):
+        """ Stop the workers once their current download finishes. Queued jobs stay queued. """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    @property
+    def total(self):
+        """ Total number of bytes of all jobs. """
+        return sum(job.total for job in self.jobs)
+
+    @property
+    def downloaded(self):
+        """ Number of bytes downloaded so far by all jobs. """
+        return sum(job.downloaded for job in self.jobs)
+
+    def status(self):
+        """ Returns a dict summarizing the progress of all jobs: the number of jobs per state,
+            `downloaded` and `total` bytes and the average `throughput` in bytes per second.
+        """
+        result = {state: 0 for state in (QUEUED, DOWNLOADING, COMPLETED, FAILED)}
+        for job in self.jobs:
+            result[job.state] += 1
+        elapsed = time.monotonic() - self._started if self._started else 0
+        result['downloaded'] = downloaded = self.downloaded
+        result['total'] = self.total
+        result['throughput'] = downloaded / elapsed if elapsed else 0
+        return result
+
+    def _next(self):
+        """ Pop the highest priority job whose host has a free download slot. """
+        for i, (_, _, job) in enumerate(self._pending):
+            if self._active.get(job.host, 0) < self.maxperhost:
+                del self._pending[i]
+                self._active[job.host] = self._active.get(job.host, 0) + 1
+                return job
+
+    def _work(self):
+        while True:
+            with self._cond:
+                job = self._next()
+                while job is None and not self._stopped:
+                    self._cond.wait()
+                    job = self._next()
+                if job is None:
+                    return
+            try:
+                self._download(job)
+            finally:
+                with self._cond:
+                    self._active[job.host] -= 1
+                    self._cond.notify_all()
+
+    def _download(self, job):
+        def _progress(nbytes):
+            if nbytes > 0:  # restarted attempts report the bytes they discard as negative
+                self._limiter.wait(nbytes)
+            with job._lock:  # called from every segment thread of the job
+                job.downloaded += nbytes
+            if self._bar is not None:  # pragma: no cover
+                self._bar.update(nbytes)
+
+        job.state = DOWNLOADING
+        server = job.part._server
+        try:
+            job.filepath = utils.download(job.url, server._token, filename=job.filename,
+                savepath=job.savepath, session=server._session, progress=_progress,
+                size=job.total or None, **self._kwargs)
+            job.state = COMPLETED
+        except Exception as err:
+            log.warning('Failed to download %s: %s', job.filename, err)
+            job.error = err
+            job.state = FAILED
@@ -21,6 +21,11 @@ class UnknownType(PlexApiException):
     pass
 
 
+class IncompleteDownload(PlexApiException):
+    """ Downloaded file does not match the expected size. """
+    pass
+
+
 class Unsupported(PlexApiException):
     """ Unsupported client request. """
     pass
@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+import os
+import sqlite3
+import threading
+import time
+from xml.etree import ElementTree
+
+from plexapi import X_PLEX_CONTAINER_SIZE, log, utils
+from plexapi.exceptions import BadRequest, NotFound
+
+# Item types mirrored for each section type, parents first
+INDEXTYPES = {
+    'movie': ('movie',),
+    'show': ('show', 'season', 'episode'),
+    'artist': ('artist', 'album', 'track'),
+    'photo': ('photoalbum', 'photo'),
+}
+# Child elements of an item stored in the tags table
+TAGS = ('Collection', 'Country', 'Director', 'Genre', 'Label', 'Mood', 'Producer', 'Role', 'Similar', 'Style',
+        'Writer')
+COLUMNS = ('ratingKey', 'sectionKey', 'type', 'title', 'titleSort', 'year', 'index', 'parentRatingKey',
+           'grandparentRatingKey', 'guid', 'viewCount', 'lastViewedAt', 'addedAt', 'updatedAt', 'duration', 'xml')
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS sections (key INTEGER PRIMARY KEY, uuid TEXT, title TEXT, type TEXT, syncedAt INTEGER);
+CREATE TABLE IF NOT EXISTS cursors (sectionKey INTEGER, type TEXT, updatedAt INTEGER, PRIMARY KEY (sectionKey, type));
+CREATE TABLE IF NOT EXISTS items (ratingKey INTEGER PRIMARY KEY, sectionKey INTEGER, type TEXT, title TEXT,
+    titleSort TEXT, year INTEGER, "index" INTEGER, parentRatingKey INTEGER, grandparentRatingKey INTEGER,
+    guid TEXT, viewCount INTEGER, lastViewedAt INTEGER, addedAt INTEGER, updatedAt INTEGER, duration INTEGER,
+    xml TEXT);
+CREATE INDEX IF NOT EXISTS items_section ON items (sectionKey, type);
+CREATE INDEX IF NOT EXISTS items_parent ON items (parentRatingKey);
+CREATE INDEX IF NOT EXISTS items_title ON items (title COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS parts (id INTEGER PRIMARY KEY, ratingKey INTEGER, mediaId INTEGER, file TEXT,
+    size INTEGER, duration INTEGER, container TEXT);
+CREATE INDEX IF NOT EXISTS parts_item ON parts (ratingKey);
+CREATE INDEX IF NOT EXISTS parts_file ON parts (file);
+CREATE TABLE IF NOT EXISTS tags (ratingKey INTEGER, type TEXT, tag TEXT);
+CREATE INDEX IF NOT EXISTS tags_item ON tags (ratingKey);
+CREATE INDEX IF NOT EXISTS tags_tag ON tags (tag COLLATE NOCASE, type);
+"""
+
+
+class LibraryIndex(object):
+    """ Local SQLite mirror of the library sections of a :class:`~plexapi.server.PlexServer`
+        (items, media parts, tags and parent links) so lookups and listings are served
+        locally instead of listing whole sections from the server::
+
+            index = LibraryIndex(plex, '~/.config/plexapi/index.db')
+            index.sync()  # full load the first time, only the changes afterwards
+            index.search(libtype='movie', tag='Drama')
+
+        The first sync of a section pages through its items like
+        :func:`~plexapi.library.LibrarySection.search`. Later syncs only request the items
+        with an updatedAt newer than the last cursor, and compare the item counts to find
+        and prune deleted ratingKeys. Items are read from the XML without building PlexAPI
+        objects; :func:`~plexapi.index.LibraryIndex.fetchItem` builds one from the stored
+        XML. Note changes of the watched state do not update updatedAt on the server.
+
+        Parameters:
+            server (:class:`~plexapi.server.PlexServer`): Server to mirror.
+            path (str): Path of the SQLite database (default in memory).
+            container_size (int): Number of items requested per page.
+
+        Attributes:
+            queries (int): Number of requests sent to the server while syncing.
+    """
+
+    def __init__(self, server, path=':memory:', container_size=X_PLEX_CONTAINER_SIZE):
+        self._server = server
+        self.path = path
+        self.container_size = container_size
+        self.queries = 0
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(os.path.expanduser(path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock, self._db:
+            self._db.executescript(SCHEMA)
+            row = self._db.execute("SELECT value FROM meta WHERE name = 'machineIdentifier'").fetchone()
+            if row is None:
+                self._db.execute("INSERT INTO meta VALUES ('machineIdentifier', ?)", (server.machineIdentifier,))
+            elif row[0] != server.machineIdentifier:
+                raise BadRequest('Index %s belongs to server %s, not %s' % (path, row[0], server.machineIdentifier))
+
+    def close(self):
+        """ Closes the database. """
+        self._db.close()
+
+    def sync(self, section=None):
+        """ Mirrors the changes of the specified sections since the last sync. Returns a
+            dict of {sectionTitle: {'updated': int, 'deleted': int}}.
+
+            Parameters:
+                section (:class:`~plexapi.library.LibrarySection` or str): Section (or title)
+                    to sync, default all the sections of the server.
+        """
+        if section is None:
+            sections = self._server.library.sections()
+        elif isinstance(section, str):
+            sections = [self._server.library.section(section)]
+        else:
+            sections = [section]
+        results = {}
+        for section in sections:
+            results[section.title] = self._syncSection(section)
+        return results
+
+    def get(self, ratingKey):
+        """ Returns the item row (sqlite3.Row) with the specified ratingKey or None. """
+        return self._execute('SELECT * FROM items WHERE ratingKey = ?', (int(ratingKey),), one=True)
+
+    def search(self, title=None, libtype=None, section=None, tag=None, tagtype=None, limit=None, **columns):
+        """ Returns the item rows (sqlite3.Row) matching all the specified filters.
+
+            Parameters:
+                title (str): Part of the title to match (case insensitive).
+                libtype (str): Type of the items (movie, show, season, episode, ...).
+                section (:class:`~plexapi.library.LibrarySection` or int): Section (or key).
+                tag (str): Tag the items must have (ex: a genre or actor).
+                tagtype (str): Kind of the tag (ex: Genre, Role), default any.
+                limit (int): Max number of rows to return.
+                **columns (dict): Exact values of other item columns, ex: year=2008.
+        """
+        where, args = [], []
+        if title is not None:
+            where.append('items.title LIKE ?')
+            args.append('%%%s%%' % title)
+        if libtype is not None:
+            where.append('items.type = ?')
+            args.append(libtype)
+        if section is not None:
+            where.append('items.sectionKey = ?')
+            args.append(int(getattr(section, 'key', section)))
+        if tag is not None:
+            where.append('items.ratingKey IN (SELECT ratingKey FROM tags WHERE tag = ? COLLATE NOCASE%s)'
+                         % (' AND type = ?' if tagtype else ''))
+            args += [tag, tagtype] if tagtype else [tag]
+        for column, value in columns.items():
+            if column not in COLUMNS:
+                raise BadRequest('Unknown index column: %s' % column)
+            where.append('items."%s" = ?' % column)
+            args.append(value)
+        query = 'SELECT * FROM items%s ORDER BY sectionKey, titleSort, ratingKey' % (
+            ' WHERE ' + ' AND '.join(where) if where else '')
+        if limit:
+            query += ' LIMIT %d' % int(limit)
+        return self._execute(query, args)
+
+    def children(self, ratingKey):
+        """ Returns the rows of the direct children of the specified item (ex: the seasons of a show). """
+        return self._execute('SELECT * FROM items WHERE parentRatingKey = ? ORDER BY "index", ratingKey',
+            (int(ratingKey),))
+
+    def parts(self, ratingKey):
+        """ Returns the media part rows of the specified item. """
+        return self._execute('SELECT * FROM parts WHERE ratingKey = ? ORDER BY id', (int(ratingKey),))
+
+    def tags(self, ratingKey, tagtype=None):
+        """ Returns the tags (str) of the specified item, optionally only of the specified tagtype. """
+        query, args = 'SELECT tag FROM tags WHERE ratingKey = ?', [int(ratingKey)]
+        if tagtype:
+            query += ' AND type = ?'
+            args.append(tagtype)
+        return [row[0] for row in self._execute(query, args)]
+
+    def count(self, libtype=None, section=None):
+        """ Returns the number of indexed items, optionally of a type or section. """
+        return len(self._keys(section and int(getattr(section, 'key', section)), libtype))
+
+    def fetchItem(self, ratingKey):
+        """ Returns the PlexAPI object of the specified item built from the stored XML
+            (without a request). Raises :class:`~plexapi.exceptions.NotFound` if not indexed.
+        """
+        row = self.get(ratingKey)
+        if row is None:
+            raise NotFound('Item %s is not in the index' % ratingKey)
+        return self._server._buildItem(ElementTree.fromstring(row['xml']),
+            initpath='/library/sections/%s/all' % row['sectionKey'])
+
+    def invalidate(self, updated, deleted):
+        """ Refreshes the updated items and removes the deleted ones, both dicts of
+            {ratingKey: sectionID}. Only items of the indexed sections are refreshed, with
+            a request per `container_size` items. This is the target interface of
+            :class:`~plexapi.alert.AlertInvalidator`, to keep the index fresh between syncs.
+        """
+        if deleted:
+            self.remove(*deleted)
+        sections = {row['key']: row['type'] for row in self._execute('SELECT key, type FROM sections')}
+        known = self._keys()
+        keys = [int(key) for key, sectionID in updated.items() if sectionID in sections or int(key) in known]
+        for i in range(0, len(keys), self.container_size):
+            chunk = keys[i:i + self.container_size]
+            self.queries += 1
+            try:
+                data = self._server.query('/library/metadata/%s' % ','.join(str(key) for key in chunk))
+            except NotFound:
+                self.remove(*chunk)
+                continue
+            bysection = {}
+            for elem in data:
+                ratingKey = utils.cast(int, elem.attrib.get('ratingKey'))
+                sectionID = elem.attrib.get('librarySectionID') or data.attrib.get('librarySectionID')
+                sectionID = utils.cast(int, sectionID) or updated.get(ratingKey)
+                if elem.attrib.get('type') in INDEXTYPES.get(sections.get(sectionID), ()):
+                    bysection.setdefault(sectionID, []).append(elem)
+            for sectionID, elems in bysection.items():
+                self._store(sectionID, elems)
+
+    def remove(self, *ratingKeys):
+        """ Removes the specified items (and their parts and tags) from the index. """
+        keys = [(int(key),) for key in ratingKeys]
+        with self._lock, self._db:
+            for table in ('items', 'parts', 'tags'):
+                self._db.executemany('DELETE FROM %s WHERE ratingKey = ?' % table, keys)
+
+    def _execute(self, query, args=(), one=False):
+        with self._lock:
+            cursor = self._db.execute(query, args)
+            return cursor.fetchone() if one else cursor.fetchall()
+
+    def _syncSection(self, section):
+        updated = deleted = 0
+        with self._lock, self._db:
+            self._db.execute('INSERT OR REPLACE INTO sections VALUES (?, ?, ?, ?, ?)',
+                (int(section.key), section.uuid, section.title, section.type, int(time.time())))
+        for libtype in INDEXTYPES.get(section.type, (section.type,)):
+            cursor = self._cursor(section.key, libtype)
+            args = {'type': utils.searchType(libtype)}
+            if cursor is not None:
+                # '>>' is the 'greater than' filter operator, include the cursor second
+                args['updatedAt>>'] = cursor - 1
+            newest, total = cursor or 0, None
+            for elems, total in self._pages('/library/sections/%s/all%s' % (section.key, utils.joinArgs(args))):
+                newest = max([newest] + [utils.cast(int, elem.attrib.get('updatedAt')) or 0 for elem in elems])
+                self._store(section.key, elems)
+                updated += len(elems)
+            with self._lock, self._db:
+                self._db.execute('INSERT OR REPLACE INTO cursors VALUES (?, ?, ?)', (int(section.key), libtype, newest))
+            if cursor is not None:
+                deleted += self._prune(section, libtype)
+        log.debug('Indexed section %s: %s updated, %s deleted', section.title, updated, deleted)
+        return {'updated': updated, 'deleted': deleted}
+
+    def _pages(self, key, **params):
+        """ Yields the (elements, totalSize) of each page of the key. """
+        start = 0
+        delim = '&' if '?' in key else '?'
+        while True:
+            self.queries += 1
+            data = self._server.query('%s%sX-Plex-Container-Start=%s&X-Plex-Container-Size=%s%s' % (
+                key, delim, start, self.container_size, ''.join('&%s=%s' % p for p in params.items())))
+            elems = [elem for elem in data if elem.attrib.get('ratingKey')] if data is not None else []
+            total = utils.cast(int, data.attrib.get('totalSize')) if data is not None else 0
+            yield elems, total
+            start += self.container_size
+            if not elems or total is None or start >= total:
+                return
+
+    def _prune(self, section, libtype):
+        """ Removes the items of libtype deleted from the server. The ratingKeys are only
+            listed when the server and index counts differ. Returns the number removed.
+        """
+        key = '/library/sections/%s/all?type=%s' % (section.key, utils.searchType(libtype))
+        self.queries += 1
+        data = self._server.query('%s&X-Plex-Container-Start=0&X-Plex-Container-Size=0' % key)
+        local = self._keys(int(section.key), libtype)
+        if utils.cast(int, data.attrib.get('totalSize')) == len(local):
+            return 0
+        remote = set()
+        for elems, _ in self._pages(key, includeFields='ratingKey'):
+            remote.update(int(elem.attrib['ratingKey']) for elem in elems)
+        deleted = local - remote
+        self.remove(*deleted)
+        return len(deleted)
+
+    def _keys(self, sectionKey=None, libtype=None):
+        query, args = 'SELECT ratingKey FROM items WHERE 1', []
+        if sectionKey is not None:
+            query += ' AND sectionKey = ?'
+            args.append(sectionKey)
+        if libtype is not None:
+            query += ' AND type = ?'
+            args.append(libtype)
+        return {row[0] for row in self._execute(query, args)}
+
+    def _cursor(self, sectionKey, libtype):
+        row = self._execute('SELECT updatedAt FROM cursors WHERE sectionKey = ? AND type = ?',
+            (int(sectionKey), libtype), one=True)
+        return row[0] if row else None
+
+    def _store(self, sectionKey, elems):
+        items, parts, tags = [], [], []
+        for elem in elems:
+            attrib = elem.attrib
+            ratingKey = int(attrib['ratingKey'])
+            items.append((ratingKey, int(sectionKey), attrib.get('type'), attrib.get('title'),
+                attrib.get('titleSort') or attrib.get('title'), utils.cast(int, attrib.get('year')),
+                utils.cast(int, attrib.get('index')), utils.cast(int, attrib.get('parentRatingKey')),
+                utils.cast(int, attrib.get('grandparentRatingKey')), attrib.get('guid'),
+                utils.cast(int, attrib.get('viewCount')), utils.cast(int, attrib.get('lastViewedAt')),
+                utils.cast(int, attrib.get('addedAt')), utils.cast(int, attrib.get('updatedAt')),
+                utils.cast(int, attrib.get('duration')), ElementTree.tostring(elem, encoding='unicode')))
+            for child in elem:
+                if child.tag in TAGS:
+                    tags.append((ratingKey, child.tag, child.attrib.get('tag')))
+                elif child.tag == 'Media':
+                    for part in child.iter('Part'):
+                        parts.append((int(part.attrib['id']), ratingKey, utils.cast(int, child.attrib.get('id')),
+                            part.attrib.get('file'), utils.cast(int, part.attrib.get('size')),
+                            utils.cast(int, part.attrib.get('duration')), part.attrib.get('container')))
+        keys = [(item[0],) for item in items]
+        with self._lock, self._db:
+            self._db.executemany('DELETE FROM parts WHERE ratingKey = ?', keys)
+            self._db.executemany('DELETE FROM tags WHERE ratingKey = ?', keys)
+            self._db.executemany('INSERT OR REPLACE INTO items VALUES (%s)' % ', '.join('?' * len(COLUMNS)), items)
+            self._db.executemany('INSERT OR REPLACE INTO parts VALUES (?, ?, ?, ?, ?, ?, ?)', parts)
+            self._db.executemany('INSERT INTO tags VALUES (?, ?, ?)', tags)
@@ -6,6 +6,7 @@ from plexapi.base import PlexObject
 from plexapi.exceptions import BadRequest, NotFound
 from plexapi.media import MediaTag
 from plexapi.settings import Setting
+from plexapi.utils import tag_helper
 
 
 class Library(PlexObject):
@@ -38,11 +39,11 @@ class Library(PlexObject):
         key = '/library/sections'
         sections = []
         for elem in self._server.query(key):
-            for cls in (MovieSection, ShowSection, MusicSection, PhotoSection):
-                if elem.attrib.get('type') == cls.TYPE:
-                    section = cls(self._server, elem, key)
-                    self._sectionsByID[section.key] = section
-                    sections.append(section)
+            cls = SECTIONTYPES.get(elem.attrib.get('type'))
+            if cls is not None:
+                section = cls(self._server, elem, key)
+                self._sectionsByID[section.key] = section
+                sections.append(section)
         return sections
 
     def section(self, title=None):
@@ -307,6 +308,20 @@ class Library(PlexObject):
             hist.extend(section.history(maxresults=maxresults, mindate=mindate))
         return hist
 
+    def iterHistory(self, cursor=None, mindate=None):
+        """ Returns a :class:`~plexapi.server.HistoryIterator` over the Play History of all
+            library Sections for the owner, section after section, oldest first.
+
+            Parameters:
+                cursor (str): Cursor of a previous iteration to resume from (optional).
+                mindate (datetime): Min datetime to return results from.
+        """
+        from plexapi.server import HistoryIterator, historySource
+        server = self._server
+        sources = [historySource(server.machineIdentifier, server, accountID=1, librarySectionID=section.key)
+                   for section in self.sections()]
+        return HistoryIterator(sources, cursor, mindate)
+
 
 class LibrarySection(PlexObject):
     """ Base class for a single library section.
@@ -447,6 +462,8 @@ class LibrarySection(PlexObject):
 
             Parameters:
                     sort (string): The sort string
+                    **kwargs (dict): Options of :func:`~plexapi.base.PlexObject.fetchItems`,
+                        ex: fields=['title', 'year'] to only return these attributes.
         """
         sortStr = ''
         if sort is not None:
@@ -455,6 +472,110 @@ class LibrarySection(PlexObject):
         key = '/library/sections/%s/all%s' % (self.key, sortStr)
         return self.fetchItems(key, **kwargs)
 
+    def bulkEdit(self, items, chunksize=100, refresh=False, **kwargs):
+        """ Edit many items of this library section at once. Instead of sending one request
+            per item (see :func:`~plexapi.base.PlexPartialObject.edit`), the ratingKeys are
+            sent as a comma separated `id` list in chunks of `chunksize` items. Returns a list
+            of `(ratingKeys, error)` tuples for every chunk that failed; an empty list means
+            all items were edited.
+
+            Parameters:
+                items (list): List of media items (or ratingKeys) to edit. Items of different
+                    types (ex: shows and episodes) are sent in separate requests.
+                chunksize (int): Max number of items to send in a single request (default 100).
+                refresh (bool): Set True to call refresh() on every successfully edited item.
+                kwargs (dict): Dict of settings to edit, see :func:`~plexapi.base.PlexPartialObject.edit`.
+
+            Example:
+                >>> movies.bulkEdit(movies.search(unwatched=True), **{'contentRating.value': 'PG',
+                ...                                                     'contentRating.locked': 1})
+        """
+        failures = []
+        libtype = kwargs.pop('type', None)
+        for etype, group in self._groupByType(items, libtype).items():
+            for i in range(0, len(group), chunksize):
+                chunk = group[i:i + chunksize]
+                ratingKeys = [str(getattr(item, 'ratingKey', item)) for item in chunk]
+                args = dict(kwargs, type=etype, id=','.join(ratingKeys))
+                part = '/library/sections/%s/all?%s' % (self.key, urlencode(args))
+                try:
+                    self._server.query(part, method=self._server._session.put)
+                except (BadRequest, NotFound) as err:
+                    log.warning('Failed to edit %s items in section %s: %s', len(chunk), self.key, err)
+                    failures.append((ratingKeys, err))
+                    continue
+                if refresh:
+                    for item in chunk:
+                        if hasattr(item, 'refresh'):
+                            item.refresh()
+        return failures
+
+    def _groupByType(self, items, libtype=None):
+        """ Returns a dict of {searchType: [items]} used by the bulk edit helpers. """
+        groups = {}
+        for item in items:
+            etype = libtype or getattr(item, 'type', None) or self.TYPE
+            groups.setdefault(utils.searchType(etype), []).append(item)
+        return groups
+
+    def _bulkEditTags(self, items, tag, values, locked=True, remove=False, **kwargs):
+        """ Helper to add or remove tags on many items using :func:`~plexapi.library.LibrarySection.bulkEdit`.
+            The server replaces the tags of the items with the values sent, so the tags are added
+            by loading the existing tags of the items (one request per chunk) and sending the
+            merged list to each group of items sharing the same existing tags.
+        """
+        if not isinstance(values, list):
+            values = [values]
+        if remove:
+            kwargs.update(tag_helper(tag, values, locked, remove))
+            return self.bulkEdit(items, **kwargs)
+        chunksize = kwargs.get('chunksize', 100)
+        groups = {}
+        for i in range(0, len(items), chunksize):
+            chunk = items[i:i + chunksize]
+            ratingKeys = [str(getattr(item, 'ratingKey', item)) for item in chunk]
+            existing = {}
+            for item in self._server.fetchItems('/library/metadata/%s' % ','.join(ratingKeys)):
+                existing[str(item.ratingKey)] = tuple(t.tag for t in item.__dict__.get(tag + 's') or [] if t)
+            for ratingKey, item in zip(ratingKeys, chunk):
+                groups.setdefault(existing.get(ratingKey, ()), []).append(item)
+        failures = []
+        for existing, group in groups.items():
+            merged = list(existing) + [value for value in values if value not in existing]
+            failures.extend(self.bulkEdit(group, **dict(kwargs, **tag_helper(tag, merged, locked))))
+        return failures
+
+    def bulkAddLabel(self, items, labels, locked=True, **kwargs):
+        """ Add label(s) to many items at once. See :func:`~plexapi.library.LibrarySection.bulkEdit`
+            for the available kwargs and the return value.
+
+            Parameters:
+                items (list): List of media items (or ratingKeys) to label.
+                labels (list): List of label strings to add.
+                locked (bool): Lock the label field (default True).
+        """
+        return self._bulkEditTags(items, 'label', labels, locked, **kwargs)
+
+    def bulkRemoveLabel(self, items, labels, locked=True, **kwargs):
+        """ Remove label(s) from many items at once. See :func:`~plexapi.library.LibrarySection.bulkEdit`. """
+        return self._bulkEditTags(items, 'label', labels, locked, remove=True, **kwargs)
+
+    def bulkAddCollection(self, items, collections, locked=True, **kwargs):
+        """ Add collection(s) to many items at once. See :func:`~plexapi.library.LibrarySection.bulkEdit`. """
+        return self._bulkEditTags(items, 'collection', collections, locked, **kwargs)
+
+    def bulkRemoveCollection(self, items, collections, locked=True, **kwargs):
+        """ Remove collection(s) from many items at once. See :func:`~plexapi.library.LibrarySection.bulkEdit`. """
+        return self._bulkEditTags(items, 'collection', collections, locked, remove=True, **kwargs)
+
+    def bulkAddGenre(self, items, genres, locked=True, **kwargs):
+        """ Add genre(s) to many items at once. See :func:`~plexapi.library.LibrarySection.bulkEdit`. """
+        return self._bulkEditTags(items, 'genre', genres, locked, **kwargs)
+
+    def bulkRemoveGenre(self, items, genres, locked=True, **kwargs):
+        """ Remove genre(s) from many items at once. See :func:`~plexapi.library.LibrarySection.bulkEdit`. """
+        return self._bulkEditTags(items, 'genre', genres, locked, remove=True, **kwargs)
+
     def agents(self):
         """ Returns a list of available `:class:`~plexapi.media.Agent` for this library section.
         """
@@ -540,8 +661,8 @@ class LibrarySection(PlexObject):
         key = '/library/sections/%s/%s%s' % (self.key, category, utils.joinArgs(args))
         return self.fetchItems(key, cls=FilterChoice)
 
-    def search(self, title=None, sort=None, maxresults=None,
-               libtype=None, container_start=0, container_size=X_PLEX_CONTAINER_SIZE, **kwargs):
+    def search(self, title=None, sort=None, maxresults=None, libtype=None, container_start=0,
+               container_size=X_PLEX_CONTAINER_SIZE, fields=None, exclude=None, **kwargs):
         """ Search the library. The http requests will be batched in container_size. If you're only looking for the first <num>
             results, it would be wise to set the maxresults option to that amount so this functions
             doesn't iterate over all results on the server.
@@ -555,6 +676,9 @@ class LibrarySection(PlexObject):
                     album, track; optional).
                 container_start (int): default 0
                 container_size (int): default X_PLEX_CONTAINER_SIZE in your config file.
+                fields (list): Only return these attributes and child elements of the items, ex:
+                    ['title', 'year'] to skip the summaries, tags and media of a bulk scan (optional).
+                exclude (list): Don't return these attributes and child elements, ex: ['Role'] (optional).
                 **kwargs (dict): Any of the available filters for the current library section. Partial string
                         matches allowed. Multiple matches OR together. Negative filtering also possible, just add an
                         exclamation mark to the end of filter name, e.g. `resolution!=1x1`.
@@ -595,8 +719,8 @@ class LibrarySection(PlexObject):
             container_size = min(container_size, maxresults)
         while True:
             key = '/library/sections/%s/all%s' % (self.key, utils.joinArgs(args))
-            subresults = self.fetchItems(key, container_start=container_start,
-                                         container_size=container_size)
+            subresults = self.fetchItems(key, container_start=container_start, container_size=container_size,
+                                         fields=fields, exclude=exclude)
             if not len(subresults):
                 if offset > self.totalSize:
                     log.info("container_start is higher then the number of items in the library")
@@ -619,6 +743,43 @@ class LibrarySection(PlexObject):
 
         return results
 
+    def toColumns(self, fields, libtype=None, container_size=X_PLEX_CONTAINER_SIZE, arrow=False, **kwargs):
+        """ Returns the fields of the items of this section as typed columns, a dict of
+            {field: numpy.ndarray} (or a pyarrow.Table), one row per item. The pages of the
+            section are read straight from the XML without building the media objects, so
+            large sections can be exported to a dataframe in a fraction of the time::
+
+                section.toColumns(['title', 'year', 'Media.bitrate', 'Part.size', 'Genre.tag'])
+
+            NOTE: You need numpy (and pyarrow for arrow=True) installed in order to use this feature.
+
+            Parameters:
+                fields (list or dict): Attributes of the items or of their children, ex:
+                    Media.videoCodec or Part.file, see :class:`~plexapi.analytics.ColumnBuilder`.
+                libtype (str): Type of the items to export (ex: track), default the section type.
+                container_size (int): Number of items requested per page.
+                arrow (bool): Return a pyarrow.Table instead of the NumPy arrays.
+                **kwargs (dict): Filters of the items, see :func:`~plexapi.library.LibrarySection.search`.
+        """
+        from plexapi.analytics import ColumnBuilder
+        builder = ColumnBuilder(fields)
+        args = {category: self._cleanSearchFilter(category, value, libtype) for category, value in kwargs.items()}
+        args['type'] = utils.searchType(libtype or self.TYPE)
+        key = '/library/sections/%s/all%s' % (self.key, utils.joinArgs(args))
+        # only ask for the exported attributes and elements
+        params = utils.projectionArgs(builder.projection())
+        start = 0
+        while True:
+            params.update({'X-Plex-Container-Start': start, 'X-Plex-Container-Size': container_size})
+            data = self._server.query(key, params=params)
+            elems = [elem for elem in data if elem.attrib.get('ratingKey')] if data is not None else []
+            for elem in elems:
+                builder.append(elem)
+            start += container_size
+            if len(elems) < container_size:
+                break
+        return builder.columns(arrow)
+
     def _cleanSearchFilter(self, category, value, libtype=None):
         # check a few things before we begin
         if category.endswith('!'):
@@ -741,6 +902,16 @@ class LibrarySection(PlexObject):
         """
         return self._server.history(maxresults=maxresults, mindate=mindate, librarySectionID=self.key, accountID=1)
 
+    def iterHistory(self, cursor=None, mindate=None):
+        """ Returns a :class:`~plexapi.server.HistoryIterator` over the Play History of this
+            library Section for the owner, oldest first.
+
+            Parameters:
+                cursor (str): Cursor of a previous iteration to resume from (optional).
+                mindate (datetime): Min datetime to return results from.
+        """
+        return self._server.iterHistory(cursor, mindate, librarySectionID=self.key, accountID=1)
+
 
 class MovieSection(LibrarySection):
     """ Represents a :class:`~plexapi.library.LibrarySection` section containing movies.
@@ -1027,6 +1198,11 @@ class PhotoSection(LibrarySection):
         return super(PhotoSection, self).sync(**kwargs)
 
 
+# Section classes keyed by the type of their /library/sections element. These can't share
+# utils.PLEXDISPATCH as ('Directory', 'show') is already registered for a Show.
+SECTIONTYPES = {cls.TYPE: cls for cls in (MovieSection, ShowSection, MusicSection, PhotoSection)}
+
+
 class FilterChoice(PlexObject):
     """ Represents a single filter choice. These objects are gathered when using filters
         while searching for library items and is the object returned in the result set of
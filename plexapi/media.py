@@ -125,9 +125,9 @@ class MediaPart(PlexObject):
     def _buildStreams(self, data):
         streams = []
         for elem in data:
-            for cls in (VideoStream, AudioStream, SubtitleStream):
-                if elem.attrib.get('streamType') == str(cls.STREAMTYPE):
-                    streams.append(cls(self._server, elem, self._initpath))
+            cls = utils.PLEXDISPATCH.get(('Stream', elem.attrib.get('streamType')))
+            if cls is not None:
+                streams.append(cls(self._server, elem, self._initpath))
         return streams
 
     def videoStreams(self):
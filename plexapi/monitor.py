@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+import threading
+
+from plexapi import log, utils
+
+STARTED = 'started'
+PAUSED = 'paused'
+RESUMED = 'resumed'
+PROGRESS = 'progress'
+TRANSCODE = 'transcode'
+STOPPED = 'stopped'
+# Session fields read from /status/sessions: (field, child tag or None for the item, attribute, cast)
+FIELDS = (
+    ('ratingKey', None, 'ratingKey', int),
+    ('type', None, 'type', str),
+    ('title', None, 'title', str),
+    ('parentTitle', None, 'parentTitle', str),
+    ('grandparentTitle', None, 'grandparentTitle', str),
+    ('librarySectionID', None, 'librarySectionID', int),
+    ('viewOffset', None, 'viewOffset', int),
+    ('duration', None, 'duration', int),
+    ('userID', 'User', 'id', int),
+    ('user', 'User', 'title', str),
+    ('player', 'Player', 'title', str),
+    ('machineIdentifier', 'Player', 'machineIdentifier', str),
+    ('product', 'Player', 'product', str),
+    ('address', 'Player', 'address', str),
+    ('state', 'Player', 'state', str),
+    ('bandwidth', 'Session', 'bandwidth', int),
+    ('location', 'Session', 'location', str),
+    ('transcodeKey', 'TranscodeSession', 'key', str),
+    ('videoDecision', 'TranscodeSession', 'videoDecision', str),
+    ('audioDecision', 'TranscodeSession', 'audioDecision', str),
+    ('container', 'TranscodeSession', 'container', str),
+    ('throttled', 'TranscodeSession', 'throttled', bool),
+)
+TRANSCODE_FIELDS = ('transcodeKey', 'videoDecision', 'audioDecision', 'container', 'throttled')
+
+
+class SessionEvent(object):
+    """ Change of a playback session reported by a :class:`~plexapi.monitor.SessionMonitor`.
+
+        Attributes:
+            event (str): started, paused, resumed, transcode, progress or stopped.
+            sessionKey (str): Key of the session.
+            changes (dict): Fields changed since the previous event of the session, all the
+                fields for started and an empty dict for stopped events.
+            session (dict): All the fields of the session, see :data:`~plexapi.monitor.FIELDS`.
+    """
+
+    def __init__(self, event, sessionKey, changes, session):
+        self.event = event
+        self.sessionKey = sessionKey
+        self.changes = changes
+        self.session = session
+
+    def __repr__(self):
+        return '<%s:%s:%s>' % (self.__class__.__name__, self.sessionKey, self.event)
+
+
+class SessionMonitor(threading.Thread):
+    """ Watches the playback sessions of a PlexServer and reports what changed between two
+        polls of `/status/sessions` as :class:`~plexapi.monitor.SessionEvent`. The sessions
+        are read from the XML without building the media objects and compared by sessionKey.
+        This class implements threading.Thread, call .start() to poll in the background or
+        :func:`~plexapi.monitor.SessionMonitor.poll` directly. When calling
+        `PlexServer.startSessionMonitor()`, the thread will be started for you.
+
+        The polling interval adapts to the activity: `interval` seconds while sessions are
+        active, doubling up to `maxInterval` while the server is idle. When an
+        :class:`~plexapi.alert.AlertListener` is passed, its `playing` notifications update
+        the state and progress of the known sessions right away, trigger a poll for the new
+        ones, and the server is only polled every `maxInterval` seconds otherwise.
+
+        Parameters:
+            server (:class:`~plexapi.server.PlexServer`): PlexServer to monitor.
+            callback (func): Function called with each :class:`~plexapi.monitor.SessionEvent`.
+            interval (float): Seconds between polls while sessions are active (default 5).
+            maxInterval (float): Max seconds between polls (default 60).
+            listener (:class:`~plexapi.alert.AlertListener`): Listener to receive the
+                playing notifications from (optional).
+
+        Attributes:
+            sessions (dict): Fields of the active sessions by sessionKey.
+            polls (int): Number of requests sent to /status/sessions.
+    """
+    key = '/status/sessions'
+
+    def __init__(self, server, callback=None, interval=5, maxInterval=60, listener=None):
+        super(SessionMonitor, self).__init__()
+        self.daemon = True
+        self._server = server
+        self._callback = callback
+        self._interval = interval
+        self._maxInterval = maxInterval
+        self._listener = listener
+        self._subscription = None
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._lock = threading.RLock()
+        self.sessions = {}
+        self.polls = 0
+
+    def run(self):
+        if self._listener:
+            from plexapi.alert import PlaySessionStateNotification
+            self._subscription = self._listener.subscribe(self._onPlaying, [PlaySessionStateNotification])
+        interval = self._interval
+        while not self._stopped.is_set():
+            try:
+                events = self.poll()
+            except Exception as err:
+                log.error('SessionMonitor Error: %s', err)
+                events = []
+            if self._listener or not self.sessions:
+                interval = self._maxInterval if self._listener else min(self._maxInterval, interval * 2)
+            else:
+                interval = self._interval
+            for event in events:
+                self._dispatch(event)
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+        if self._subscription:
+            self._listener.unsubscribe(self._subscription)
+
+    def stop(self):
+        """ Stops the SessionMonitor thread. """
+        log.info('Stopping SessionMonitor.')
+        self._stopped.set()
+        self._wakeup.set()
+
+    def poll(self):
+        """ Requests the active sessions and returns the list of
+            :class:`~plexapi.monitor.SessionEvent` since the previous poll.
+        """
+        self.polls += 1
+        data = self._server.query(self.key)
+        current = {}
+        for elem in data if data is not None else []:
+            sessionKey = elem.attrib.get('sessionKey')
+            if sessionKey:
+                current[sessionKey] = _sessionFields(elem)
+        events = []
+        with self._lock:
+            for sessionKey, session in current.items():
+                previous = self.sessions.get(sessionKey)
+                if previous is None:
+                    events.append(SessionEvent(STARTED, sessionKey, dict(session), session))
+                    continue
+                event = _diff(sessionKey, previous, session)
+                if event:
+                    events.append(event)
+            for sessionKey in set(self.sessions) - set(current):
+                events.append(SessionEvent(STOPPED, sessionKey, {}, self.sessions[sessionKey]))
+            self.sessions = current
+        return events
+
+    def _onPlaying(self, notification):
+        """ Applies a playing notification to the known session, or polls for a new one. """
+        sessionKey = notification.sessionKey
+        with self._lock:
+            previous = self.sessions.get(sessionKey)
+            if previous is None or notification.state == STOPPED:
+                self._wakeup.set()
+                return
+            session = dict(previous, state=notification.state, viewOffset=notification.viewOffset)
+            self.sessions[sessionKey] = session
+            event = _diff(sessionKey, previous, session)
+        if event:
+            self._dispatch(event)
+
+    def _dispatch(self, event):
+        if self._callback:
+            try:
+                self._callback(event)
+            except Exception as err:
+                log.error('SessionMonitor Callback Error: %s', err)
+
+
+def _sessionFields(elem):
+    """ Returns the dict of FIELDS of a session element. """
+    children = {child.tag: child.attrib for child in elem}
+    session = {}
+    for field, tag, attr, func in FIELDS:
+        attrib = children.get(tag, {}) if tag else elem.attrib
+        session[field] = utils.cast(func, attrib.get(attr))
+    return session
+
+
+def _diff(sessionKey, previous, session):
+    """ Returns the SessionEvent describing the changes of a session or None. """
+    changes = {field: value for field, value in session.items() if previous.get(field) != value}
+    if not changes:
+        return None
+    if 'state' in changes and session['state'] == PAUSED:
+        event = PAUSED
+    elif 'state' in changes and previous.get('state') == PAUSED:
+        event = RESUMED
+    elif any(field in changes for field in TRANSCODE_FIELDS):
+        event = TRANSCODE
+    else:
+        event = PROGRESS
+    return SessionEvent(event, sessionKey, changes, session)
@@ -1,17 +1,21 @@
 # -*- coding: utf-8 -*-
 import copy
+import json
+import os
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from xml.etree import ElementTree
 
+import plexapi
 import requests
-from plexapi import (BASE_HEADERS, CONFIG, TIMEOUT, X_PLEX_ENABLE_FAST_CONNECT,
-                     X_PLEX_IDENTIFIER, log, logfilter, utils)
+from plexapi import (CONFIG, CONNECTION_CACHE_PATH, CONNECTION_CACHE_TTL, MYPLEX_CACHE_TTL, TIMEOUT,
+                     X_PLEX_ENABLE_FAST_CONNECT, log, logfilter, utils)
 from plexapi.base import PlexObject
 from plexapi.client import PlexClient
 from plexapi.exceptions import BadRequest, NotFound, Unauthorized
 from plexapi.library import LibrarySection
-from plexapi.server import PlexServer
+from plexapi.server import HistoryIterator, PlexServer, historySource
 from plexapi.sonos import PlexSonosClient
 from plexapi.sync import SyncItem, SyncList
 from plexapi.utils import joinArgs
@@ -32,6 +36,9 @@ class MyPlexAccount(PlexObject):
                 cache the http responses from PMS
             timeout (int): timeout in seconds on initial connect to myplex (default config.TIMEOUT).
 
+        Resources, devices, users and the sections of shared servers are cached for
+        `plexapi.myplex_cache_ttl` seconds (see :func:`~plexapi.myplex.MyPlexAccount.clearCache`).
+
         Attributes:
             SIGNIN (str): 'https://plex.tv/users/sign_in.xml'
             key (str): 'https://plex.tv/users/account'
@@ -92,6 +99,10 @@ class MyPlexAccount(PlexObject):
         self._session = session or requests.Session()
         self._sonos_cache = []
         self._sonos_cache_timestamp = 0
+        self._cache = {}
+        self._cacheLock = threading.Lock()
+        self._cacheGeneration = 0
+        self._cacheTTL = MYPLEX_CACHE_TTL
         data, initpath = self._signin(username, password, timeout)
         super(MyPlexAccount, self).__init__(self, data, initpath)
 
@@ -158,21 +169,59 @@ class MyPlexAccount(PlexObject):
         """ Returns the :class:`~plexapi.myplex.MyPlexDevice` that matches the name specified.
 
             Parameters:
-                name (str): Name to match against.
+                name (str): Name, clientIdentifier or id to match against.
         """
-        for device in self.devices():
-            if device.name.lower() == name.lower():
-                return device
-        raise NotFound('Unable to find device %s' % name)
+        device = self._devices()[1].get(str(name).lower())
+        if device is None:
+            raise NotFound('Unable to find device %s' % name)
+        return device
 
     def devices(self):
         """ Returns a list of all :class:`~plexapi.myplex.MyPlexDevice` objects connected to the server. """
-        data = self.query(MyPlexDevice.key)
-        return [MyPlexDevice(self, elem) for elem in data]
+        return list(self._devices()[0])
+
+    def _devices(self):
+        def _load():
+            return [MyPlexDevice(self, elem) for elem in self.query(MyPlexDevice.key)]
+        return self._cached('devices', _load, lambda d: (d.name, d.clientIdentifier, d.id))
+
+    def clearCache(self, *names):
+        """ Clears the cached resources, devices, users and shared server sections so they are
+            requested from plex.tv again on next access.
+
+            Parameters:
+                names (str): Only clear these caches ('resources', 'devices', 'users' or 'sections').
+        """
+        with self._cacheLock:
+            self._cacheGeneration += 1
+            for key in list(self._cache):
+                if not names or key.split(':')[0] in names:
+                    del self._cache[key]
+
+    def _cached(self, key, loader, keys):
+        """ Returns a tuple (items, index) for the cache key, calling loader() to request the items
+            once the cache is older than `plexapi.myplex_cache_ttl` seconds. The index maps each
+            lowercase value returned by keys(item) to the first item it belongs to.
+        """
+        with self._cacheLock:
+            timestamp, items, index = self._cache.get(key, (0, None, None))
+            generation = self._cacheGeneration
+        if items is not None and time.time() - timestamp < self._cacheTTL:
+            return items, index
+        timestamp, items, index = time.time(), loader(), {}
+        for item in items:
+            for value in keys(item):
+                if value not in (None, ''):
+                    index.setdefault(str(value).lower(), item)
+        with self._cacheLock:
+            # don't store items loaded before a clearCache(), they may predate a change
+            if generation == self._cacheGeneration:
+                self._cache[key] = (timestamp, items, index)
+        return items, index
 
     def _headers(self, **kwargs):
         """ Returns dict containing base headers for all requests to the server. """
-        headers = BASE_HEADERS.copy()
+        headers = plexapi.BASE_HEADERS.copy()
         if self._token:
             headers['X-Plex-Token'] = self._token
         headers.update(kwargs)
@@ -201,17 +250,21 @@ class MyPlexAccount(PlexObject):
         """ Returns the :class:`~plexapi.myplex.MyPlexResource` that matches the name specified.
 
             Parameters:
-                name (str): Name to match against.
+                name (str): Name or clientIdentifier to match against.
         """
-        for resource in self.resources():
-            if resource.name.lower() == name.lower():
-                return resource
-        raise NotFound('Unable to find resource %s' % name)
+        resource = self._resources()[1].get(str(name).lower())
+        if resource is None:
+            raise NotFound('Unable to find resource %s' % name)
+        return resource
 
     def resources(self):
         """ Returns a list of all :class:`~plexapi.myplex.MyPlexResource` objects connected to the server. """
-        data = self.query(MyPlexResource.key)
-        return [MyPlexResource(self, elem) for elem in data]
+        return list(self._resources()[0])
+
+    def _resources(self):
+        def _load():
+            return [MyPlexResource(self, elem) for elem in self.query(MyPlexResource.key)]
+        return self._cached('resources', _load, lambda r: (r.name, r.clientIdentifier))
 
     def sonos_speakers(self):
         if 'companions_sonos' not in self.subscriptionFeatures:
@@ -267,7 +320,9 @@ class MyPlexAccount(PlexObject):
         }
         headers = {'Content-Type': 'application/json'}
         url = self.FRIENDINVITE.format(machineId=machineId)
-        return self.query(url, self._session.post, json=params, headers=headers)
+        response = self.query(url, self._session.post, json=params, headers=headers)
+        self.clearCache('users')
+        return response
 
     def createHomeUser(self, user, server, sections=None, allowSync=False, allowCameraUpload=False,
                        allowChannels=False, filterMovies=None, filterTelevision=None, filterMusic=None):
@@ -313,6 +368,7 @@ class MyPlexAccount(PlexObject):
         }
         url = self.FRIENDINVITE.format(machineId=machineId)
         library_assignment = self.query(url, self._session.post, json=params, headers=headers)
+        self.clearCache('users')
         return user_creation, library_assignment
 
     def createExistingUser(self, user, server, sections=None, allowSync=False, allowCameraUpload=False,
@@ -360,10 +416,13 @@ class MyPlexAccount(PlexObject):
             }
             url = self.FRIENDINVITE.format(machineId=machineId)
             library_assignment = self.query(url, self._session.post, json=params, headers=headers)
+            self.clearCache('users')
             return user_creation, library_assignment
 
         url = self.EXISTINGUSER.format(username=username)
-        return self.query(url, self._session.post, headers=headers)
+        response = self.query(url, self._session.post, headers=headers)
+        self.clearCache('users')
+        return response
 
     def removeFriend(self, user):
         """ Remove the specified user from all sharing.
@@ -374,7 +433,9 @@ class MyPlexAccount(PlexObject):
         user = self.user(user)
         url = self.FRIENDUPDATE if user.friend else self.REMOVEINVITE
         url = url.format(userId=user.id)
-        return self.query(url, self._session.delete)
+        response = self.query(url, self._session.delete)
+        self.clearCache('users')
+        return response
 
     def removeHomeUser(self, user):
         """ Remove the specified managed user from home.
@@ -384,7 +445,9 @@ class MyPlexAccount(PlexObject):
         """
         user = self.user(user)
         url = self.REMOVEHOMEUSER.format(userId=user.id)
-        return self.query(url, self._session.delete)
+        response = self.query(url, self._session.delete)
+        self.clearCache('users')
+        return response
 
     def updateFriend(self, user, server, sections=None, removeSections=False, allowSync=None, allowCameraUpload=None,
                      allowChannels=None, filterMovies=None, filterTelevision=None, filterMusic=None):
@@ -451,6 +514,7 @@ class MyPlexAccount(PlexObject):
         if params:
             url += joinArgs(params)
             response_filters = self.query(url, self._session.put)
+        self.clearCache('users')
         return response_servers, response_filters
 
     def user(self, username):
@@ -459,44 +523,39 @@ class MyPlexAccount(PlexObject):
             Parameters:
                 username (str): Username, email or id of the user to return.
         """
-        for user in self.users():
-            # Home users don't have email, username etc.
-            if username.lower() == user.title.lower():
-                return user
-
-            elif (user.username and user.email and user.id and username.lower() in
-                  (user.username.lower(), user.email.lower(), str(user.id))):
-                return user
-
-        raise NotFound('Unable to find user %s' % username)
+        user = self._users()[1].get(str(username).lower())
+        if user is None:
+            raise NotFound('Unable to find user %s' % username)
+        return user
 
     def users(self):
         """ Returns a list of all :class:`~plexapi.myplex.MyPlexUser` objects connected to your account.
             This includes both friends and pending invites. You can reference the user.friend to
             distinguish between the two.
         """
-        friends = [MyPlexUser(self, elem) for elem in self.query(MyPlexUser.key)]
-        requested = [MyPlexUser(self, elem, self.REQUESTED) for elem in self.query(self.REQUESTED)]
-        return friends + requested
+        return list(self._users()[0])
+
+    def _users(self):
+        def _load():
+            friends = [MyPlexUser(self, elem) for elem in self.query(MyPlexUser.key)]
+            requested = [MyPlexUser(self, elem, self.REQUESTED) for elem in self.query(self.REQUESTED)]
+            return friends + requested
+        # Home users don't have email, username etc.
+        return self._cached('users', _load, lambda u: (u.title, u.username, u.email, u.id))
 
     def _getSectionIds(self, server, sections):
         """ Converts a list of section objects or names to sectionIds needed for library sharing. """
         if not sections: return []
         # Get a list of all section ids for looking up each section.
-        allSectionIds = {}
         machineIdentifier = server.machineIdentifier if isinstance(server, PlexServer) else server
         url = self.PLEXSERVERS.replace('{machineId}', machineIdentifier)
-        data = self.query(url, self._session.get)
-        for elem in data[0]:
-            allSectionIds[elem.attrib.get('id', '').lower()] = elem.attrib.get('id')
-            allSectionIds[elem.attrib.get('title', '').lower()] = elem.attrib.get('id')
-            allSectionIds[elem.attrib.get('key', '').lower()] = elem.attrib.get('id')
-        log.debug(allSectionIds)
+        _, allSections = self._cached('sections:%s' % machineIdentifier, lambda: list(self.query(url)[0]),
+            lambda elem: (elem.attrib.get('id'), elem.attrib.get('title'), elem.attrib.get('key')))
         # Convert passed in section items to section ids from above lookup
         sectionIds = []
         for section in sections:
             sectionKey = section.key if isinstance(section, LibrarySection) else section
-            sectionIds.append(allSectionIds[sectionKey.lower()])
+            sectionIds.append(allSections[sectionKey.lower()].attrib.get('id'))
         return sectionIds
 
     def _filterDictToStr(self, filterDict):
@@ -557,7 +616,7 @@ class MyPlexAccount(PlexObject):
         if client:
             clientId = client.clientIdentifier
         elif clientId is None:
-            clientId = X_PLEX_IDENTIFIER
+            clientId = plexapi.X_PLEX_IDENTIFIER
 
         data = self.query(SyncList.key.format(clientId=clientId))
 
@@ -583,7 +642,7 @@ class MyPlexAccount(PlexObject):
                 :class:`plexapi.exceptions.BadRequest`: provided client doesn`t provides `sync-target`.
         """
         if not client and not clientId:
-            clientId = X_PLEX_IDENTIFIER
+            clientId = plexapi.X_PLEX_IDENTIFIER
 
         if not client:
             for device in self.devices():
@@ -649,6 +708,19 @@ class MyPlexAccount(PlexObject):
             hist.extend(conn.history(maxresults=maxresults, mindate=mindate, accountID=1))
         return hist
 
+    def iterHistory(self, cursor=None, mindate=None):
+        """ Returns a :class:`~plexapi.server.HistoryIterator` over the Play History of all
+            library sections on all servers for the owner, server after server, oldest first.
+            The servers are connected to when their turn comes.
+
+            Parameters:
+                cursor (str): Cursor of a previous iteration to resume from (optional).
+                mindate (datetime): Min datetime to return results from.
+        """
+        sources = [historySource(x.clientIdentifier, x.connect, accountID=1)
+                   for x in self.resources() if x.provides == 'server' and x.owned]
+        return HistoryIterator(sources, cursor, mindate)
+
     def videoOnDemand(self):
         """ Returns a list of VOD Hub items :class:`~plexapi.library.Hub`
         """
@@ -683,8 +755,8 @@ class MyPlexAccount(PlexObject):
         req = requests.get(self.MUSIC + 'hubs/', headers={'X-Plex-Token': self._token})
         elem = ElementTree.fromstring(req.text)
         return self.findItems(elem)
-      
-   def iptv(self):
+
+    def iptv(self):
         """ Returns a list of IPTV Hub items :class:`~plexapi.library.Hub`
         """
         req = requests.get(self.IPTV + 'hubs/sections/all/', headers={'X-Plex-Token': self._token})
@@ -779,6 +851,16 @@ class MyPlexUser(PlexObject):
             hist.extend(server.history(maxresults=maxresults, mindate=mindate))
         return hist
 
+    def iterHistory(self, cursor=None, mindate=None):
+        """ Returns a :class:`~plexapi.server.HistoryIterator` over all Play History for a user
+            in all shared servers, server after server, oldest first.
+
+            Parameters:
+                cursor (str): Cursor of a previous iteration to resume from (optional).
+                mindate (datetime): Min datetime to return results from.
+        """
+        return HistoryIterator([server._historySource() for server in self.servers], cursor, mindate)
+
 
 class Section(PlexObject):
     """ This refers to a shared section. The raw xml for the data presented here
@@ -815,6 +897,16 @@ class Section(PlexObject):
         return server.history(maxresults=maxresults, mindate=mindate,
                               accountID=self._server.accountID, librarySectionID=self.sectionKey)
 
+    def iterHistory(self, cursor=None, mindate=None):
+        """ Returns a :class:`~plexapi.server.HistoryIterator` over all Play History for a user
+            for this section in this shared server, oldest first.
+
+            Parameters:
+                cursor (str): Cursor of a previous iteration to resume from (optional).
+                mindate (datetime): Min datetime to return results from.
+        """
+        return HistoryIterator([self._server._historySource(self.sectionKey)], cursor, mindate)
+
 
 class MyPlexServerShare(PlexObject):
     """ Represents a single user's server reference. Used for library sharing.
@@ -881,6 +973,23 @@ class MyPlexServerShare(PlexObject):
         server = self._server.resource(self.name).connect()
         return server.history(maxresults=maxresults, mindate=mindate, accountID=self.accountID)
 
+    def iterHistory(self, cursor=None, mindate=None):
+        """ Returns a :class:`~plexapi.server.HistoryIterator` over all Play History for a user
+            in this shared server, oldest first.
+
+            Parameters:
+                cursor (str): Cursor of a previous iteration to resume from (optional).
+                mindate (datetime): Min datetime to return results from.
+        """
+        return HistoryIterator([self._historySource()], cursor, mindate)
+
+    def _historySource(self, librarySectionID=None):
+        """ Returns the HistoryIterator source of the user's history in this server,
+            connecting to the server on first use.
+        """
+        return historySource(self.machineIdentifier, lambda: self._server.resource(self.name).connect(),
+                             accountID=self.accountID, librarySectionID=librarySectionID)
+
 
 class MyPlexResource(PlexObject):
     """ This object represents resources connected to your Plex server that can provide
@@ -941,13 +1050,15 @@ class MyPlexResource(PlexObject):
         """ Returns a new :class:`~server.PlexServer` or :class:`~client.PlexClient` object.
             Often times there is more than one address specified for a server or client.
             This function will prioritize local connections before remote and HTTPS before HTTP.
-            After trying to connect to all available addresses for this resource and
-            assuming at least one connection was successful, the PlexServer object is built and returned.
+            All available addresses are tried in parallel and the PlexServer object of the best
+            address is returned as soon as every better address failed. The winning address is
+            remembered for `plexapi.connection_cache_ttl` seconds and tried first next time.
 
             Parameters:
                 ssl (optional): Set True to only connect to HTTPS connections. Set False to
                     only connect to HTTP connections. Set None (default) to connect to any
                     HTTP or HTTPS connection.
+                timeout (int): Timeout in seconds for each connection attempt.
 
             Raises:
                 :class:`plexapi.exceptions.NotFound`: When unable to connect to any addresses for this resource.
@@ -965,10 +1076,9 @@ class MyPlexResource(PlexObject):
         else: connections = https + http
         # Try connecting to all known resource connections in parellel, but
         # only return the first server (in order) that provides a response.
-        listargs = [[cls, url, self.accessToken, timeout] for url in connections]
-        log.info('Testing %s resource connections..', len(listargs))
-        results = utils.threaded(_connect, listargs)
-        return _chooseConnection('Resource', self.name, results)
+        log.info('Testing %s resource connections..', len(connections))
+        return _raceConnections('Resource', self.name, cls, connections, self.accessToken,
+            timeout, self.clientIdentifier)
 
 
 class ResourceConnection(PlexObject):
@@ -1053,22 +1163,23 @@ class MyPlexDevice(PlexObject):
     def connect(self, timeout=None):
         """ Returns a new :class:`~plexapi.client.PlexClient` or :class:`~plexapi.server.PlexServer`
             Sometimes there is more than one address specified for a server or client.
-            After trying to connect to all available addresses for this client and assuming
-            at least one connection was successful, the PlexClient object is built and returned.
+            All available addresses are tried in parallel and the PlexClient object of the first
+            address (in order) that responds is returned. The winning address is remembered for
+            `plexapi.connection_cache_ttl` seconds and tried first next time.
 
             Raises:
                 :class:`plexapi.exceptions.NotFound`: When unable to connect to any addresses for this device.
         """
         cls = PlexServer if 'server' in self.provides else PlexClient
-        listargs = [[cls, url, self.token, timeout] for url in self.connections]
-        log.info('Testing %s device connections..', len(listargs))
-        results = utils.threaded(_connect, listargs)
-        return _chooseConnection('Device', self.name, results)
+        log.info('Testing %s device connections..', len(self.connections))
+        return _raceConnections('Device', self.name, cls, self.connections, self.token,
+            timeout, self.clientIdentifier)
 
     def delete(self):
         """ Remove this device from your account. """
         key = 'https://plex.tv/devices/%s.xml' % self.id
         self._server.query(key, self._server._session.delete)
+        self._server.clearCache('devices')
 
     def syncItems(self):
         """ Returns an instance of :class:`plexapi.sync.SyncList` for current device.
@@ -1252,7 +1363,7 @@ class MyPlexPinLogin(object):
     def _query(self, url, method=None):
         method = method or self._session.get
         log.debug('%s %s', method.__name__.upper(), url)
-        headers = BASE_HEADERS.copy()
+        headers = plexapi.BASE_HEADERS.copy()
         response = method(url, headers=headers, timeout=self._requestTimeout)
         if not response.ok:  # pragma: no cover
             codename = codes.get(response.status_code)[0]
@@ -1302,3 +1413,91 @@ def _chooseConnection(ctype, name, results):
         log.info('Connecting to %s: %s?X-Plex-Token=%s', ctype, results[0]._baseurl, results[0]._token)
         return results[0]
     raise NotFound('Unable to connect to %s: %s' % (ctype.lower(), name))
+
+
+def _raceConnections(ctype, name, cls, urls, token, timeout=None, cachekey=None):
+    """ Connects to all urls in parallel and returns the first (best) connection as soon as every
+        higher priority url failed (or the first connection established at all when
+        X_PLEX_ENABLE_FAST_CONNECT is True). Slower connection attempts are cancelled or left to
+        finish in the background. When a remembered connection for cachekey is still valid it is
+        tried on its own first. The attempts deliberately run on a short-lived executor rather
+        than the shared :func:`~plexapi.utils.executor`: the losing ones are left to time out in
+        the background and must not hold the threads of the shared executor meanwhile.
+
+        Arguments:
+            ctype (str): Connection type used in log and error messages (Resource or Device).
+            name (str): Name of the resource or device.
+            cls: :class:`~plexapi.client.PlexClient` or :class:`~plexapi.server.PlexServer`.
+            urls (list): Urls to try, ordered from best to worst.
+            token (str): Authentication token passed to cls.__init__().
+            timeout (int): Timeout passed to cls.__init__().
+            cachekey (str): Key to remember the winning url under (usually the clientIdentifier).
+    """
+    cached = _cachedConnection(cachekey, urls)
+    if cached:
+        result = _tryConnect(cls, cached, token, timeout)
+        if result:
+            return _chooseConnection(ctype, name, [result])
+        urls = [url for url in urls if url != cached]
+    listargs = [[cls, url, token, timeout] for url in urls]
+    pool = ThreadPoolExecutor(max_workers=max(len(listargs), 1), thread_name_prefix='plexapi-connect')
+    try:
+        results = utils.parallel(_tryConnect, listargs, mode=utils.FIRST_COMPLETED,
+            ordered=not X_PLEX_ENABLE_FAST_CONNECT, timeout=timeout or TIMEOUT, pool=pool)
+    finally:
+        pool.shutdown(wait=False)
+    results = [r for r in results if r is not None]
+    device = _chooseConnection(ctype, name, results)
+    _cacheConnection(cachekey, results[0][0])
+    return device
+
+
+def _tryConnect(cls, url, token, timeout):
+    """ Returns the :func:`~plexapi.myplex._connect` result for url or None when it failed. """
+    results = [None]
+    _connect(cls, url, token, timeout, results, 0)
+    return results[0] if results[0][2] is not None else None
+
+
+_connectionCacheLock = threading.Lock()
+
+
+def _loadConnectionCache():
+    try:
+        with open(CONNECTION_CACHE_PATH) as handle:
+            return json.load(handle)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def _cachedConnection(key, urls):
+    """ Returns the remembered url for key if it did not expire and is one of urls. """
+    if not key or CONNECTION_CACHE_TTL <= 0:
+        return None
+    with _connectionCacheLock:
+        entry = _loadConnectionCache().get(key) or {}
+    if entry.get('uri') in urls and time.time() - entry.get('timestamp', 0) < CONNECTION_CACHE_TTL:
+        log.debug('Using remembered connection for %s: %s', key, entry['uri'])
+        return entry['uri']
+    return None
+
+
+def _cacheConnection(key, url):
+    """ Remembers url as the winning connection for key and drops expired entries. """
+    if not key or CONNECTION_CACHE_TTL <= 0:
+        return
+    with _connectionCacheLock:
+        now = int(time.time())
+        cache = {k: v for k, v in _loadConnectionCache().items()
+            if now - v.get('timestamp', 0) < CONNECTION_CACHE_TTL}
+        cache[key] = {'uri': url, 'timestamp': now}
+        try:
+            dirname = os.path.dirname(CONNECTION_CACHE_PATH)
+            if dirname and not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            tmppath = '%s.%s.tmp' % (CONNECTION_CACHE_PATH, os.getpid())
+            with open(tmppath, 'w') as handle:
+                json.dump(cache, handle)
+            os.replace(tmppath, CONNECTION_CACHE_PATH)
+        except (IOError, OSError) as err:
+            log.debug('Unable to save connection cache %s: %s', CONNECTION_CACHE_PATH, err)
@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+import functools
+import re
+import sys
+import threading
+from time import perf_counter
+from urllib.parse import urlsplit
+
+from plexapi import log
+
+_lock = threading.Lock()
+_cprofileLock = threading.Lock()
+_local = threading.local()
+_active = []  # running profiles
+_patched = []  # (cls, name, original) restored when the last profile stops
+
+
+class EndpointStats(object):
+    """ Counters and timings of the requests sent to a single endpoint.
+
+        Attributes:
+            endpoint (str): Path of the endpoint, numeric parts replaced by {id}.
+            calls (int): Number of requests.
+            errors (int): Number of requests raising an error.
+            network (float): Seconds spent sending the requests and receiving the responses.
+            parse (float): Seconds spent decoding and parsing the XML responses.
+            build (float): Seconds spent building objects from the responses.
+            objects (int): Number of objects built, including nested media, streams and tags.
+    """
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.calls = 0
+        self.errors = 0
+        self.network = 0.0
+        self.parse = 0.0
+        self.build = 0.0
+        self.objects = 0
+
+    def __repr__(self):
+        return '<%s:%s:%s>' % (self.__class__.__name__, self.endpoint, self.calls)
+
+    @property
+    def total(self):
+        """ Seconds spent on the network, parsing and building. """
+        return self.network + self.parse + self.build
+
+
+class ReloadStats(object):
+    """ Counters and timings of the reloads of a single object class.
+
+        Attributes:
+            cls (str): Name of the reloaded class.
+            implicit (int): Number of reloads triggered by accessing a missing attribute
+                of a partial object.
+            explicit (int): Number of reloads called directly.
+            seconds (float): Seconds spent reloading (also counted in the endpoint stats).
+    """
+
+    def __init__(self, cls):
+        self.cls = cls
+        self.implicit = 0
+        self.explicit = 0
+        self.seconds = 0.0
+
+    def __repr__(self):
+        return '<%s:%s:%s>' % (self.__class__.__name__, self.cls, self.implicit + self.explicit)
+
+
+class Profile(object):
+    """ Splits the time spent in PlexAPI between the network, XML parsing and building
+        objects, per endpoint. Use it through :func:`plexapi.profile`::
+
+            with plexapi.profile() as p:
+                plex.library.section('Movies').all()
+            print(p.report())
+
+        While a profile is running, :func:`~plexapi.server.PlexServer.query`,
+        :func:`~plexapi.myplex.MyPlexAccount.query`, :func:`~plexapi.client.PlexClient.query`,
+        :func:`~plexapi.base.PlexObject._buildItem` and :func:`~plexapi.base.PlexObject.reload`
+        (and its overrides) are wrapped to record their timings; nothing is recorded or wrapped otherwise. Build
+        times are attributed to the endpoint last queried by the same thread.
+
+        Parameters:
+            cprofile (bool): Also collect cProfile stacks of the build phase, see
+                :func:`~plexapi.profiler.Profile.stats`. This slows the builds down.
+
+        Attributes:
+            endpoints (dict): :class:`~plexapi.profiler.EndpointStats` per endpoint.
+            reloads (dict): :class:`~plexapi.profiler.ReloadStats` per class name.
+            elapsed (float): Wall clock seconds the profile was running.
+    """
+
+    def __init__(self, cprofile=False):
+        self.endpoints = {}
+        self.reloads = {}
+        self.elapsed = 0.0
+        self._cprofile = None
+        if cprofile:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+        self._started = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self):
+        """ Starts recording and returns self. """
+        with _lock:
+            if not _active:
+                _install()
+            _active.append(self)
+        self._started = perf_counter()
+        return self
+
+    def stop(self):
+        """ Stops recording. """
+        with _lock:
+            if self in _active:
+                _active.remove(self)
+                self.elapsed += perf_counter() - self._started
+            if not _active:
+                _uninstall()
+
+    @property
+    def totals(self):
+        """ :class:`~plexapi.profiler.EndpointStats` summed over all endpoints. """
+        totals = EndpointStats('total')
+        for stats in list(self.endpoints.values()):
+            for attr in ('calls', 'errors', 'network', 'parse', 'build', 'objects'):
+                setattr(totals, attr, getattr(totals, attr) + getattr(stats, attr))
+        return totals
+
+    def stats(self):
+        """ Returns the pstats.Stats of the build phase or None if the profile was not
+            created with cprofile=True. Only one thread's build is sampled at a time.
+        """
+        if self._cprofile is None:
+            return None
+        import pstats
+        return pstats.Stats(self._cprofile)
+
+    def report(self, sort='total', limit=None):
+        """ Returns a text table of the endpoint and reload stats.
+
+            Parameters:
+                sort (str): EndpointStats attribute to sort the endpoints by (descending).
+                limit (int): Max number of endpoints to list.
+        """
+        rows = sorted(list(self.endpoints.values()), key=lambda s: getattr(s, sort), reverse=True)[:limit]
+        lines = ['%-48s %6s %6s %9s %9s %9s %9s' % ('endpoint', 'calls', 'errors', 'network', 'parse', 'build',
+                                                   'objects')]
+        for stats in rows + [self.totals]:
+            lines.append('%-48s %6d %6d %8.3fs %8.3fs %8.3fs %9d' % (stats.endpoint[:48], stats.calls, stats.errors,
+                stats.network, stats.parse, stats.build, stats.objects))
+        if self.reloads:
+            lines.append('')
+            lines.append('%-48s %8s %8s %9s' % ('reloads', 'implicit', 'explicit', 'seconds'))
+            for stats in sorted(list(self.reloads.values()), key=lambda s: s.seconds, reverse=True):
+                lines.append('%-48s %8d %8d %8.3fs' % (stats.cls, stats.implicit, stats.explicit, stats.seconds))
+        return '\n'.join(lines)
+
+    def _endpoint(self, endpoint):
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats(endpoint)
+        return stats
+
+
+def endpoint(key):
+    """ Returns the endpoint of a key or url: its path with numeric parts replaced by {id},
+        prefixed with the host for absolute urls. Ex: /library/metadata/{id}/children
+    """
+    parts = urlsplit(key)
+    path = re.sub(r'/\d+(?=/|$)', '/{id}', parts.path) or '/'
+    return '%s%s' % (parts.netloc, path) if parts.netloc and 'plex.tv' in parts.netloc else path
+
+
+def _install():
+    from plexapi import base, client, library, myplex, server  # noqa: F401 (registers the reload overrides)
+    targets = [(server.PlexServer, 'query', _wrapQuery), (myplex.MyPlexAccount, 'query', _wrapQuery),
+               (client.PlexClient, 'query', _wrapQuery), (base.PlexObject, '_buildItem', _wrapBuildItem)]
+    # PlexObject.reload and its overrides (ex: LibrarySection, PlexClient)
+    targets += [(cls, 'reload', _wrapReload) for cls in _subclasses(base.PlexObject) if 'reload' in cls.__dict__]
+    for cls, name, wrapper in targets:
+        original = cls.__dict__[name]
+        _patched.append((cls, name, original))
+        setattr(cls, name, wrapper(original))
+    log.debug('Profiling started')
+
+
+def _subclasses(cls):
+    """ Returns cls and all its subclasses. """
+    classes = [cls]
+    for subclass in cls.__subclasses__():
+        classes += [c for c in _subclasses(subclass) if c not in classes]
+    return classes
+
+
+def _uninstall():
+    while _patched:
+        cls, name, original = _patched.pop()
+        setattr(cls, name, original)
+    log.debug('Profiling stopped')
+
+
+def _record(endpoint, calls=0, errors=0, network=0.0, parse=0.0, build=0.0, objects=0):
+    with _lock:
+        for profile in _active:
+            stats = profile._endpoint(endpoint)
+            stats.calls += calls
+            stats.errors += errors
+            stats.network += network
+            stats.parse += parse
+            stats.build += build
+            stats.objects += objects
+
+
+def _wrapQuery(func):
+    @functools.wraps(func)
+    def query(self, key, method=None, *args, **kwargs):
+        method = method or self._session.get
+        network = [0.0]
+
+        def timedmethod(*margs, **mkwargs):
+            start = perf_counter()
+            try:
+                return method(*margs, **mkwargs)
+            finally:
+                network[0] += perf_counter() - start
+
+        timedmethod.__name__ = method.__name__
+        _local.endpoint = path = endpoint(key)
+        start = perf_counter()
+        try:
+            result = func(self, key, timedmethod, *args, **kwargs)
+        except Exception:
+            _record(path, calls=1, errors=1, network=network[0], parse=max(perf_counter() - start - network[0], 0))
+            raise
+        _record(path, calls=1, network=network[0], parse=max(perf_counter() - start - network[0], 0))
+        return result
+    return query
+
+
+def _wrapBuildItem(func):
+    @functools.wraps(func)
+    def _buildItem(self, elem, *args, **kwargs):
+        if getattr(_local, 'building', False):
+            _local.objects += 1
+            return func(self, elem, *args, **kwargs)
+        _local.building, _local.objects = True, 1
+        cprofile = _startCProfile()
+        start = perf_counter()
+        try:
+            return func(self, elem, *args, **kwargs)
+        finally:
+            elapsed = perf_counter() - start
+            if cprofile:
+                cprofile.disable()
+                _cprofileLock.release()
+            _local.building = False
+            _record(getattr(_local, 'endpoint', '-'), build=elapsed, objects=_local.objects)
+    return _buildItem
+
+
+def _wrapReload(func):
+    from plexapi.base import PlexPartialObject
+    getattributeCode = PlexPartialObject.__getattribute__.__code__
+
+    @functools.wraps(func)
+    def reload(self, *args, **kwargs):
+        reloading = getattr(_local, 'reloading', None)
+        if reloading is self:  # an override calling the reload it overrides
+            return func(self, *args, **kwargs)
+        implicit = sys._getframe(1).f_code is getattributeCode
+        _local.reloading = self
+        start = perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            elapsed = perf_counter() - start
+            _local.reloading = reloading
+            with _lock:
+                for profile in _active:
+                    stats = profile.reloads.get(self.__class__.__name__)
+                    if stats is None:
+                        stats = profile.reloads[self.__class__.__name__] = ReloadStats(self.__class__.__name__)
+                    stats.implicit += implicit
+                    stats.explicit += not implicit
+                    stats.seconds += elapsed
+    return reload
+
+
+def _startCProfile():
+    """ Enables the cProfile of the first running profile asking for one, unless another
+        thread's build is already being sampled. Returns the enabled cProfile or None.
+    """
+    cprofile = next((profile._cprofile for profile in list(_active) if profile._cprofile), None)
+    if cprofile is None or not _cprofileLock.acquire(False):
+        return None
+    try:
+        cprofile.enable()
+    except ValueError:  # another profiler (ex: an outer cProfile run) is active
+        _cprofileLock.release()
+        return None
+    return cprofile
@@ -2,28 +2,16 @@
 from urllib.parse import urlencode
 from xml.etree import ElementTree
 
+import plexapi
 import requests
-# Need these imports to populate utils.PLEXOBJECTS
-from plexapi import (BASE_HEADERS, CONFIG, TIMEOUT, X_PLEX_CONTAINER_SIZE, log,
-                     logfilter)
-from plexapi import media as _media  # noqa: F401
-from plexapi import photo as _photo  # noqa: F401
-from plexapi import playlist as _playlist  # noqa: F401
-from plexapi import utils
-from plexapi import video as _video  # noqa: F401
-from plexapi.alert import AlertListener
+from plexapi import CONFIG, TIMEOUT, X_PLEX_CONTAINER_SIZE, log, logfilter, utils
 from plexapi.base import PlexObject
-from plexapi.client import PlexClient
 from plexapi.exceptions import BadRequest, NotFound, Unauthorized
-from plexapi.library import Hub, Library
-from plexapi.media import Conversion, Optimized
-from plexapi.playlist import Playlist
-from plexapi.playqueue import PlayQueue
-from plexapi.settings import Settings
 from plexapi.utils import cast
 from requests.status_codes import _codes as codes
 
-from plexapi import audio as _audio  # noqa: F401; noqa: F401
+# The media, library, client, alert, .. modules are imported on first use to keep importing
+# plexapi.server fast. PlexObject._buildItem loads the modules populating utils.PLEXOBJECTS.
 
 
 class PlexServer(PlexObject):
@@ -158,7 +146,7 @@ class PlexServer(PlexObject):
 
     def _headers(self, **kwargs):
         """ Returns dict containing base headers for all requests to the server. """
-        headers = BASE_HEADERS.copy()
+        headers = plexapi.BASE_HEADERS.copy()
         if self._token:
             headers['X-Plex-Token'] = self._token
         headers.update(kwargs)
@@ -167,6 +155,7 @@ class PlexServer(PlexObject):
     @property
     def library(self):
         """ Library to browse or search your media. """
+        from plexapi.library import Library
         if not self._library:
             try:
                 data = self.query(Library.key)
@@ -181,6 +170,7 @@ class PlexServer(PlexObject):
     @property
     def settings(self):
         """ Returns a list of all server settings. """
+        from plexapi.settings import Settings
         if not self._settings:
             data = self.query(Settings.key)
             self._settings = Settings(self, data)
@@ -251,6 +241,7 @@ class PlexServer(PlexObject):
 
     def clients(self):
         """ Returns list of all :class:`~plexapi.client.PlexClient` objects connected to server. """
+        from plexapi.client import PlexClient
         items = []
         ports = None
         for elem in self.query('/clients'):
@@ -287,6 +278,7 @@ class PlexServer(PlexObject):
                 title (str): Title of the playlist to be created.
                 items (list<Media>): List of media items to include in the playlist.
         """
+        from plexapi.playlist import Playlist
         return Playlist.create(self, title, items=items, limit=limit, section=section, smart=smart, **kwargs)
 
     def createPlayQueue(self, item, **kwargs):
@@ -296,27 +288,40 @@ class PlexServer(PlexObject):
                 item (Media or Playlist): Media or playlist to add to PlayQueue.
                 kwargs (dict): See `~plexapi.playerque.PlayQueue.create`.
         """
+        from plexapi.playqueue import PlayQueue
         return PlayQueue.create(self, item, **kwargs)
 
-    def downloadDatabases(self, savepath=None, unpack=False):
+    def downloadDatabases(self, savepath=None, unpack=False, stream=False, inmemory=False):
         """ Download databases.
 
             Parameters:
                 savepath (str): Defaults to current working dir.
                 unpack (bool): Unpack the zip file.
+                stream (bool): Unpack the zip file while downloading it instead of saving the
+                    zip file first. Returns the list of extracted filepaths.
+                inmemory (bool): Unpack the zip file while downloading it and return a dict of
+                    {filename: BytesIO} instead of writing anything to disk.
         """
         url = self.url('/diagnostics/databases')
+        if stream or inmemory:
+            return utils.downloadUnpacked(url, self._token, savepath, self._session, inmemory)
         filepath = utils.download(url, self._token, None, savepath, self._session, unpack=unpack)
         return filepath
 
-    def downloadLogs(self, savepath=None, unpack=False):
+    def downloadLogs(self, savepath=None, unpack=False, stream=False, inmemory=False):
         """ Download server logs.
 
             Parameters:
                 savepath (str): Defaults to current working dir.
                 unpack (bool): Unpack the zip file.
+                stream (bool): Unpack the zip file while downloading it instead of saving the
+                    zip file first. Returns the list of extracted filepaths.
+                inmemory (bool): Unpack the zip file while downloading it and return a dict of
+                    {filename: BytesIO} instead of writing anything to disk.
         """
         url = self.url('/diagnostics/logs')
+        if stream or inmemory:
+            return utils.downloadUnpacked(url, self._token, savepath, self._session, inmemory)
         filepath = utils.download(url, self._token, None, savepath, self._session, unpack=unpack)
         return filepath
 
@@ -363,24 +368,64 @@ class PlexServer(PlexObject):
                 accountID (int/str) Request history for a specific account ID.
                 librarySectionID (int/str) Request history for a specific library section ID.
         """
-        results, subresults = [], '_init'
-        args = {'sort': 'viewedAt:desc'}
-        if ratingKey:
-            args['metadataItemID'] = ratingKey
-        if accountID:
-            args['accountID'] = accountID
-        if librarySectionID:
-            args['librarySectionID'] = librarySectionID
-        if mindate:
-            args['viewedAt>'] = int(mindate.timestamp())
-        args['X-Plex-Container-Start'] = 0
-        args['X-Plex-Container-Size'] = min(X_PLEX_CONTAINER_SIZE, maxresults)
-        while subresults and maxresults > len(results):
-            key = '/status/sessions/history/all%s' % utils.joinArgs(args)
-            subresults = self.fetchItems(key)
-            results += subresults[:maxresults - len(results)]
-            args['X-Plex-Container-Start'] += args['X-Plex-Container-Size']
-        return results
+        sources = [historySource(self.machineIdentifier, self, ratingKey, accountID, librarySectionID)]
+        return list(HistoryIterator(sources, mindate=mindate, maxresults=maxresults, reverse=True,
+                                    container_size=min(X_PLEX_CONTAINER_SIZE, maxresults)))
+
+    def iterHistory(self, cursor=None, mindate=None, ratingKey=None, accountID=None, librarySectionID=None,
+                    container_size=X_PLEX_CONTAINER_SIZE):
+        """ Returns a :class:`~plexapi.server.HistoryIterator` over the watched history, oldest
+            first, fetching a page at a time and resuming after the cursor of a previous iteration.
+
+            Parameters:
+                cursor (str): :attr:`~plexapi.server.HistoryIterator.cursor` of a previous iteration.
+                mindate (datetime): Min datetime to return results from.
+                ratingKey (int/str) Request history for a specific ratingKey item.
+                accountID (int/str) Request history for a specific account ID.
+                librarySectionID (int/str) Request history for a specific library section ID.
+                container_size (int): Number of items requested per page.
+        """
+        sources = [historySource(self.machineIdentifier, self, ratingKey, accountID, librarySectionID)]
+        return HistoryIterator(sources, cursor, mindate, container_size=container_size)
+
+    def markWatched(self, items, maxworkers=8, ratelimit=None):
+        """ Mark many items as watched using a bounded pool of worker threads. Unlike
+            :func:`~plexapi.video.Video.markWatched` the items are not reloaded afterwards.
+            Returns a list of `(item, error)` tuples for every item that failed; an empty
+            list means all items were marked.
+
+            Parameters:
+                items (list): List of media items (or ratingKeys) to mark as watched.
+                maxworkers (int): Max number of concurrent requests (default 8).
+                ratelimit (float): Max number of requests per second (optional).
+        """
+        return self._scrobble('/:/scrobble', items, maxworkers, ratelimit)
+
+    def markUnwatched(self, items, maxworkers=8, ratelimit=None):
+        """ Mark many items as unwatched. See :func:`~plexapi.server.PlexServer.markWatched`
+            for the parameters and return value.
+        """
+        return self._scrobble('/:/unscrobble', items, maxworkers, ratelimit)
+
+    def _scrobble(self, path, items, maxworkers=8, ratelimit=None):
+        """ Calls the scrobble endpoint `path` for each item concurrently. """
+        limiter = utils.RateLimiter(ratelimit)
+
+        def _scrobbleItem(item):
+            limiter.wait()
+            ratingKey = getattr(item, 'ratingKey', item)
+            key = '%s?key=%s&identifier=com.plexapp.plugins.library' % (path, ratingKey)
+            self.query(key)
+
+        failures = []
+        futures = utils.runAll(_scrobbleItem, [(item,) for item in items], maxworkers)
+        for item, future in zip(items, futures):
+            err = future.exception()
+            if err is not None:
+                log.warning('Failed to scrobble %s: %s', item, err)
+                failures.append((item, err))
+        log.info('Scrobbled %s items (%s failed)', len(futures), len(failures))
+        return failures
 
     def playlists(self):
         """ Returns a list of all :class:`~plexapi.playlist.Playlist` objects saved on the server. """
@@ -405,6 +450,7 @@ class PlexServer(PlexObject):
             key = '/playlists/generators?type=42'
             self.query(key, method=self._server._session.delete)
         else:
+            from plexapi.media import Optimized
             backgroundProcessing = self.fetchItem('/playlists?type=42')
             return self.fetchItems('%s/items' % backgroundProcessing.key, cls=Optimized)
 
@@ -423,6 +469,7 @@ class PlexServer(PlexObject):
         elif pause is False:
             self.query('/:/prefs?BackgroundQueueIdlePaused=0', method=self._server._session.put)
         else:
+            from plexapi.media import Conversion
             return self.fetchItems('/playQueues/1', cls=Conversion)
 
     def currentBackgroundProcess(self):
@@ -470,6 +517,7 @@ class PlexServer(PlexObject):
                 mediatype (str): Optionally limit your search to the specified media type.
                 limit (int): Optionally limit to the specified number of results per Hub.
         """
+        from plexapi.library import Hub
         results = []
         params = {'query': query}
         if mediatype:
@@ -485,7 +533,7 @@ class PlexServer(PlexObject):
         """ Returns a list of all active session (currently playing) media objects. """
         return self.fetchItems('/status/sessions')
 
-    def startAlertListener(self, callback=None):
+    def startAlertListener(self, callback=None, **kwargs):
         """ Creates a websocket connection to the Plex Server to optionally recieve
             notifications. These often include messages from Plex about media scans
             as well as updates to currently running Transcode Sessions.
@@ -495,14 +543,47 @@ class PlexServer(PlexObject):
 
             Parameters:
                 callback (func): Callback function to call on recieved messages.
+                **kwargs (dict): Reconnect and dispatch options of the
+                    :class:`~plexapi.alert.AlertListener`, ex: workers=4.
 
             raises:
                 :class:`plexapi.exception.Unsupported`: Websocket-client not installed.
         """
-        notifier = AlertListener(self, callback)
+        from plexapi.alert import AlertListener
+        notifier = AlertListener(self, callback, **kwargs)
         notifier.start()
         return notifier
 
+    def startSessionMonitor(self, callback=None, **kwargs):
+        """ Starts a :class:`~plexapi.monitor.SessionMonitor` thread reporting the started,
+            paused, resumed, transcode, progress and stopped playback sessions.
+
+            Parameters:
+                callback (func): Function called with each :class:`~plexapi.monitor.SessionEvent`.
+                **kwargs (dict): Polling options of the :class:`~plexapi.monitor.SessionMonitor`,
+                    ex: interval=10 or listener=plex.startAlertListener().
+        """
+        from plexapi.monitor import SessionMonitor
+        monitor = SessionMonitor(self, callback, **kwargs)
+        monitor.start()
+        return monitor
+
+    def alerts(self, types=None, **kwargs):
+        """ Returns an :class:`~plexapi.alert.AlertStream`, an asynchronous iterator over the
+            typed notifications of the server, the asyncio counterpart of
+            :func:`~plexapi.server.PlexServer.startAlertListener`.
+
+            NOTE: You need websockets installed in order to use this feature.
+            >> pip install websockets
+
+            Parameters:
+                types (list): Event classes (or notification types) to yield, default all.
+                **kwargs (dict): Filters and options of the :class:`~plexapi.alert.AlertStream`,
+                    ex: sectionID=1, state=5.
+        """
+        from plexapi.alert import AlertStream
+        return AlertStream(self, types, **kwargs)
+
     def transcodeImage(self, media, height, width, opacity=100, saturation=100):
         """ Returns the URL for a transcoded image from the specified media object.
             Returns None if no media specified (needed if user tries to pass thumb
@@ -619,4 +700,127 @@ class SystemAccount(PlexObject):
         self._data = data
         self.accountID = cast(int, data.attrib.get('id'))
         self.accountKey = data.attrib.get('key')
-        self.name = data.attrib.get('name')
\ No newline at end of file
+        self.name = data.attrib.get('name')
+
+
+class HistoryIterator(object):
+    """ Iterates over the watched history of one or more servers, a page of
+        X_PLEX_CONTAINER_SIZE items at a time, so only one page is held in memory. Returned
+        by the `iterHistory()` methods of :class:`~plexapi.server.PlexServer`, the library
+        sections, media items and plex.tv accounts and users.
+
+        Oldest plays come first and :attr:`cursor` is updated as the items are consumed. Pass
+        it to the next `iterHistory()` call to resume after the last play received, ex: to
+        only fetch the new plays since the previous run of a job::
+
+            plays = plex.iterHistory(cursor=saved)
+            for play in plays:
+                ingest(play)
+            saved = plays.cursor
+
+        Parameters:
+            sources (list): List of (name, server, args) tuples: the name identifying the
+                source in the cursor, the :class:`~plexapi.server.PlexServer` (or a function
+                returning it, to connect on first use) and the filters of its history.
+            cursor (str): Cursor of a previous iteration, the plays up to it are skipped.
+            mindate (datetime): Min datetime to return results from.
+            maxresults (int): Max number of items to return.
+            reverse (bool): Newest plays first. The cursor is not available in this order.
+            container_size (int): Number of items requested per page.
+
+        Attributes:
+            cursor (str): Opaque position after the last returned play of each source.
+    """
+    key = '/status/sessions/history/all'
+
+    def __init__(self, sources, cursor=None, mindate=None, maxresults=None, reverse=False,
+                 container_size=X_PLEX_CONTAINER_SIZE):
+        if cursor and reverse:
+            raise BadRequest('The history cursor is only available from the oldest plays')
+        self._sources = sources
+        self._positions = self._parseCursor(cursor)
+        self._mindate = int(mindate.timestamp()) if mindate else None
+        self._maxresults = maxresults
+        self._reverse = reverse
+        self._container_size = container_size
+        self._items = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._items is None:
+            self._items = self._iterate()
+        return next(self._items)
+
+    @property
+    def cursor(self):
+        return ';'.join('%s=%s:%s' % (name, viewedAt, ','.join(sorted(ids)))
+                        for name, (viewedAt, ids) in sorted(self._positions.items()))
+
+    def _iterate(self):
+        count = 0
+        for name, server, args in self._sources:
+            viewedAt, ids = self._positions.get(name, (None, set()))
+            args = dict(args, sort='viewedAt:desc' if self._reverse else 'viewedAt:asc')
+            # include the plays of the cursor second, they are skipped by history key below
+            minimum = max(viewedAt - 1 if viewedAt is not None else -1, self._mindate or -1)
+            if minimum >= 0:
+                args['viewedAt>'] = minimum
+            args['X-Plex-Container-Start'] = 0
+            args['X-Plex-Container-Size'] = self._container_size
+            server = server() if callable(server) else server
+            while True:
+                items = server.fetchItems('%s%s' % (self.key, utils.joinArgs(args)))
+                for item in items:
+                    if not self._reverse:
+                        itemViewedAt = int(item.viewedAt.timestamp()) if item.viewedAt else 0
+                        itemID = (item.historyKey or '').rsplit('/', 1)[-1]
+                        seen = itemViewedAt == viewedAt and itemID in ids
+                        if viewedAt is not None and (itemViewedAt < viewedAt or seen):
+                            continue
+                        if itemViewedAt != viewedAt:
+                            viewedAt, ids = itemViewedAt, set()
+                        ids.add(itemID)
+                        self._positions[name] = (viewedAt, ids)
+                    yield item
+                    count += 1
+                    if self._maxresults is not None and count >= self._maxresults:
+                        return
+                if len(items) < self._container_size:
+                    break
+                args['X-Plex-Container-Start'] += self._container_size
+
+    @staticmethod
+    def _parseCursor(cursor):
+        positions = {}
+        for part in (cursor or '').split(';'):
+            if part:
+                try:
+                    name, position = part.rsplit('=', 1)
+                    viewedAt, ids = position.split(':', 1)
+                    positions[name] = (int(viewedAt), set(filter(None, ids.split(','))))
+                except ValueError:
+                    raise BadRequest('Invalid history cursor: %s' % cursor)
+        return positions
+
+
+def historySource(machineIdentifier, server, ratingKey=None, accountID=None, librarySectionID=None):
+    """ Returns a (name, server, args) source of a :class:`~plexapi.server.HistoryIterator`.
+
+        Parameters:
+            machineIdentifier (str): Identifier of the server, part of the name in the cursor.
+            server (:class:`~plexapi.server.PlexServer`): Server or function returning it.
+            ratingKey (int/str) Request history for a specific ratingKey item.
+            accountID (int/str) Request history for a specific account ID.
+            librarySectionID (int/str) Request history for a specific library section ID.
+    """
+    args = {}
+    if ratingKey:
+        args['metadataItemID'] = ratingKey
+    if accountID:
+        args['accountID'] = accountID
+    if librarySectionID:
+        args['librarySectionID'] = librarySectionID
+    name = '/'.join([machineIdentifier] + ['%s%s' % item for item in sorted(args.items())])
+    return name, server, args
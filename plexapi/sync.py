@@ -79,10 +79,10 @@ class SyncItem(PlexObject):
 
     def server(self):
         """ Returns :class:`plexapi.myplex.MyPlexResource` with server of current item. """
-        server = [s for s in self._server.resources() if s.clientIdentifier == self.machineIdentifier]
-        if len(server) == 0:
+        try:
+            return self._server.resource(self.machineIdentifier)
+        except NotFound:
             raise NotFound('Unable to find server with uuid %s' % self.machineIdentifier)
-        return server[0]
 
     def getMedia(self):
         """ Returns list of :class:`~plexapi.base.Playable` which belong to this sync item. """
@@ -1,21 +1,25 @@
 # -*- coding: utf-8 -*-
+import hashlib
+import importlib
+import io
+import json
 import logging
 import os
 import re
+import shutil
+import struct
+import tempfile
 import time
 import zipfile
+import zlib
+from concurrent.futures import (ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor,
+                                wait)
 from datetime import datetime, timedelta
 from getpass import getpass
-from threading import Event, Thread
+from threading import Event, Lock, Semaphore, local
 from urllib.parse import quote
 
-import requests
-from plexapi.exceptions import NotFound
-
-try:
-    from tqdm import tqdm
-except ImportError:
-    tqdm = None
+from plexapi.exceptions import BadRequest, IncompleteDownload, NotFound
 
 log = logging.getLogger('plexapi')
 
@@ -25,6 +29,17 @@ SEARCHTYPES = {'movie': 1, 'show': 2, 'season': 3, 'episode': 4, 'trailer': 5, '
                'artist': 8, 'album': 9, 'track': 10, 'picture': 11, 'clip': 12, 'photo': 13, 'photoalbum': 14,
                'playlist': 15, 'playlistFolder': 16, 'collection': 18, 'userPlaylistItem': 1001}
 PLEXOBJECTS = {}
+# Attributes identifying the items, always returned when projecting the fields of a listing
+PROJECTION_FIELDS = ('key', 'ratingKey', 'type')
+# Child elements of the items excluded from a listing when not in its projected fields
+PROJECTION_ELEMENTS = ('Collection', 'Country', 'Director', 'Field', 'Genre', 'Guid', 'Label', 'Location', 'Media',
+                       'Mood', 'Producer', 'Rating', 'Role', 'Similar', 'Style', 'Writer')
+# Classes of PLEXOBJECTS keyed by the (tag, type) found in the XML (type None for classes
+# registered by tag only), plus the fallbacks resolved by lookupPlexObject.
+PLEXDISPATCH = {}
+# Modules registering PLEXOBJECTS, imported on first lookup miss (see loadPlexObjects)
+PLEXOBJECT_MODULES = ('audio', 'client', 'library', 'media', 'photo', 'playlist', 'settings', 'video')
+_plexObjectsLoaded = False
 
 
 class SecretsFilter(logging.Filter):
@@ -59,9 +74,41 @@ def registerPlexObject(cls):
         raise Exception('Ambiguous PlexObject definition %s(tag=%s, type=%s) with %s' %
             (cls.__name__, cls.TAG, etype, PLEXOBJECTS[ehash].__name__))
     PLEXOBJECTS[ehash] = cls
+    PLEXDISPATCH[(cls.TAG, str(etype) if etype else None)] = cls
     return cls
 
 
+def lookupPlexObject(tag, etype=None):
+    """ Returns the class registered in PLEXOBJECTS for an XML element with the specified tag
+        and type (or streamType), falling back to the class registered for the tag only.
+        Returns None if no class matches. The resolved class is remembered in PLEXDISPATCH
+        so the next lookup of (tag, type) is a single dict access.
+    """
+    key = (tag, etype)
+    ecls = PLEXDISPATCH.get(key)
+    if ecls is None:
+        loadPlexObjects()
+        ecls = (etype and PLEXDISPATCH.get(key)) or PLEXDISPATCH.get((tag, None))
+        if ecls is not None:
+            PLEXDISPATCH[key] = ecls
+    return ecls
+
+
+def loadPlexObjects():
+    """ Imports the modules in PLEXOBJECT_MODULES so all their classes are registered in
+        PLEXOBJECTS. These modules are not imported with plexapi.server to keep the import
+        fast, :func:`~plexapi.utils.lookupPlexObject` calls this on the first element whose
+        tag and type are not registered instead. Returns False if the modules were already loaded.
+    """
+    global _plexObjectsLoaded
+    if _plexObjectsLoaded:
+        return False
+    for name in PLEXOBJECT_MODULES:
+        importlib.import_module('plexapi.%s' % name)
+    _plexObjectsLoaded = True
+    return True
+
+
 def cast(func, value):
     """ Cast the specified value to the specified type (returned by func). Currently this
         only support str, int, float, bool. Should be extended if needed.
@@ -104,6 +151,77 @@ def joinArgs(args):
     return '?%s' % '&'.join(arglist)
 
 
+def projectionArgs(fields=None, exclude=None):
+    """ Returns the includeFields, excludeFields and excludeElements arguments asking the
+        server to only send the specified fields of the items. Names starting with an uppercase
+        letter are child elements (ex: Media, Genre), the others attributes (ex: title).
+
+        Parameters:
+            fields (list): Attributes and elements to return, the attributes identifying the
+                items (PROJECTION_FIELDS) are always included.
+            exclude (list): Attributes and elements not to return.
+    """
+    args = {}
+    keep, dropAttrs, dropElements = _projection(fields, exclude)
+    if keep:
+        args['includeFields'] = ','.join(sorted(keep))
+    if dropAttrs:
+        args['excludeFields'] = ','.join(dropAttrs)
+    if dropElements:
+        args['excludeElements'] = ','.join(sorted(dropElements))
+    return args
+
+
+def projectElements(data, fields=None, exclude=None):
+    """ Removes the attributes and child elements of the items of data not requested by the
+        fields and exclude arguments (see :func:`~plexapi.utils.projectionArgs`), for servers
+        ignoring the projection arguments. Returns data.
+    """
+    if data is None or not (fields or exclude):
+        return data
+    keep, dropAttrs, dropElements = _projection(fields, exclude)
+    for elem in data:
+        for attr in list(elem.attrib):
+            if (keep is not None and attr not in keep) or attr in dropAttrs:
+                del elem.attrib[attr]
+        for child in list(elem):
+            if child.tag in dropElements:
+                elem.remove(child)
+    return data
+
+
+def isProjected(attrstr, fields=None, exclude=None):
+    """ Returns False if the attribute (ex: title) or child element (ex: Media__videoResolution)
+        an item filter looks at is removed by the fields and exclude arguments (see
+        :func:`~plexapi.utils.projectionArgs`).
+    """
+    keep, dropAttrs, dropElements = _projection(fields, exclude)
+    parts = attrstr.lower().split('__')
+    if len(parts) > 1:
+        return parts[0] not in {e.lower() for e in dropElements}
+    if parts[0] == 'etag':
+        return True
+    if keep is not None and parts[0] not in {a.lower() for a in keep}:
+        return False
+    return parts[0] not in {a.lower() for a in dropAttrs}
+
+
+def _projection(fields=None, exclude=None):
+    """ Returns the attributes kept (None for all of them), the attributes removed and the
+        child elements removed by the fields and exclude arguments.
+    """
+    keep, dropAttrs, dropElements = None, [], set()
+    if fields:
+        attrs = [f for f in fields if not f[:1].isupper()]
+        if attrs:
+            keep = set(PROJECTION_FIELDS).union(attrs)
+        dropElements.update(e for e in PROJECTION_ELEMENTS if e not in fields)
+    if exclude:
+        dropAttrs = [f for f in exclude if not f[:1].isupper() and f not in PROJECTION_FIELDS]
+        dropElements.update(e for e in exclude if e[:1].isupper())
+    return keep, dropAttrs, dropElements
+
+
 def lowerFirst(s):
     return s[0].lower() + s[1:]
 
@@ -158,28 +276,184 @@ def searchType(libtype):
 
 def threaded(callback, listargs):
     """ Returns the result of <callback> for each set of \*args in listargs. Each call
-        to <callback> is called concurrently in their own separate threads.
+        to <callback> is called concurrently on the shared :func:`~plexapi.utils.executor`.
+        The callback receives a results list and its index in that list as the last two
+        arguments and a `job_is_done_event` keyword argument; setting the event returns
+        the results collected so far without waiting for the other calls.
 
         Parameters:
             callback (func): Callback function to apply to each set of \*args.
             listargs (list): List of lists; \*args to pass each thread.
     """
-    threads, results = [], []
+    results = [None] * len(listargs)
     job_is_done_event = Event()
-    for args in listargs:
-        args += [results, len(results)]
-        results.append(None)
-        threads.append(Thread(target=callback, args=args, kwargs=dict(job_is_done_event=job_is_done_event)))
-        threads[-1].setDaemon(True)
-        threads[-1].start()
-    while not job_is_done_event.is_set():
-        if all([not t.is_alive() for t in threads]):
-            break
-        time.sleep(0.05)
-
+    pool, owned = _callPool(len(listargs))
+    try:
+        pending = [pool.submit(callback, *(list(args) + [results, i]), job_is_done_event=job_is_done_event)
+            for i, args in enumerate(listargs)]
+        while pending and not job_is_done_event.is_set():
+            _, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in pending:
+            future.cancel()
+    finally:
+        if owned:
+            pool.shutdown(wait=False)
     return [r for r in results if r is not None]
 
 
+_executor = None
+_executorLock = Lock()
+_executorThread = local()
+
+
+def _markExecutorThread():
+    _executorThread.active = True
+
+
+def _callPool(size):
+    """ Returns a tuple of the executor to run `size` calls on and whether the caller has to
+        shut it down. Calls made from a thread of the shared executor run on their own
+        short-lived executor, since waiting for them on the shared executor would hold its
+        threads and deadlock once they are all waiting.
+    """
+    if getattr(_executorThread, 'active', False):
+        return ThreadPoolExecutor(max_workers=max(size, 1), thread_name_prefix='plexapi-nested'), True
+    return executor(), False
+
+
+def executor():
+    """ Returns the shared :class:`~concurrent.futures.ThreadPoolExecutor` used to run requests
+        in parallel. The number of threads is bounded by the `plexapi.max_workers` setting.
+    """
+    global _executor
+    with _executorLock:
+        if _executor is None:
+            from plexapi import MAX_WORKERS
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='plexapi',
+                                           initializer=_markExecutorThread)
+        return _executor
+
+
+def parallel(callback, listargs, mode=ALL_COMPLETED, ordered=False, timeout=None, pool=None):
+    """ Calls <callback> with each set of \*args in listargs concurrently on the shared
+        :func:`~plexapi.utils.executor` and returns the list of results in the order of listargs.
+        Calls that raised an exception, returned None, were cancelled or did not finish in time
+        are None in the returned list. When called from a thread of the shared executor, the
+        calls run on a short-lived executor instead.
+
+        Parameters:
+            callback (func): Callback function to apply to each set of \*args.
+            listargs (list): List of lists; \*args to pass each call.
+            mode (str): ALL_COMPLETED (default) waits for all calls. FIRST_COMPLETED returns as soon
+                as one call returned a result; calls which did not start yet are cancelled and calls
+                still running are left to finish in the background, their results are discarded.
+            ordered (bool): With FIRST_COMPLETED, wait until the first call (in listargs order)
+                returned a result and every call before it failed.
+            timeout (float): Max number of seconds to wait for the calls.
+            pool (:class:`~concurrent.futures.Executor`): Executor to run the calls on instead.
+    """
+    pool, owned = (pool, False) if pool else _callPool(len(listargs))
+    futures = {pool.submit(callback, *args): i for i, args in enumerate(listargs)}
+    results, finished = [None] * len(futures), [False] * len(futures)
+    deadline = time.monotonic() + timeout if timeout else None
+    pending = set(futures)
+    try:
+        while pending:
+            remaining = max(deadline - time.monotonic(), 0) if deadline else None
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                i = futures[future]
+                finished[i] = True
+                try:
+                    results[i] = future.result()
+                except Exception as err:
+                    log.debug('Parallel call %s%s failed: %s', callback.__name__, tuple(listargs[i]), err)
+            if mode == FIRST_COMPLETED and _parallelFinished(results, finished, ordered):
+                break
+    finally:
+        for future in pending:
+            future.cancel()
+        if owned:
+            pool.shutdown(wait=False)
+    return results
+
+
+def runAll(callback, listargs, maxworkers=None):
+    """ Calls <callback> with each set of \*args in listargs on the shared
+        :func:`~plexapi.utils.executor`, waits for all calls and returns their futures in the
+        order of listargs. Unlike :func:`~plexapi.utils.parallel` the exceptions are left on the
+        futures for the caller to handle. When called from a thread of the shared executor, the
+        calls run on a short-lived executor instead.
+
+        Parameters:
+            callback (func): Callback function to apply to each set of \*args.
+            listargs (list): List of lists; \*args to pass each call.
+            maxworkers (int): Max number of calls running at the same time (optional).
+    """
+    pool, owned = _callPool(min(maxworkers or len(listargs), len(listargs)))
+    slots = Semaphore(maxworkers) if maxworkers else None
+    futures = []
+    try:
+        for args in listargs:
+            if slots:
+                # calls are only submitted once a slot is free, so no thread waits for one
+                slots.acquire()
+            future = pool.submit(callback, *args)
+            if slots:
+                future.add_done_callback(lambda future: slots.release())
+            futures.append(future)
+        wait(futures)
+    finally:
+        if owned:
+            pool.shutdown(wait=False)
+    return futures
+
+
+def _parallelFinished(results, finished, ordered):
+    """ Returns True once the first result (in order when ordered is True) is known. """
+    if not ordered:
+        return any(result is not None for result in results)
+    for result, done in zip(results, finished):
+        if not done:
+            return False
+        if result is not None:
+            return True
+    return True
+
+
+class RateLimiter(object):
+    """ Simple thread safe token bucket used to throttle requests or bytes sent to a server.
+        Calling :func:`~plexapi.utils.RateLimiter.wait` blocks until `amount` tokens are
+        available. A rate of None or 0 disables the limiter.
+
+        Parameters:
+            rate (float): Tokens added to the bucket per second (requests/sec, bytes/sec, ..).
+            burst (float): Max number of tokens the bucket can hold (default: rate).
+    """
+
+    def __init__(self, rate=None, burst=None):
+        self.rate = rate
+        self.burst = burst or rate or 0
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def wait(self, amount=1):
+        """ Block until `amount` tokens are available and consume them. """
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0
+        if delay:
+            time.sleep(delay)
+
+
 def toDatetime(value, format=None):
     """ Returns a datetime object from the specified value.
 
@@ -263,39 +537,68 @@ def downloadSessionImages(server, filename=None, height=150, width=150,
     return info
 
 
-def download(url, token, filename=None, savepath=None, session=None, chunksize=4024,
-             unpack=False, mocked=False, showstatus=False):
+def download(url, token, filename=None, savepath=None, session=None, chunksize=1048576,
+             unpack=False, mocked=False, showstatus=False, resume=False, segments=1, retries=3,
+             progress=None, size=None, checksum=None, manifest=False):
     """ Helper to download a thumb, videofile or other media item. Returns the local
-        path to the downloaded file.
+        path to the downloaded file. The data is written to `<filename>.part` and renamed
+        once the download is complete and its length matches the expected size, so
+        interrupted downloads never look finished.
 
        Parameters:
             url (str): URL where the content be reached.
             token (str): Plex auth token to include in headers.
             filename (str): Filename of the downloaded file, default None.
             savepath (str): Defaults to current working dir.
-            chunksize (int): What chunksize read/write at the time.
+            chunksize (int): What chunksize read/write at the time (default 1MB).
             mocked (bool): Helper to do evertything except write the file.
             unpack (bool): Unpack the zip file.
             showstatus(bool): Display a progressbar.
+            resume (bool): Continue a previously interrupted download of this file using
+                HTTP Range requests (if the server supports them).
+            segments (int): Number of connections used to download the file in parallel
+                ranges. Only used when the server reports the file size and range support.
+            retries (int): Number of times a dropped connection is resumed before giving up.
+            progress (func): Callback called with the number of bytes written after each chunk,
+                or with a negative number of bytes when a restarted download discards them.
+                Blocking in this callback throttles the download.
+            size (int): Expected size of the file in bytes (ex: :attr:`~plexapi.media.MediaPart.size`).
+                Defaults to the Content-Length reported by the server, which is not checked for
+                encoded (ex: gzip) responses. Encoded responses are not resumed or segmented either.
+            checksum (str): Name of a hashlib algorithm (ex: sha1) to compute while writing
+                the file. The hex digest is stored in the manifest.
+            manifest (bool): Record completed downloads in `savepath/.plexapi-manifest.json`
+                and return immediately (without any request) for files already listed there.
+
+        Raises:
+            :class:`~plexapi.exceptions.IncompleteDownload`: The downloaded length does not
+                match the expected size.
 
         Example:
             >>> download(a_episode.getStreamURL(), a_episode.location)
             /path/to/file
     """
+    # make sure the savepath directory exists
+    savepath = savepath or os.getcwd()
+    os.makedirs(savepath, exist_ok=True)
+    # skip files which were already completely downloaded
+    if manifest and filename and not mocked:
+        fullpath = _manifestLookup(savepath, filename)
+        if fullpath:
+            log.info('Already downloaded: %s', fullpath)
+            return fullpath
     # fetch the data to be saved
+    import requests
     session = session or requests.Session()
     headers = {'X-Plex-Token': token}
     response = session.get(url, headers=headers, stream=True)
-    # make sure the savepath directory exists
-    savepath = savepath or os.getcwd()
-    os.makedirs(savepath, exist_ok=True)
 
     # try getting filename from header if not specified in arguments (used for logs, db)
     if not filename and response.headers.get('Content-Disposition'):
         filename = re.findall(r'filename=\"(.+)\"', response.headers.get('Content-Disposition'))
         filename = filename[0] if filename[0] else None
 
-    filename = os.path.basename(filename)
+    requested, filename = filename, os.path.basename(filename)
     fullpath = os.path.join(savepath, filename)
     # append file.ext from content-type if not already there
     extension = os.path.splitext(fullpath)[-1]
@@ -311,17 +614,50 @@ def download(url, token, filename=None, savepath=None, session=None, chunksize=4
 
     # save the file to disk
     log.info('Downloading: %s', fullpath)
-    if showstatus and tqdm:  # pragma: no cover
-        total = int(response.headers.get('content-length', 0))
-        bar = tqdm(unit='B', unit_scale=True, total=total, desc=filename)
+    # the Content-Length and byte ranges of an encoded (ex: gzip) response count the
+    # encoded bytes, not the decoded bytes written to the file
+    encoded = _isEncoded(response)
+    total = 0 if encoded else int(response.headers.get('content-length', 0))
+    expected = size or total
+    ranges = not encoded and response.headers.get('accept-ranges') == 'bytes'
+    partpath = '%s.part' % fullpath
+    offset = os.path.getsize(partpath) if resume and ranges and os.path.exists(partpath) else 0
+    bar = _progressBar(expected, offset, filename) if showstatus else None
+    if bar is not None:  # pragma: no cover
+        progress = _chainCallbacks(progress, bar.update)
 
-    with open(fullpath, 'wb') as handle:
-        for chunk in response.iter_content(chunk_size=chunksize):
-            handle.write(chunk)
-            if showstatus and tqdm:
-                bar.update(len(chunk))
+    if segments > 1 and ranges and total and not offset:
+        response.close()
+        # the segments are written out of order to a preallocated file, which is only renamed
+        # to the .part file (the only one resumed) once every segment completed
+        segmentpath = '%s.segments' % fullpath
+        try:
+            _downloadSegments(session, url, headers, segmentpath, total, segments, chunksize, retries, progress)
+        except BaseException:
+            os.remove(segmentpath)
+            raise
+        os.replace(segmentpath, partpath)
+        # segments are written out of order so the checksum needs a pass over the file
+        written = os.path.getsize(partpath)
+        digest = _hashFile(partpath, checksum, written).hexdigest() if checksum else None
+    else:
+        if offset:
+            # The initial response starts at byte 0; request the missing range instead.
+            response.close()
+            response = None
+            log.info('Resuming download at %s bytes: %s', offset, fullpath)
+        written, digest = _downloadStream(session, url, headers, partpath, response, offset, chunksize,
+                                          retries, progress, expected if ranges else None, checksum)
+    if expected and written != expected:
+        if written > expected:
+            os.remove(partpath)
+        raise IncompleteDownload('Downloaded %s of %s bytes: %s' % (written, expected, fullpath))
+    os.replace(partpath, fullpath)
+    if manifest:
+        _manifestUpdate(savepath, requested, {'filename': os.path.basename(fullpath), 'size': written,
+                                              'checksum': digest, 'algorithm': checksum})
 
-    if showstatus and tqdm:  # pragma: no cover
+    if bar is not None:  # pragma: no cover
         bar.close()
     # check we want to unzip the contents
     if fullpath.endswith('zip') and unpack:
@@ -331,6 +667,385 @@ def download(url, token, filename=None, savepath=None, session=None, chunksize=4
     return fullpath
 
 
+def _chainCallbacks(*callbacks):
+    """ Returns a function calling each of the specified callbacks (ignoring None). """
+    callbacks = [c for c in callbacks if c is not None]
+
+    def _callback(*args):
+        for callback in callbacks:
+            callback(*args)
+    return _callback
+
+
+def _isEncoded(response):
+    """ Returns True if the body of the response has a Content-Encoding (ex: gzip). """
+    return response.headers.get('content-encoding', 'identity').lower() not in ('', 'identity')
+
+
+def _progressBar(total, initial, desc):
+    """ Returns a tqdm progress bar, or None if tqdm is not installed. """
+    try:
+        from tqdm import tqdm
+    except ImportError:
+        return None
+    return tqdm(unit='B', unit_scale=True, total=total, initial=initial, desc=desc)
+
+
+def _downloadStream(session, url, headers, filepath, response=None, offset=0, chunksize=1048576,
+                    retries=3, progress=None, expected=None, checksum=None):
+    """ Streams url into filepath over a single connection. If the connection drops (or
+        closes before `expected` bytes arrived) the download is resumed from the last written
+        byte up to `retries` times. Returns a tuple of the number of bytes in filepath and
+        the hex digest of the file (None if no checksum algorithm is specified).
+    """
+    import requests
+    attempt = counted = 0
+    hasher = _hashFile(filepath, checksum, offset) if checksum else None
+    while True:
+        try:
+            if response is None:
+                rheaders = dict(headers, Range='bytes=%s-' % offset) if offset else headers
+                response = session.get(url, headers=rheaders, stream=True)
+                if offset and response.status_code == 416:  # requested range starts at the end of the file
+                    if response.headers.get('content-range', 'bytes */%s' % offset) == 'bytes */%s' % offset:
+                        return offset, hasher.hexdigest() if hasher else None
+                    log.info('Requested range past the end of the file, restarting download: %s', url)
+                    response, offset, counted = None, 0, _discard(progress, counted)
+                    hasher = hashlib.new(checksum) if checksum else None
+                    continue
+                if offset and response.status_code != 206:
+                    log.info('Server ignored the requested range, restarting download: %s', url)
+                    offset, counted = 0, _discard(progress, counted)
+                    hasher = hashlib.new(checksum) if checksum else None
+            # never write an error page to the file
+            response.raise_for_status()
+            with open(filepath, 'ab' if offset else 'wb') as handle:
+                for chunk in response.iter_content(chunk_size=chunksize):
+                    handle.write(chunk)
+                    offset += len(chunk)
+                    counted += len(chunk)
+                    if hasher:
+                        hasher.update(chunk)
+                    if progress:
+                        progress(len(chunk))
+            if expected and offset < expected:
+                raise requests.exceptions.ChunkedEncodingError('Connection closed after %s bytes' % offset)
+            return offset, hasher.hexdigest() if hasher else None
+        except requests.exceptions.RequestException as err:
+            attempt += 1
+            if attempt > retries:
+                if expected:
+                    return offset, None
+                raise
+            log.warning('Download interrupted at %s bytes (retry %s/%s): %s', offset, attempt, retries, err)
+            if response is not None and _isEncoded(response):
+                # decoded offsets can't be resumed with a byte range of the encoded body
+                offset, counted = 0, _discard(progress, counted)
+                hasher = hashlib.new(checksum) if checksum else None
+            response = None
+
+
+def _discard(progress, counted):
+    """ Reports the `counted` bytes already passed to progress as discarded by a restarted
+        download. Returns the number of bytes counted from then on (0).
+    """
+    if progress and counted:
+        progress(-counted)
+    return 0
+
+
+def _hashFile(filepath, checksum, length):
+    """ Returns a hashlib object updated with the first `length` bytes of filepath. """
+    hasher = hashlib.new(checksum)
+    if not length:
+        return hasher
+    with open(filepath, 'rb') as handle:
+        while length > 0:
+            chunk = handle.read(min(length, 1048576))
+            if not chunk:
+                break
+            hasher.update(chunk)
+            length -= len(chunk)
+    return hasher
+
+
+MANIFEST_FILENAME = '.plexapi-manifest.json'
+_manifestLock = Lock()
+
+
+def _manifestLookup(savepath, filename):
+    """ Returns the path of filename if the manifest in savepath lists it as complete
+        and the file on disk still has the recorded size.
+    """
+    manifestpath = os.path.join(savepath, MANIFEST_FILENAME)
+    with _manifestLock:
+        if not os.path.exists(manifestpath):
+            return None
+        with open(manifestpath, 'r') as handle:
+            entry = json.load(handle).get(filename)
+    if entry:
+        fullpath = os.path.join(savepath, entry['filename'])
+        if os.path.exists(fullpath) and os.path.getsize(fullpath) == entry['size']:
+            return fullpath
+
+
+def _manifestUpdate(savepath, filename, entry):
+    """ Records a completed download in the manifest in savepath. """
+    manifestpath = os.path.join(savepath, MANIFEST_FILENAME)
+    with _manifestLock:
+        data = {}
+        if os.path.exists(manifestpath):
+            with open(manifestpath, 'r') as handle:
+                data = json.load(handle)
+        data[filename] = entry
+        with open('%s.tmp' % manifestpath, 'w') as handle:
+            json.dump(data, handle, indent=2, sort_keys=True)
+        os.replace('%s.tmp' % manifestpath, manifestpath)
+
+
+def _downloadSegments(session, url, headers, filepath, total, segments, chunksize=1048576,
+                      retries=3, progress=None):
+    """ Downloads url into filepath using `segments` concurrent range requests on the shared
+        :func:`~plexapi.utils.executor`. Each segment writes directly to its offset in the
+        preallocated file.
+    """
+    import requests
+    with open(filepath, 'wb') as handle:
+        handle.truncate(total)
+    size = -(-total // segments)
+
+    def _segment(start):
+        end = min(start + size, total) - 1
+        attempt = 0
+        while start <= end:
+            try:
+                rheaders = dict(headers, Range='bytes=%s-%s' % (start, end))
+                response = session.get(url, headers=rheaders, stream=True)
+                if response.status_code != 206:
+                    raise BadRequest('Range request not honored (%s): %s' % (response.status_code, url))
+                with open(filepath, 'r+b') as handle:
+                    handle.seek(start)
+                    for chunk in response.iter_content(chunk_size=chunksize):
+                        chunk = chunk[:end + 1 - start]
+                        handle.write(chunk)
+                        start += len(chunk)
+                        if progress:
+                            progress(len(chunk))
+                if start <= end:
+                    raise requests.exceptions.ChunkedEncodingError('Segment ended early at %s' % start)
+            except requests.exceptions.RequestException as err:
+                attempt += 1
+                if attempt > retries:
+                    raise
+                log.warning('Segment interrupted at %s bytes (retry %s/%s): %s', start, attempt, retries, err)
+
+    # every segment finished (or failed) before the first error is raised
+    for future in runAll(_segment, [(start,) for start in range(0, total, size)], segments):
+        future.result()
+
+
+def downloadUnpacked(url, token, savepath=None, session=None, inmemory=False, chunksize=1048576):
+    """ Helper to download a zip file (logs, databases) and extract its entries while the
+        data arrives, without writing the zip file itself to disk. Returns the list of
+        extracted filepaths or, if inmemory is True, a dict of {filename: BytesIO}.
+
+        Parameters:
+            url (str): URL where the zip file can be reached.
+            token (str): Plex auth token to include in headers.
+            savepath (str): Directory to extract to. Defaults to current working dir.
+            session (requests.Session): Session used to make the request (optional).
+            inmemory (bool): Return file-like objects instead of writing files to disk.
+            chunksize (int): What chunksize read/write at the time (default 1MB).
+    """
+    import requests
+    session = session or requests.Session()
+    response = session.get(url, headers={'X-Plex-Token': token}, stream=True)
+    if response.status_code != 200:
+        raise BadRequest('(%s) Unable to download %s' % (response.status_code, url))
+    response.raw.decode_content = True
+    log.info('Downloading and unpacking: %s', url)
+    with response:
+        return unzipStream(response.raw, savepath, inmemory, chunksize)
+
+
+class _ZipStreamReader(object):
+    """ Wraps a file-like object and allows pushing back data which was read too far. """
+
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+        self._buffer = b''
+
+    def read(self, size=-1):
+        """ Reads exactly size bytes (less at the end of the stream). """
+        size = 1048576 if size is None or size < 0 else size
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        while len(data) < size:
+            chunk = self._fileobj.read(size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data
+
+    def readchunk(self, size):
+        """ Reads up to size bytes; only returns an empty string at the end of the stream. """
+        if self._buffer:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+            return data
+        return self._fileobj.read(size)
+
+    def unread(self, data):
+        self._buffer = data + self._buffer
+
+
+def unzipStream(fileobj, savepath=None, inmemory=False, chunksize=1048576):
+    """ Extracts a zip archive from a non seekable file-like object (ex: an http response)
+        by reading the local file headers in order, so each entry is written as soon as
+        it arrives. Entries which can not be streamed (stored entries with a trailing data
+        descriptor, encrypted entries or unknown compression) make the rest of the archive
+        spool to a temporary file, which is then read with :mod:`zipfile` using the central
+        directory. Returns the list of extracted filepaths or, if inmemory is True, a dict
+        of {filename: BytesIO}.
+
+        Parameters:
+            fileobj (file): File-like object to read the zip archive from.
+            savepath (str): Directory to extract to. Defaults to current working dir.
+            inmemory (bool): Return file-like objects instead of writing files to disk.
+            chunksize (int): What chunksize read/write at the time (default 1MB).
+    """
+    savepath = savepath or os.getcwd()
+    results = {} if inmemory else []
+    reader = _ZipStreamReader(fileobj)
+    while True:
+        header = reader.read(30)
+        if len(header) < 30 or header[:4] != b'PK\x03\x04':
+            break  # reached the central directory
+        flags, method, crc, csize, usize, namelen, extralen = struct.unpack('<6xHH4xIIIHH', header)
+        rawname = reader.read(namelen)
+        extra = reader.read(extralen)
+        name = rawname.decode('utf-8' if flags & 0x800 else 'cp437')
+        zip64 = b''.join(_zipExtraFields(extra, 0x0001))
+        if zip64 and usize == 0xFFFFFFFF:
+            usize, = struct.unpack('<Q', zip64[:8])
+            zip64 = zip64[8:]
+        if zip64 and csize == 0xFFFFFFFF:
+            csize, = struct.unpack('<Q', zip64[:8])
+        descriptor = flags & 0x08
+        if flags & 0x01 or method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED) or \
+                (method == zipfile.ZIP_STORED and descriptor):
+            log.debug('Zip entry %s can not be streamed, spooling the remaining archive', name)
+            _unzipSpooled(reader, header + rawname + extra, savepath, results, chunksize)
+            break
+        handle = _unzipOpen(name, savepath, results)
+        crc32 = 0
+        if method == zipfile.ZIP_DEFLATED:
+            decompressor = zlib.decompressobj(-15)
+            while not decompressor.eof:
+                chunk = reader.readchunk(chunksize)
+                if not chunk:
+                    raise zipfile.BadZipFile('Unexpected end of stream in %s' % name)
+                data = decompressor.decompress(chunk)
+                crc32 = zlib.crc32(data, crc32)
+                if handle:
+                    handle.write(data)
+            reader.unread(decompressor.unused_data)
+        else:
+            remaining = csize
+            while remaining:
+                data = reader.readchunk(min(chunksize, remaining))
+                if not data:
+                    raise zipfile.BadZipFile('Unexpected end of stream in %s' % name)
+                remaining -= len(data)
+                crc32 = zlib.crc32(data, crc32)
+                if handle:
+                    handle.write(data)
+        if descriptor:
+            signature = reader.read(4)
+            if signature != b'PK\x07\x08':
+                reader.unread(signature)
+            crc, = struct.unpack('<I', reader.read(4))
+            reader.read(16 if zip64 else 8)  # compressed and uncompressed sizes
+        if handle:
+            _unzipClose(name, handle, savepath, results)
+        if crc32 != crc:
+            raise zipfile.BadZipFile('Bad CRC-32 for file %s' % name)
+    return results
+
+
+def _zipExtraFields(extra, fieldid):
+    """ Yields the data of every zip extra field with the specified id. """
+    while len(extra) >= 4:
+        eid, size = struct.unpack('<HH', extra[:4])
+        if eid == fieldid:
+            yield extra[4:4 + size]
+        extra = extra[4 + size:]
+
+
+def _unzipPath(name, savepath):
+    """ Returns the path to extract name to, dropping absolute and parent path parts. """
+    parts = [p for p in name.replace('\\', '/').split('/') if p not in ('', '.', '..')]
+    return os.path.join(savepath, *parts) if parts else None
+
+
+def _unzipOpen(name, savepath, results):
+    """ Returns a writable handle for a zip entry (None for directories). """
+    if name.endswith('/'):
+        if not isinstance(results, dict):
+            os.makedirs(_unzipPath(name, savepath) or savepath, exist_ok=True)
+        return None
+    if isinstance(results, dict):
+        return io.BytesIO()
+    filepath = _unzipPath(name, savepath)
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    return open(filepath, 'wb')
+
+
+def _unzipClose(name, handle, savepath, results):
+    if isinstance(results, dict):
+        handle.seek(0)
+        results[name] = handle
+    else:
+        handle.close()
+        results.append(_unzipPath(name, savepath))
+
+
+def _unzipSpooled(reader, prefix, savepath, results, chunksize=1048576):
+    """ Writes the rest of the archive to a temporary file and extracts the remaining
+        entries using the central directory. Entries before the spooled data (already
+        extracted) end up with a negative header offset and are skipped.
+    """
+    with tempfile.TemporaryFile() as spool:
+        spool.write(prefix)
+        shutil.copyfileobj(reader, spool, chunksize)
+        with zipfile.ZipFile(spool) as archive:
+            for info in archive.infolist():
+                if info.header_offset < 0:
+                    continue
+                handle = _unzipOpen(info.filename, savepath, results)
+                if handle:
+                    with archive.open(info) as source:
+                        shutil.copyfileobj(source, handle, chunksize)
+                    _unzipClose(info.filename, handle, savepath, results)
+
+
+def downloadItems(items, savepath=None, keep_original_name=False, maxworkers=4, **kwargs):
+    """ Calls download() on each item on the shared :func:`~plexapi.utils.executor` and returns
+        the combined list of filepaths (in the same order as items). Used by the download methods
+        of shows, seasons, artists and albums.
+
+        Parameters:
+            items (list): List of playable media items (episodes, tracks, ..).
+            savepath (str): Defaults to current working dir.
+            keep_original_name (bool): True to keep the original file name.
+            maxworkers (int): Max number of files downloaded at the same time (default 4).
+            **kwargs: Additional options passed into each items download().
+    """
+    def _download(item):
+        return item.download(savepath, keep_original_name, **kwargs)
+
+    futures = runAll(_download, [(item,) for item in items], maxworkers)
+    return [path for future in futures for path in future.result()]
+
+
 def tag_helper(tag, items, locked=True, remove=False):
     """ Simple tag helper for editing a object. """
     if not isinstance(items, list):
@@ -351,12 +351,12 @@ class Movie(Playable, Video):
             if not keep_original_name:
                 title = self.title.replace(' ', '.')
                 name = '%s.%s' % (title, location.container)
-            if kwargs is not None:
-                url = self.getStreamURL(**kwargs)
+            if kwargs:
+                url, size = self.getStreamURL(**kwargs), None
             else:
-                self._server.url('%s?download=1' % location.key)
-            filepath = utils.download(url, self._server._token, filename=name,
-                                      savepath=savepath, session=self._server._session)
+                url, size = self._server.url('%s?download=1' % location.key), location.size
+            filepath = utils.download(url, self._server._token, filename=name, savepath=savepath,
+                                      session=self._server._session, size=size)
             if filepath:
                 filepaths.append(filepath)
         return filepaths
@@ -517,19 +517,17 @@ class Show(Video):
         """ Alias to :func:`~plexapi.video.Show.episode()`. """
         return self.episode(title, season, episode)
 
-    def download(self, savepath=None, keep_original_name=False, **kwargs):
+    def download(self, savepath=None, keep_original_name=False, maxworkers=4, **kwargs):
         """ Download video files to specified directory.
 
             Parameters:
                 savepath (str): Defaults to current working dir.
                 keep_original_name (bool): True to keep the original file name otherwise
                     a friendlier is generated.
+                maxworkers (int): Max number of files downloaded at the same time (default 4).
                 **kwargs: Additional options passed into :func:`~plexapi.base.PlexObject.getStreamURL()`.
         """
-        filepaths = []
-        for episode in self.episodes():
-            filepaths += episode.download(savepath, keep_original_name, **kwargs)
-        return filepaths
+        return utils.downloadItems(self.episodes(), savepath, keep_original_name, maxworkers, **kwargs)
 
 
 @utils.registerPlexObject
@@ -618,19 +616,17 @@ class Season(Video):
         """ Returns list of unwatched :class:`~plexapi.video.Episode` objects. """
         return self.episodes(watched=False)
 
-    def download(self, savepath=None, keep_original_name=False, **kwargs):
+    def download(self, savepath=None, keep_original_name=False, maxworkers=4, **kwargs):
         """ Download video files to specified directory.
 
             Parameters:
                 savepath (str): Defaults to current working dir.
                 keep_original_name (bool): True to keep the original file name otherwise
                     a friendlier is generated.
+                maxworkers (int): Max number of files downloaded at the same time (default 4).
                 **kwargs: Additional options passed into :func:`~plexapi.base.PlexObject.getStreamURL()`.
         """
-        filepaths = []
-        for episode in self.episodes():
-            filepaths += episode.download(savepath, keep_original_name, **kwargs)
-        return filepaths
+        return utils.downloadItems(self.episodes(), savepath, keep_original_name, maxworkers, **kwargs)
 
     def _defaultSyncTitle(self):
         """ Returns str, default title for a new syncItem. """
@@ -7,10 +7,12 @@ from os import environ
 import plexapi
 import pytest
 import requests
+from plexapi.cassette import Cassette
 from plexapi.client import PlexClient
 from plexapi.myplex import MyPlexAccount
 from plexapi.server import PlexServer
 
+from .fakeserver.fixtures import fakeplex, fakeserver, fakeserver_size  # noqa: F401
 from .payloads import ACCOUNT_XML
 
 try:
@@ -49,6 +51,8 @@ ENTITLEMENTS = {
 
 TEST_AUTHENTICATED = "authenticated"
 TEST_ANONYMOUSLY = "anonymously"
+CASSETTE = None
+
 ANON_PARAM = pytest.param(TEST_ANONYMOUSLY, marks=pytest.mark.anonymous)
 AUTH_PARAM = pytest.param(TEST_AUTHENTICATED, marks=pytest.mark.authenticated)
 
@@ -57,6 +61,30 @@ def pytest_addoption(parser):
     parser.addoption(
         "--client", action="store_true", default=False, help="Run client tests."
     )
+    parser.addoption(
+        "--cassette", default=None, help="Record or replay the server requests to this cassette file."
+    )
+    parser.addoption(
+        "--cassette-mode", default="auto", choices=["auto", "record", "replay"], help="Cassette mode."
+    )
+    parser.addoption(
+        "--cassette-latency", default=1.0, type=float, help="Factor of the recorded latencies to replay."
+    )
+
+
+def pytest_configure(config):
+    global CASSETTE
+    if config.getoption("cassette", None):
+        CASSETTE = Cassette(
+            config.getoption("cassette"),
+            mode=config.getoption("cassette_mode"),
+            latency=config.getoption("cassette_latency"),
+        )
+
+
+def pytest_unconfigure(config):
+    if CASSETTE:
+        CASSETTE.save()
 
 
 def pytest_generate_tests(metafunc):
@@ -93,8 +121,13 @@ def pytest_runtest_setup(item):
 # ---------------------------------
 
 
+def get_session():
+    session = requests.Session()
+    return CASSETTE.session(session) if CASSETTE else session
+
+
 def get_account():
-    return MyPlexAccount()
+    return MyPlexAccount(session=get_session())
 
 
 @pytest.fixture(scope="session")
@@ -147,7 +180,7 @@ def mocked_account(requests_mock):
 @pytest.fixture(scope="session")
 def plex(request):
     assert SERVER_BASEURL, "Required SERVER_BASEURL not specified."
-    session = requests.Session()
+    session = get_session()
     if request.param == TEST_AUTHENTICATED:
         token = get_account().authenticationToken
     else:
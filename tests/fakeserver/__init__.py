@@ -0,0 +1,518 @@
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for a Plex Media Server, used to load test PlexAPI offline. It serves the
+synthetic libraries of :mod:`tests.fakeserver.payloads` over real HTTP on the endpoints PlexAPI
+uses, with injectable latency and error rates, and pushes notifications over the
+/:/websockets/notifications websocket.
+
+It can be used from the benchmarks and tests (see :mod:`tests.fakeserver.fixtures`)::
+
+    with FakePlexServer(sizes=100000, latency=0.02) as fake:
+        plex = PlexServer(fake.url, fake.token)
+        plex.library.section('Movies').search(container_size=1000)
+
+or run standalone to point any PlexAPI script at it::
+
+    python -m tests.fakeserver --size 100000 --latency 0.02 --error-rate 0.01 --port 32400
+"""
+import argparse
+import base64
+import hashlib
+import json
+import random
+import re
+import select
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from itertools import islice
+from urllib.parse import parse_qs, urlparse
+
+from . import payloads
+
+WEBSOCKET_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+# Key holding the entries of each notification type in a NotificationContainer
+NOTIFICATIONS = {
+    'activity': 'ActivityNotification',
+    'playing': 'PlaySessionStateNotification',
+    'progress': 'ProgressNotification',
+    'reachability': 'ReachabilityNotification',
+    'status': 'StatusNotification',
+    'timeline': 'TimelineEntry',
+    'transcodeSession.end': 'TranscodeSession',
+    'transcodeSession.update': 'TranscodeSession',
+}
+HISTORY_INTERVAL = 3600  # seconds between synthetic history entries
+USERS = 3  # number of accounts the sessions and history are spread across
+
+
+class FakePlexServer(object):
+    """ Local HTTP server answering like a Plex Media Server with synthetic libraries.
+
+        Parameters:
+            sizes (int or dict): Number of top level items of each section, either a single
+                number or a dict of {libtype: size} using the keys of payloads.SECTIONS.
+            latency (float or tuple): Seconds (or (min, max) range of seconds) to wait before
+                answering each HTTP request.
+            errorRate (float): Fraction of HTTP requests answered with an error instead.
+            errorCodes (tuple): HTTP status codes the injected errors are picked from.
+            sessions (int): Number of active playback sessions in /status/sessions.
+            history (int): Number of watch history entries in /status/sessions/history/all.
+            token (str): Token clients must send; None accepts any token.
+            host (str): Address to listen on.
+            port (int): Port to listen on, 0 picks a free port.
+            seed (int): Seed of the random latencies and errors.
+
+        Attributes:
+            requests (Counter): Number of HTTP requests served per 'METHOD /path'.
+    """
+    ROUTES = [
+        (r'/$', '_root'),
+        (r'/identity$', '_identity'),
+        (r'/library$', '_library'),
+        (r'/library/sections$', '_sections'),
+        (r'/library/sections/(\d+)/all$', '_sectionAll'),
+        (r'/library/metadata/([\d,]+)$', '_metadata'),
+        (r'/library/metadata/(\d+)/children$', '_children'),
+        (r'/library/metadata/(\d+)/allLeaves$', '_allLeaves'),
+        (r'/status/sessions$', '_sessions'),
+        (r'/status/sessions/history/all$', '_history'),
+        (r'/hubs/search$', '_hubSearch'),
+        (r'/:/(un)?scrobble$', '_scrobble'),
+    ]
+
+    def __init__(self, sizes=1000, latency=0, errorRate=0, errorCodes=(500, 503), sessions=2,
+                 history=1000, token='fake-token', host='127.0.0.1', port=0, seed=0):
+        if isinstance(sizes, int):
+            sizes = {libtype: sizes for libtype in payloads.SECTIONS}
+        self.sizes = dict(sizes)
+        self.latency = latency
+        self.errorRate = errorRate
+        self.errorCodes = errorCodes
+        self.sessions = sessions
+        self.history = history
+        self.token = token
+        self.host = host
+        self.port = port
+        self.machineIdentifier = 'fakeserver%s' % seed
+        self.requests = Counter()
+        self.scrobbled = set()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._routes = [(re.compile(pattern), method) for pattern, method in self.ROUTES]
+        self._websockets = []
+        self._httpd = None
+        self._started = time.time()
+
+    @property
+    def url(self):
+        """ Base url of the running server. """
+        return 'http://%s:%s' % (self.host, self.port)
+
+    def start(self):
+        """ Starts serving in a background thread and returns self. """
+        self._httpd = _HTTPServer((self.host, self.port), _RequestHandler)
+        self._httpd.fake = self
+        self.port = self._httpd.server_address[1]
+        self._started = time.time()
+        thread = threading.Thread(target=self._httpd.serve_forever, name='FakePlexServer')
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        """ Stops the server and closes the open websockets. """
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        with self._lock:
+            for websocket in self._websockets:
+                websocket.append(None)
+            self._websockets = []
+
+    def disconnect(self):
+        """ Closes the open websockets, as a server restart would. Returns the number closed. """
+        with self._lock:
+            websockets, self._websockets = self._websockets, []
+            for websocket in websockets:
+                websocket.append(None)
+            return len(websockets)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def notify(self, type, *entries):
+        """ Sends a notification to all connected websockets, ex:
+            ``notify('timeline', {'itemID': '1', 'state': 5, 'type': 1})``.
+            Returns the number of websockets the notification was sent to.
+        """
+        container = {'type': type, 'size': len(entries), NOTIFICATIONS.get(type, type): list(entries)}
+        message = json.dumps({'NotificationContainer': container})
+        with self._lock:
+            for websocket in self._websockets:
+                websocket.append(message)
+            return len(self._websockets)
+
+    def notifyPlaying(self):
+        """ Sends a 'playing' notification with the current state of every active session. """
+        entries = [{'sessionKey': str(num), 'clientIdentifier': 'player-%s' % num, 'guid': '',
+                    'ratingKey': str(payloads.ratingKey(itemtype, index)), 'url': '',
+                    'key': '/library/metadata/%s' % payloads.ratingKey(itemtype, index),
+                    'viewOffset': viewOffset, 'playQueueItemID': num, 'state': 'playing'}
+                   for num, itemtype, index, viewOffset in self._activeSessions()]
+        return self.notify('playing', *entries)
+
+    # HTTP endpoints: return the payload (bytes) or an int status code.
+
+    def _root(self, params):
+        return payloads.buildContainer([], friendlyName='Fake Plex Server', machineIdentifier=self.machineIdentifier,
+            version='1.20.0.0000-fake', platform='Linux', platformVersion='fake', myPlex=0, multiuser=1,
+            allowSync=1, transcoderActiveVideoSessions=0, updatedAt=int(self._started))
+
+    def _identity(self, params):
+        return payloads.buildContainer([], claimed=0, machineIdentifier=self.machineIdentifier,
+            version='1.20.0.0000-fake')
+
+    def _library(self, params):
+        return payloads.buildContainer(['<Directory key="sections" title="Library Sections"/>'],
+            identifier='com.plexapp.plugins.library', title1='Plex Library')
+
+    def _sections(self, params):
+        return payloads.buildSections()
+
+    def _sectionAll(self, params, sectionKey):
+        libtype = self._libtype(int(sectionKey))
+        if libtype is None:
+            return 404
+        total = self.sizes.get(libtype, 0)
+        itemtype = self._itemtype(params.get('type'))
+        section = payloads.SECTIONS[libtype]
+        attrs = dict(librarySectionID=section['key'], librarySectionTitle=section['title'],
+            identifier='com.plexapp.plugins.library', viewGroup=itemtype or section['type'])
+        title = params.get('title')
+        if title:
+            items = (item for item in payloads.sectionItems(libtype, total, itemtype)
+                     if title.lower() in payloads.TITLES.get(item[0], '').format(i=item[1]).lower())
+            return self._page(items, None, params, **attrs)
+        return self._page(payloads.sectionItems(libtype, total, itemtype),
+            payloads.countItems(libtype, total, itemtype), params, **attrs)
+
+    def _metadata(self, params, keys):
+        items = [self._parseKey(key) for key in keys.split(',')]
+        if None in items:
+            return 404
+        section = payloads.SECTIONS[payloads.sectionOf(items[0][0])]
+        return payloads.buildContainer((payloads.buildMetadata(*item) for item in items),
+            librarySectionID=section['key'], librarySectionTitle=section['title'],
+            identifier='com.plexapp.plugins.library')
+
+    def _children(self, params, key):
+        item = self._parseKey(key)
+        if item is None:
+            return 404
+        childtype, indexes = payloads.children(*item)
+        return self._page(((childtype, index) for index in indexes), len(indexes), params,
+            key=key, parentRatingKey=key, viewGroup=childtype or '')
+
+    def _allLeaves(self, params, key):
+        item = self._parseKey(key)
+        if item is None:
+            return 404
+        leaves = list(payloads.leaves(*item))
+        return self._page(leaves, len(leaves), params, key=key, viewGroup=leaves[0][0] if leaves else '')
+
+    def _sessions(self, params):
+        items = []
+        for num, itemtype, index, viewOffset in self._activeSessions():
+            user = num % USERS + 1
+            xml = payloads.buildMetadata(itemtype, index, sessionKey=num, viewOffset=viewOffset,
+                librarySectionID=payloads.SECTIONS[payloads.sectionOf(itemtype)]['key'])
+            session = ('<User id="%s" title="user%s" thumb="https://plex.tv/users/%s/avatar"/>'
+                       '<Player address="10.0.0.%s" machineIdentifier="player-%s" platform="Chrome" '
+                       'product="Plex Web" state="playing" title="Player %s" local="1"/>'
+                       '<Session id="session-%s" bandwidth="4000" location="lan"/>'
+                       % (user, user, user, num, num, num, num))
+            end = xml.rindex('</')
+            items.append(xml[:end] + session + xml[end:])
+        return payloads.buildContainer(items)
+
+    def _history(self, params):
+        newest = int(self._started)
+        mindate = params.get('viewedat>')
+        filters = {k: params[k] for k in ('accountid', 'librarysectionid', 'metadataitemid') if k in params}
+
+        def _entries():
+            ascending = params.get('sort') == 'viewedAt:asc'
+            for num in reversed(range(self.history)) if ascending else range(self.history):
+                viewedAt = newest - num * HISTORY_INTERVAL
+                if mindate and viewedAt <= int(mindate):
+                    if ascending:
+                        continue
+                    return
+                itemtype, index = self._historyItem(num)
+                entry = {'accountid': str(num % USERS + 1), 'metadataitemid': str(payloads.ratingKey(itemtype, index)),
+                         'librarysectionid': str(payloads.SECTIONS[payloads.sectionOf(itemtype)]['key'])}
+                if all(entry[k] == v for k, v in filters.items()):
+                    yield itemtype, index, dict(historyKey='/status/sessions/history/%s' % (num + 1),
+                        viewedAt=viewedAt, accountID=entry['accountid'], deviceID=num % 5 + 1,
+                        librarySectionID=entry['librarysectionid'])
+
+        start, size = self._range(params)
+        items = [payloads.buildMetadata(itemtype, index, **attrs)
+                 for itemtype, index, attrs in islice(_entries(), start, start + size)]
+        return payloads.buildContainer(items)
+
+    def _hubSearch(self, params):
+        query = params.get('query', '').lower()
+        limit = int(params.get('limit', 3))
+        hubs = []
+        for libtype, section in payloads.SECTIONS.items():
+            title = payloads.TITLES[section['type']]
+            found = islice((i for i in range(self.sizes.get(libtype, 0)) if query in title.format(i=i).lower()), limit)
+            items = [payloads.buildMetadata(section['type'], i, librarySectionID=section['key']) for i in found]
+            hubs.append('<Hub hubIdentifier="%s" size="%s" title="%s" type="%s">%s</Hub>'
+                        % (section['type'], len(items), section['title'], section['type'], ''.join(items)))
+        return payloads.buildContainer(hubs)
+
+    def _scrobble(self, params, un):
+        item = self._parseKey(params.get('key', ''))
+        if item is None:
+            return 404
+        with self._lock:
+            (self.scrobbled.discard if un else self.scrobbled.add)(payloads.ratingKey(*item))
+        return b''
+
+    # Helpers
+
+    def _page(self, items, total, params, **attrs):
+        """ Returns the page of items requested by the X-Plex-Container-Start and
+            X-Plex-Container-Size params. A total of None counts the items.
+        """
+        start, size = self._range(params)
+        if total is None:
+            items = list(items)
+            total = len(items)
+        page = islice(items, start, start + size)
+        return payloads.buildContainer((payloads.buildMetadata(itemtype, index) for itemtype, index in page),
+            totalSize=total, offset=start, **attrs)
+
+    def _range(self, params):
+        start = int(params.get('x-plex-container-start', 0))
+        size = int(params.get('x-plex-container-size', 1 << 31))
+        return start, size
+
+    def _activeSessions(self):
+        """ Yields (sessionKey, itemtype, index, viewOffset) of the active sessions. The
+            view offsets advance in real time from when the server started.
+        """
+        elapsed = int((time.time() - self._started) * 1000)
+        for num in range(1, self.sessions + 1):
+            itemtype, index = self._historyItem(num)
+            duration = 5400000 if itemtype == 'movie' else 2700000
+            yield num, itemtype, index, (elapsed + num * 60000) % duration
+
+    def _historyItem(self, num):
+        """ Returns the (itemtype, index) of a movie or episode for the specified number. """
+        movies, shows = self.sizes.get('movie', 0), self.sizes.get('show', 0)
+        if movies and (num % 2 or not shows):
+            return 'movie', num % movies
+        if shows:
+            return next(islice(payloads.leaves('show', num % shows), num % 24, None))
+        return 'movie', num
+
+    def _parseKey(self, key):
+        """ Returns (itemtype, index) of an existing synthetic item or None. """
+        try:
+            itemtype, index = payloads.parseKey(key)
+        except (KeyError, ValueError):
+            return None
+        top = index // 100 ** payloads._depth(itemtype)
+        return (itemtype, index) if top < self.sizes.get(payloads.sectionOf(itemtype), 0) else None
+
+    def _libtype(self, sectionKey):
+        return next((libtype for libtype, s in payloads.SECTIONS.items() if s['key'] == sectionKey), None)
+
+    def _itemtype(self, typenum):
+        return next((t for t, num in payloads.TYPES.items() if str(num) == typenum), None) if typenum else None
+
+    def _handle(self, method, path, params):
+        """ Returns the (status, payload) for the specified request. """
+        with self._lock:
+            self.requests['%s %s' % (method, path)] += 1
+            latency = self.latency
+            if isinstance(latency, (tuple, list)):
+                latency = self._random.uniform(*latency)
+            error = self.errorRate and self._random.random() < self.errorRate
+            errorCode = self._random.choice(self.errorCodes) if error else None
+        if latency:
+            time.sleep(latency)
+        if self.token and params.get('x-plex-token') != self.token:
+            return 401, b'<html><head><title>Unauthorized</title></head><body><h1>401 Unauthorized</h1></body></html>'
+        if errorCode:
+            return errorCode, b'<html><body><h1>%d Injected Error</h1></body></html>' % errorCode
+        for pattern, name in self._routes:
+            match = pattern.match(path)
+            if match:
+                result = getattr(self, name)(params, *match.groups())
+                return (result, b'') if isinstance(result, int) else (200, result)
+        return 404, b'<html><body><h1>404 Not Found</h1></body></html>'
+
+
+class _HTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakePlexServer/1.0'
+
+    def do_GET(self):
+        self._respond('GET')
+
+    def do_PUT(self):
+        self._respond('PUT')
+
+    def do_POST(self):
+        self._respond('POST')
+
+    def do_DELETE(self):
+        self._respond('DELETE')
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, method):
+        fake = self.server.fake
+        url = urlparse(self.path)
+        params = {k.lower(): v[0] for k, v in parse_qs(url.query).items()}
+        params.update((k.lower(), v) for k, v in self.headers.items() if k.lower().startswith('x-plex-'))
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        if url.path == '/:/websockets/notifications' and self.headers.get('Upgrade', '').lower() == 'websocket':
+            if fake.token and params.get('x-plex-token') != fake.token:
+                return self._send(401, b'')
+            return self._websocket(fake)
+        status, payload = fake._handle(method, url.path, params)
+        self._send(status, payload)
+
+    def _send(self, status, payload):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/xml;charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _websocket(self, fake):
+        """ Upgrades the connection to a websocket and sends the notifications queued by
+            :func:`FakePlexServer.notify` until the client or the server closes it.
+        """
+        accept = hashlib.sha1((self.headers['Sec-WebSocket-Key'] + WEBSOCKET_GUID).encode('ascii')).digest()
+        self.send_response(101, 'Switching Protocols')
+        self.send_header('Upgrade', 'websocket')
+        self.send_header('Connection', 'Upgrade')
+        self.send_header('Sec-WebSocket-Accept', base64.b64encode(accept).decode('ascii'))
+        self.end_headers()
+        self.wfile.flush()
+        self.close_connection = True
+        queue = []
+        with fake._lock:
+            fake._websockets.append(queue)
+        sock = self.connection
+        try:
+            while True:
+                while queue:
+                    message = queue.pop(0)
+                    if message is None:
+                        sock.sendall(_frame(b'', 0x8))
+                        return
+                    sock.sendall(_frame(message.encode('utf8')))
+                if select.select([sock], [], [], 0.05)[0]:
+                    opcode, payload = _readFrame(sock)
+                    if opcode is None or opcode == 0x8:
+                        sock.sendall(_frame(payload or b'', 0x8))
+                        return
+                    if opcode == 0x9:
+                        sock.sendall(_frame(payload, 0xA))
+        except (OSError, socket.error):
+            return
+        finally:
+            with fake._lock:
+                if queue in fake._websockets:
+                    fake._websockets.remove(queue)
+
+
+def _frame(payload, opcode=0x1):
+    """ Returns an unmasked websocket frame (server to client). """
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+    return header + payload
+
+
+def _readFrame(sock):
+    """ Reads a masked websocket frame (client to server). Returns (opcode, payload) or
+        (None, None) when the connection was closed.
+    """
+    header = _recv(sock, 2)
+    if header is None:
+        return None, None
+    opcode, length = header[0] & 0x0F, header[1] & 0x7F
+    if length == 126:
+        length = struct.unpack('!H', _recv(sock, 2) or b'\0\0')[0]
+    elif length == 127:
+        length = struct.unpack('!Q', _recv(sock, 8) or b'\0' * 8)[0]
+    mask = _recv(sock, 4) if header[1] & 0x80 else b'\0\0\0\0'
+    payload = _recv(sock, length) if length else b''
+    if mask is None or payload is None:
+        return None, None
+    return opcode, bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+
+def _recv(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m tests.fakeserver', description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on.')
+    parser.add_argument('--port', default=32400, type=int, help='Port to listen on.')
+    parser.add_argument('--token', default='fake-token', help='Token clients must send.')
+    parser.add_argument('--size', default=1000, type=int, help='Number of top level items per section.')
+    parser.add_argument('--latency', default=0, type=float, help='Max seconds to wait before each response.')
+    parser.add_argument('--error-rate', default=0, type=float, help='Fraction of requests answered with an error.')
+    parser.add_argument('--sessions', default=2, type=int, help='Number of active playback sessions.')
+    parser.add_argument('--history', default=1000, type=int, help='Number of watch history entries.')
+    parser.add_argument('--notify', default=0, type=float, help='Seconds between playing notifications.')
+    opts = parser.parse_args()
+    fake = FakePlexServer(sizes=opts.size, latency=(0, opts.latency), errorRate=opts.error_rate,
+        sessions=opts.sessions, history=opts.history, token=opts.token, host=opts.host, port=opts.port)
+    with fake:
+        print('Serving %s items per section on %s (token %s)' % (opts.size, fake.url, opts.token))
+        try:
+            while True:
+                time.sleep(opts.notify or 1)
+                if opts.notify:
+                    fake.notifyPlaying()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+Pytest fixtures of the fake server, shared by the tests and the benchmarks. Import them
+into a conftest.py and override `fakeserver_size` to change the number of items served
+in each section.
+"""
+import pytest
+from plexapi.server import PlexServer
+
+from . import FakePlexServer
+
+
+@pytest.fixture(scope='session')
+def fakeserver_size():
+    """ Number of top level items in each section of the fake server. """
+    return 100
+
+
+@pytest.fixture(scope='session')
+def fakeserver(fakeserver_size):
+    """ Local fake Plex Media Server serving the synthetic sections over HTTP. """
+    with FakePlexServer(sizes=fakeserver_size) as fake:
+        yield fake
+
+
+@pytest.fixture()
+def fakeplex(fakeserver):
+    """ PlexServer connected to the fake server, restored to its defaults afterwards. """
+    fakeserver.requests.clear()
+    yield PlexServer(fakeserver.url, fakeserver.token)
+    fakeserver.latency, fakeserver.errorRate = 0, 0
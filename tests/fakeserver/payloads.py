@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic Plex Media Server payloads for the benchmarks and the fake server. Each template is a single
+item recorded from a PMS /library/sections/<key>/all response, scaled up to the
+requested number of items with unique ratingKeys, titles, years and files.
+
+RatingKeys encode the item type and position so every item can be rebuilt from its
+key alone: ``SEARCHTYPES[type] * KEYSPACE + index``. Top level items are numbered
+from 0 and the index of a child is ``parentIndex * 100 + n`` (n starting at 1).
+"""
+from itertools import islice
+from xml.sax.saxutils import quoteattr
+
+SECTIONS = {
+    'movie': {'key': 1, 'type': 'movie', 'title': 'Movies', 'agent': 'com.plexapp.agents.imdb',
+              'scanner': 'Plex Movie Scanner'},
+    'show': {'key': 2, 'type': 'show', 'title': 'TV Shows', 'agent': 'com.plexapp.agents.thetvdb',
+             'scanner': 'Plex Series Scanner'},
+    'music': {'key': 3, 'type': 'artist', 'title': 'Music', 'agent': 'com.plexapp.agents.lastfm',
+              'scanner': 'Plex Music Scanner'},
+    'photo': {'key': 4, 'type': 'photo', 'title': 'Photos', 'agent': 'com.plexapp.agents.none',
+              'scanner': 'Plex Photo Scanner'},
+}
+
+TYPES = {'movie': 1, 'show': 2, 'season': 3, 'episode': 4, 'artist': 8, 'album': 9, 'track': 10, 'photo': 13}
+KEYSPACE = 10 ** 12
+# Child type and number of children of each parent type
+CHILDREN = {'show': ('season', 2), 'season': ('episode', 12), 'artist': ('album', 2), 'album': ('track', 10)}
+PARENTS = {childtype: parenttype for parenttype, (childtype, _) in CHILDREN.items()}
+# Title of the top level items, used by the hub search of the fake server
+TITLES = {'movie': 'Movie {i}', 'show': 'Show {i}', 'artist': 'Artist {i}', 'photo': 'IMG_{i:06d}'}
+
+TEMPLATES = {
+    'movie': (
+        '<Video ratingKey="{key}" key="/library/metadata/{key}" guid="com.plexapp.agents.imdb://tt{key:07d}?lang=en" '
+        'studio="Studio {mod}" type="movie" title="Movie {i}" titleSort="Movie {i}" contentRating="PG-13" '
+        'summary="Synthetic movie {i} used to benchmark parsing." rating="7.{mod}" viewCount="{mod}" '
+        'lastViewedAt="1590000000" year="{year}" tagline="Tagline {i}" thumb="/library/metadata/{key}/thumb/1590000000" '
+        'art="/library/metadata/{key}/art/1590000000" duration="5400000" originallyAvailableAt="{year}-01-01" '
+        'addedAt="1580000000" updatedAt="1590000000" chapterSource="media">'
+        '<Media id="{key}" duration="5400000" bitrate="8000" width="1920" height="1080" aspectRatio="1.78" '
+        'audioChannels="6" audioCodec="ac3" videoCodec="h264" videoResolution="1080" container="mkv" '
+        'videoFrameRate="24p" videoProfile="high">'
+        '<Part id="{key}" key="/library/parts/{key}/1580000000/file.mkv" duration="5400000" '
+        'file="/media/movies/Movie {i} ({year})/Movie {i}.mkv" size="{size}" container="mkv" videoProfile="high"/>'
+        '</Media>'
+        '<Genre tag="Genre {mod}"/><Genre tag="Drama"/><Director tag="Director {mod}"/>'
+        '<Writer tag="Writer {mod}"/><Country tag="USA"/><Role tag="Actor {mod}"/><Role tag="Actor {i}"/>'
+        '</Video>'
+    ),
+    'show': (
+        '<Directory ratingKey="{key}" key="/library/metadata/{key}/children" '
+        'guid="com.plexapp.agents.thetvdb://{key}?lang=en" studio="Network {mod}" type="show" title="Show {i}" '
+        'titleSort="Show {i}" contentRating="TV-14" summary="Synthetic show {i} used to benchmark parsing." '
+        'index="1" rating="8.{mod}" viewCount="{mod}" lastViewedAt="1590000000" year="{year}" '
+        'thumb="/library/metadata/{key}/thumb/1590000000" art="/library/metadata/{key}/art/1590000000" '
+        'banner="/library/metadata/{key}/banner/1590000000" theme="/library/metadata/{key}/theme/1590000000" '
+        'duration="2700000" originallyAvailableAt="{year}-09-01" leafCount="{leafCount}" viewedLeafCount="{mod}" '
+        'childCount="{childCount}" addedAt="1580000000" updatedAt="1590000000">'
+        '<Genre tag="Genre {mod}"/><Genre tag="Drama"/><Role tag="Actor {mod}"/><Role tag="Actor {i}"/>'
+        '</Directory>'
+    ),
+    'season': (
+        '<Directory ratingKey="{key}" key="/library/metadata/{key}/children" parentRatingKey="{parentKey}" '
+        'guid="com.plexapp.agents.thetvdb://{parentKey}/{n}?lang=en" type="season" title="Season {n}" '
+        'parentKey="/library/metadata/{parentKey}" parentTitle="Show {i}" summary="" index="{n}" '
+        'parentIndex="1" viewCount="0" thumb="/library/metadata/{key}/thumb/1590000000" '
+        'parentThumb="/library/metadata/{parentKey}/thumb/1590000000" leafCount="{leafCount}" '
+        'viewedLeafCount="0" addedAt="1580000000" updatedAt="1590000000"/>'
+    ),
+    'episode': (
+        '<Video ratingKey="{key}" key="/library/metadata/{key}" parentRatingKey="{parentKey}" '
+        'grandparentRatingKey="{grandparentKey}" guid="com.plexapp.agents.thetvdb://{grandparentKey}/{parentIndex}/{n}'
+        '?lang=en" type="episode" title="Episode {n}" grandparentKey="/library/metadata/{grandparentKey}" '
+        'parentKey="/library/metadata/{parentKey}" grandparentTitle="Show {i}" parentTitle="Season {parentIndex}" '
+        'contentRating="TV-14" summary="Synthetic episode {n} of show {i}." index="{n}" parentIndex="{parentIndex}" '
+        'year="{year}" thumb="/library/metadata/{key}/thumb/1590000000" '
+        'grandparentThumb="/library/metadata/{grandparentKey}/thumb/1590000000" duration="2700000" '
+        'originallyAvailableAt="{year}-09-01" addedAt="1580000000" updatedAt="1590000000">'
+        '<Media id="{key}" duration="2700000" bitrate="4000" width="1280" height="720" aspectRatio="1.78" '
+        'audioChannels="2" audioCodec="aac" videoCodec="h264" videoResolution="720" container="mkv" '
+        'videoFrameRate="24p" videoProfile="high">'
+        '<Part id="{key}" key="/library/parts/{key}/1580000000/file.mkv" duration="2700000" '
+        'file="/media/shows/Show {i}/Season {parentIndex}/S{parentIndex:02d}E{n:02d}.mkv" size="{size}" '
+        'container="mkv" videoProfile="high"/>'
+        '</Media>'
+        '<Director tag="Director {mod}"/><Writer tag="Writer {mod}"/>'
+        '</Video>'
+    ),
+    'artist': (
+        '<Directory ratingKey="{key}" key="/library/metadata/{key}/children" '
+        'guid="com.plexapp.agents.lastfm://Artist%20{i}?lang=en" type="artist" title="Artist {i}" '
+        'titleSort="Artist {i}" summary="Synthetic artist {i} used to benchmark parsing." index="1" '
+        'viewCount="{mod}" lastViewedAt="1590000000" thumb="/library/metadata/{key}/thumb/1590000000" '
+        'art="/library/metadata/{key}/art/1590000000" addedAt="1580000000" updatedAt="1590000000">'
+        '<Genre tag="Genre {mod}"/><Country tag="United Kingdom"/>'
+        '</Directory>'
+    ),
+    'album': (
+        '<Directory ratingKey="{key}" key="/library/metadata/{key}/children" parentRatingKey="{parentKey}" '
+        'guid="com.plexapp.agents.lastfm://Artist%20{i}/Album%20{n}?lang=en" type="album" title="Album {n}" '
+        'parentKey="/library/metadata/{parentKey}" parentTitle="Artist {i}" summary="" index="1" '
+        'year="{year}" viewCount="0" thumb="/library/metadata/{key}/thumb/1590000000" '
+        'parentThumb="/library/metadata/{parentKey}/thumb/1590000000" leafCount="{leafCount}" '
+        'originallyAvailableAt="{year}-03-01" addedAt="1580000000" updatedAt="1590000000">'
+        '<Genre tag="Genre {mod}"/>'
+        '</Directory>'
+    ),
+    'track': (
+        '<Track ratingKey="{key}" key="/library/metadata/{key}" parentRatingKey="{parentKey}" '
+        'grandparentRatingKey="{grandparentKey}" guid="com.plexapp.agents.lastfm://Artist%20{i}/Album%20{parentIndex}'
+        '/{n}?lang=en" type="track" title="Track {n}" grandparentKey="/library/metadata/{grandparentKey}" '
+        'parentKey="/library/metadata/{parentKey}" grandparentTitle="Artist {i}" parentTitle="Album {parentIndex}" '
+        'summary="" index="{n}" parentIndex="1" ratingCount="{mod}" '
+        'thumb="/library/metadata/{parentKey}/thumb/1590000000" duration="240000" addedAt="1580000000" '
+        'updatedAt="1590000000">'
+        '<Media id="{key}" duration="240000" bitrate="320" audioChannels="2" audioCodec="mp3" container="mp3">'
+        '<Part id="{key}" key="/library/parts/{key}/1580000000/file.mp3" duration="240000" '
+        'file="/media/music/Artist {i}/Album {parentIndex}/{n:02d} Track {n}.mp3" size="{size}" container="mp3"/>'
+        '</Media>'
+        '</Track>'
+    ),
+    'photo': (
+        '<Photo ratingKey="{key}" key="/library/metadata/{key}" guid="com.plexapp.agents.none://{key}?lang=xn" '
+        'type="photo" title="IMG_{i:06d}" titleSort="IMG_{i:06d}" summary="" index="1" year="{year}" '
+        'thumb="/library/metadata/{key}/thumb/1590000000" originallyAvailableAt="{year}-06-01" '
+        'addedAt="1580000000" updatedAt="1590000000">'
+        '<Media id="{key}" width="4032" height="3024" aspectRatio="1.33" container="jpeg">'
+        '<Part id="{key}" key="/library/parts/{key}/1580000000/file.jpg" '
+        'file="/media/photos/{year}/IMG_{i:06d}.jpg" size="{size}" container="jpeg"/>'
+        '</Media>'
+        '</Photo>'
+    ),
+}
+
+
+def ratingKey(itemtype, index):
+    """ Returns the ratingKey of the item of the specified type and index. """
+    return TYPES[itemtype] * KEYSPACE + index
+
+
+def parseKey(key):
+    """ Returns the (itemtype, index) tuple encoded in the specified ratingKey.
+        Raises KeyError if the ratingKey does not belong to a synthetic item.
+    """
+    typenum, index = divmod(int(key), KEYSPACE)
+    itemtype = next((itemtype for itemtype, num in TYPES.items() if num == typenum), None)
+    if itemtype is None:
+        raise KeyError(key)
+    depth = _depth(itemtype)
+    if any(not 1 <= (index // 100 ** d) % 100 <= CHILDREN[PARENTS[_ancestor(itemtype, d)]][1]
+           for d in range(depth)):
+        raise KeyError(key)
+    return itemtype, index
+
+
+def sectionOf(itemtype):
+    """ Returns the libtype (key of SECTIONS) holding items of the specified type. """
+    root = _ancestor(itemtype, _depth(itemtype))
+    return next(libtype for libtype, section in SECTIONS.items() if section['type'] == root)
+
+
+def children(itemtype, index):
+    """ Returns the (childtype, indexes) of the direct children of the specified item. """
+    childtype, count = CHILDREN.get(itemtype, (None, 0))
+    return childtype, [index * 100 + n for n in range(1, count + 1)]
+
+
+def leaves(itemtype, index, leaftype=None):
+    """ Yields the (itemtype, index) of all descendants of the specified item of type leaftype
+        (default: the deepest type below the item), in library order.
+    """
+    childtype, indexes = children(itemtype, index)
+    for child in indexes:
+        if childtype == leaftype or (leaftype is None and childtype not in CHILDREN):
+            yield childtype, child
+        else:
+            yield from leaves(childtype, child, leaftype)
+
+
+def sectionItems(libtype, total, itemtype=None):
+    """ Yields the (itemtype, index) of all items of type itemtype (default: the top level
+        type) of a section holding `total` top level items.
+    """
+    root = SECTIONS[libtype]['type']
+    for i in range(total):
+        if itemtype in (None, root):
+            yield root, i
+        else:
+            yield from leaves(root, i, itemtype)
+
+
+def countItems(libtype, total, itemtype=None):
+    """ Returns the number of items of type itemtype in a section of `total` top level items. """
+    count, current = total, SECTIONS[libtype]['type']
+    while itemtype not in (None, current) and current in CHILDREN:
+        current, children = CHILDREN[current]
+        count *= children
+    return count if itemtype in (None, current) else 0
+
+
+def buildItem(libtype, i):
+    """ Returns the xml of the i'th synthetic top level item of the specified libtype. """
+    return buildMetadata(SECTIONS[libtype]['type'], i)
+
+
+def buildMetadata(itemtype, index, **attrs):
+    """ Returns the xml of the synthetic item of the specified type and index. Extra
+        attributes (ex: sessionKey, viewOffset) are added to the item element.
+    """
+    depth = _depth(itemtype)
+    i = index // 100 ** depth
+    fields = {'key': ratingKey(itemtype, index), 'i': i, 'n': index % 100, 'mod': i % 10,
+              'year': 1950 + i % 70, 'size': 1000000 + index, 'leafCount': _leafCount(itemtype),
+              'childCount': CHILDREN.get(itemtype, (None, 0))[1]}
+    if depth >= 1:
+        fields['parentKey'] = ratingKey(PARENTS[itemtype], index // 100)
+        fields['parentIndex'] = (index // 100) % 100 if depth >= 2 else 1
+    if depth >= 2:
+        fields['grandparentKey'] = ratingKey(PARENTS[PARENTS[itemtype]], index // 10000)
+    xml = TEMPLATES[itemtype].format(**fields)
+    if attrs:
+        extra = ''.join(' %s=%s' % (k, quoteattr(str(v))) for k, v in attrs.items())
+        tagend = xml.index(' ')
+        xml = xml[:tagend] + extra + xml[tagend:]
+    return xml
+
+
+def buildContainer(items, **attrs):
+    """ Returns a MediaContainer payload (bytes) around the specified item xml strings. """
+    items = list(items)
+    attrs.setdefault('size', len(items))
+    attrs = ''.join(' %s=%s' % (k, quoteattr(str(v))) for k, v in attrs.items())
+    return ('<MediaContainer%s>%s</MediaContainer>' % (attrs, ''.join(items))).encode('utf8')
+
+
+def buildSection(libtype, size, start=0, total=None, itemtype=None):
+    """ Returns a /library/sections/<key>/all payload (bytes) containing items start to
+        start+size of a section holding `total` (default `size`) synthetic top level items.
+        If itemtype is specified, the descendants of that type are listed instead.
+    """
+    section = SECTIONS[libtype]
+    total = size if total is None else total
+    items = islice(sectionItems(libtype, total, itemtype), start, start + size)
+    return buildContainer((buildMetadata(t, index) for t, index in items),
+        totalSize=countItems(libtype, total, itemtype), offset=start, allowSync=1,
+        art='/:/resources/%s-fanart.jpg' % libtype, identifier='com.plexapp.plugins.library',
+        librarySectionID=section['key'], librarySectionTitle=section['title'],
+        librarySectionUUID='00000000-0000-0000-0000-%012d' % section['key'],
+        mediaTagPrefix='/system/bundle/media/flags/', viewGroup=itemtype or section['type'])
+
+
+def buildSections():
+    """ Returns the /library/sections payload (bytes) listing the synthetic sections. """
+    directories = ''.join(
+        '<Directory allowSync="1" art="/:/resources/%s-fanart.jpg" filters="1" refreshing="0" '
+        'key="%s" type="%s" title=%s agent="%s" scanner="%s" language="en" '
+        'uuid="00000000-0000-0000-0000-%012d" updatedAt="1590000000" createdAt="1580000000">'
+        '<Location id="%s" path="/media/%s"/></Directory>'
+        % (libtype, s['key'], s['type'], quoteattr(s['title']), s['agent'], s['scanner'], s['key'], s['key'], libtype)
+        for libtype, s in SECTIONS.items())
+    return ('<MediaContainer size="%s" allowSync="0" identifier="com.plexapp.plugins.library" '
+            'mediaTagPrefix="/system/bundle/media/flags/" title1="Plex Library">%s</MediaContainer>'
+            % (len(SECTIONS), directories)).encode('utf8')
+
+
+def _depth(itemtype):
+    depth = 0
+    while itemtype in PARENTS:
+        itemtype, depth = PARENTS[itemtype], depth + 1
+    return depth
+
+
+def _ancestor(itemtype, levels):
+    for _ in range(levels):
+        itemtype = PARENTS[itemtype]
+    return itemtype
+
+
+def _leafCount(itemtype):
+    count = 1
+    while itemtype in CHILDREN:
+        itemtype, children = CHILDREN[itemtype]
+        count *= children
+    return count if count > 1 else 0
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import threading
+
+import pytest
+from plexapi.alert import (COALESCE, ActivityNotification, AlertListener, AlertStream, TimelineEntry,
+                           alertEvents)
+
+from . import conftest as utils
+
+
+def _message(alerttype, **entry):
+    names = {"activity": "ActivityNotification", "timeline": "TimelineEntry"}
+    return json.dumps({"NotificationContainer": {"type": alerttype, "size": 1, names[alerttype]: [entry]}})
+
+
+def test_alert_overflow():
+    listener = AlertListener(None, lambda data: None, queueSize=2)
+    for num in range(5):
+        listener._onMessage(_message("timeline", itemID=str(num), state=5))
+    assert listener.received == 5
+    assert listener.dropped == 3
+    assert [data["TimelineEntry"][0]["itemID"] for _, _, data in listener._queue] == ["3", "4"]
+
+
+def test_alert_overflow_coalesce():
+    listener = AlertListener(None, lambda data: None, queueSize=2, overflow=COALESCE)
+    listener._onMessage(_message("activity", uuid="scan", progress=1))
+    listener._onMessage(_message("timeline", itemID="1", state=1))
+    listener._onMessage(_message("activity", uuid="scan", progress=2))
+    assert listener._queue[0][2]["ActivityNotification"][0] == {"uuid": "scan", "progress": 2}
+    # nothing to coalesce with: the oldest message is dropped
+    listener._onMessage(_message("activity", uuid="refresh", progress=1))
+    assert (listener.coalesced, listener.dropped) == (1, 1)
+    assert [data["type"] for _, _, data in listener._queue] == ["timeline", "activity"]
+
+
+def test_alert_dispatch():
+    release = threading.Event()
+    received = []
+
+    def callback(data):
+        release.wait(5)
+        received.append(data)
+
+    listener = AlertListener(None, callback, workers=2, lateAfter=0)
+    listener._startWorkers()
+    for num in range(4):
+        listener._onMessage(_message("timeline", itemID=str(num), state=5))
+    release.set()
+    listener.stop()
+    for worker in listener._workers:
+        worker.join(5)
+    assert listener.dispatched == len(received) == 4
+    assert listener.late == 4
+    assert listener.pending == 0
+
+
+def test_alert_events():
+    data = json.loads(_message("timeline", itemID="12", sectionID="1", state=5, type=1))["NotificationContainer"]
+    entry, = alertEvents(data)
+    assert isinstance(entry, TimelineEntry)
+    assert (entry.itemID, entry.sectionID, entry.state, entry.type) == (12, 1, 5, 1)
+    assert repr(entry) == "<TimelineEntry:12:5>"
+    activity, = alertEvents({"type": "activity", "ActivityNotification": [{"event": "updated", "uuid": "scan",
+        "Activity": {"type": "library.update.section", "progress": 40, "Context": {"librarySectionID": "2"}}}]})
+    assert (activity.id, activity.state, activity.progress, activity.sectionID) == ("scan", "updated", 40, 2)
+    assert alertEvents({"type": "reachability"}) == []
+
+
+def test_alert_subscribe():
+    listener = AlertListener(None)
+    processed, activities = [], []
+    listener.subscribe(processed.append, [TimelineEntry], sectionID=1, state=(5, 9))
+    subscription = listener.subscribe(activities.append, ["activity"], window=60)
+    listener._onMessage(_message("timeline", itemID="1", sectionID="1", state=1))
+    listener._onMessage(_message("timeline", itemID="1", sectionID="1", state=5))
+    listener._onMessage(_message("timeline", itemID="2", sectionID="2", state=5))
+    for progress in range(10):
+        listener._onMessage(_message("activity", uuid="scan", event="updated", Activity={"progress": progress}))
+    listener._onMessage(_message("activity", uuid="refresh", event="started"))
+    # only the matching events are queued, the activities wait for their window
+    assert listener.received == 14
+    assert listener.pending == 1
+    listener._startWorkers()
+    listener.stop()
+    for worker in listener._workers:
+        worker.join(5)
+    assert [(event.itemID, event.state) for event in processed] == [(1, 5)]
+    assert isinstance(activities[0], ActivityNotification)
+    assert [(event.uuid, event.progress) for event in activities] == [("scan", 9), ("refresh", None)]
+    assert subscription.coalesced == 9
+
+
+def test_alert_reconnect(fakeplex, fakeserver):
+    pytest.importorskip("websocket")
+    alerts = []
+    listener = fakeplex.startAlertListener(alerts.append, backoff=0.05, workers=2)
+    try:
+        utils.wait_until(lambda: fakeserver.notify("timeline", {"itemID": "1", "state": 5}), delay=0.05, timeout=5)
+        utils.wait_until(lambda: len(alerts) == 1, delay=0.05, timeout=5)
+        # the listener reconnects once the server drops the websocket
+        assert fakeserver.disconnect() == 1
+        utils.wait_until(lambda: fakeserver.notify("timeline", {"itemID": "2", "state": 5}), delay=0.05, timeout=5)
+        utils.wait_until(lambda: len(alerts) == 2, delay=0.05, timeout=5)
+    finally:
+        listener.stop()
+    assert listener.reconnects >= 1
+    assert listener.received == listener.dispatched == 2
+    assert alerts[1]["TimelineEntry"] == [{"itemID": "2", "state": 5}]
+
+
+def test_alert_no_reconnect(fakeplex, fakeserver):
+    pytest.importorskip("websocket")
+    alerts = []
+    listener = fakeplex.startAlertListener(alerts.append, reconnect=False, workers=2)
+    utils.wait_until(lambda: fakeserver.notify("timeline", {"itemID": "1", "state": 5}), delay=0.05, timeout=5)
+    # the listener and its workers exit once the server drops the websocket
+    assert fakeserver.disconnect() == 1
+    listener.join(5)
+    for worker in listener._workers:
+        worker.join(5)
+    assert not listener.is_alive()
+    assert not any(worker.is_alive() for worker in listener._workers)
+    assert listener.reconnects == 0
+    assert listener.received == listener.dispatched == len(alerts) == 1
+
+
+def test_alert_stream_cancel():
+    async def consume():
+        stream = AlertStream(None, raw=True)
+        stream._queue, stream._task = asyncio.Queue(), asyncio.ensure_future(asyncio.sleep(60))
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(stream.__anext__(), 0.05)
+            # the timed out call doesn't take the next event in the background
+            stream._queue.put_nowait({"type": "timeline"})
+            await asyncio.sleep(0.01)
+            return await asyncio.wait_for(stream.__anext__(), 1)
+        finally:
+            stream._task.cancel()
+
+    assert asyncio.run(consume()) == {"type": "timeline"}
+
+
+def test_alert_stream(fakeplex, fakeserver):
+    pytest.importorskip("websockets")
+
+    async def consume():
+        async with fakeplex.alerts([TimelineEntry], state=5, backoff=0.05) as alerts:
+            entries = []
+            while not fakeserver.notify("timeline", {"itemID": "1", "state": 1}, {"itemID": "2", "state": 5}):
+                await asyncio.sleep(0.01)
+            fakeserver.notifyPlaying()
+            entries.append(await alerts.__anext__())
+            # reconnects once the server drops the websocket
+            fakeserver.disconnect()
+            while not fakeserver.notify("timeline", {"itemID": "3", "state": 5}):
+                await asyncio.sleep(0.01)
+            async for entry in alerts:
+                entries.append(entry)
+                await alerts.close()
+        return alerts, entries
+
+    alerts, entries = asyncio.run(consume())
+    assert [(entry.itemID, entry.state) for entry in entries] == [(2, 5), (3, 5)]
+    assert alerts.reconnects >= 1
+    assert alerts.received == 3
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import re
+from datetime import date
+
+import pytest
+from plexapi.server import PlexServer
+
+np = pytest.importorskip("numpy")
+BASEURL = "http://plex.analytics:32400"
+DAY = 86400
+# (viewedAt, accountID, ratingKey, librarySectionID, duration in minutes)
+PLAYS = [
+    (DAY * 10 + 3600 * 20, 1, 11, 1, 120),
+    (DAY * 10 + 3600 * 21, 2, 11, 1, 120),
+    (DAY * 10 + 3600 * 21, 1, 12, 2, 45),
+    (DAY * 11 + 3600 * 8, 1, 12, 2, 45),
+    (DAY * 12 + 3600 * 9, 3, 0, 2, 0),
+]
+
+
+def _history(request, context):
+    items = "".join(
+        '<Video ratingKey="%s" type="%s" title="Title %s" grandparentTitle="%s" viewedAt="%s" accountID="%s" '
+        'librarySectionID="%s" duration="%s"/>' % (key or "", "episode" if section == 2 else "movie", key,
+            "Show" if section == 2 else "", viewedAt, account, section, minutes * 60000)
+        for viewedAt, account, key, section, minutes in PLAYS)
+    return '<MediaContainer size="%s">%s</MediaContainer>' % (len(PLAYS), items)
+
+
+def test_analytics_watchHistory(requests_mock):
+    from plexapi.analytics import WatchHistory
+    requests_mock.get(BASEURL + "/", text='<MediaContainer machineIdentifier="analytics"/>')
+    requests_mock.get(re.compile(re.escape(BASEURL + "/status/sessions/history/all")), text=_history)
+    history = WatchHistory(PlexServer(BASEURL, "token"))
+    assert len(history) == 5
+    assert history.ratingKey.tolist() == [11, 11, 12, 12, 0]
+    assert history.plays("accountID") == {1: 3, 2: 1, 3: 1}
+    assert history.watchTime("librarySectionID") == {1: 14400.0, 2: 5400.0}
+    assert history.plays("day") == {date(1970, 1, 11): 3, date(1970, 1, 12): 1, date(1970, 1, 13): 1}
+    assert history.plays("hour") == {8: 1, 9: 1, 20: 1, 21: 2}
+    assert history.topTitles(2) == [("Title 11", 2), ("Show - Title 12", 2)]
+    assert history.topTitles(1, by="watchTime") == [("Title 11", 14400.0)]
+    # day 10: the plays run from 18:00, 19:00 and 20:15 to 20:00, 21:00 and 21:00
+    starts, counts = history.concurrency()
+    active = dict(zip((starts // 3600).tolist(), counts.tolist()))
+    assert active[DAY * 10 // 3600 + 18] == 1
+    assert active[DAY * 10 // 3600 + 19] == 2
+    assert active[DAY * 10 // 3600 + 20] == 3
+    assert active[DAY * 10 // 3600 + 22] == 0
+    assert max(counts) == 3
+
+
+def test_analytics_toColumns(requests_mock):
+    requests_mock.get(BASEURL + "/", text='<MediaContainer machineIdentifier="analytics"/>')
+    requests_mock.get(BASEURL + "/library", text="<MediaContainer/>")
+    requests_mock.get(BASEURL + "/library/sections", text='<MediaContainer><Directory key="3" type="artist" '
+        'title="Music" agent="tv.plex.agents.music" scanner="Plex Music" language="en" uuid="m"/></MediaContainer>')
+    tracks = [
+        '<Track ratingKey="%s" type="track" title="Track %s" addedAt="%s" rating="%s">'
+        '<Media id="%s" bitrate="%s" audioCodec="flac"><Part id="%s" file="/music/%s.flac" size="%s"/></Media>'
+        '%s</Track>' % (i, i, 1500000000 + i, "8.5" if i % 2 else "", i, 900 + i, i, i, 1000 * i,
+                        '<Mood tag="Calm"/><Mood tag="Warm"/>' if i == 1 else "")
+        for i in range(1, 4)]
+    pages = [tracks[:2], tracks[2:]]
+
+    def _all(request, context):
+        start = int(request.qs["x-plex-container-start"][0])
+        page = pages[start // 2] if start // 2 < len(pages) else []
+        return '<MediaContainer size="%s" totalSize="3">%s</MediaContainer>' % (len(page), "".join(page))
+
+    allkey = requests_mock.get(re.compile(re.escape(BASEURL + "/library/sections/3/all")), text=_all)
+    section = PlexServer(BASEURL, "token").library.section("Music")
+    fields = ["ratingKey", "title", "addedAt", "rating", "Media.bitrate", "Media.audioCodec", "Part.file",
+              "Part.size", "Mood.tag"]
+    columns = section.toColumns(fields, libtype="track", container_size=2)
+    assert allkey.call_count == 2
+    assert "type=10" in allkey.last_request.url
+    assert columns["ratingKey"].dtype == np.int64
+    assert columns["ratingKey"].tolist() == [1, 2, 3]
+    assert columns["title"].tolist() == ["Track 1", "Track 2", "Track 3"]
+    assert str(columns["addedAt"][0]) == "2017-07-14T02:40:01"
+    assert columns["rating"][0] == 8.5 and np.isnan(columns["rating"][1])
+    assert columns["Media.bitrate"].tolist() == [901, 902, 903]
+    assert columns["Part.file"][2] == "/music/3.flac"
+    assert columns["Part.size"].sum() == 6000
+    assert columns["Mood.tag"].tolist() == ["Calm,Warm", None, None]
+    pyarrow = pytest.importorskip("pyarrow")
+    table = section.toColumns({"title": "str", "Part.size": "int"}, libtype="track", container_size=2, arrow=True)
+    assert isinstance(table, pyarrow.Table)
+    assert table.column("Part.size").to_pylist() == [1000, 2000, 3000]
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import gzip
+import time
+
+import pytest
+import requests
+import requests_mock
+from plexapi.cassette import Cassette
+from plexapi.myplex import MyPlexAccount
+from plexapi.server import PlexServer
+
+from .payloads import ACCOUNT_XML
+
+BASEURL = "http://plex.cassette:32400"
+ROOT_XML = '<MediaContainer friendlyName="cassette" machineIdentifier="abc123" version="1.20.0"/>'
+SECTIONS_XML = (
+    '<MediaContainer size="1"><Directory key="1" type="movie" title="Movies" '
+    'agent="com.plexapp.agents.imdb" scanner="Plex Movie Scanner" language="en" '
+    'uuid="1234" updatedAt="1590000000" createdAt="1580000000"/></MediaContainer>'
+)
+
+
+def _record(path, **kwargs):
+    adapter = requests_mock.Adapter()
+    adapter.register_uri("GET", "https://plex.tv/users/account", text=ACCOUNT_XML)
+    adapter.register_uri("GET", BASEURL + "/", text=ROOT_XML)
+    adapter.register_uri("GET", BASEURL + "/library", text="<MediaContainer/>")
+    adapter.register_uri("GET", BASEURL + "/library/sections", [
+        {"text": SECTIONS_XML},
+        {"text": SECTIONS_XML.replace("Movies", "Films")},
+    ])
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    with Cassette(path, **kwargs) as cassette:
+        session = cassette.session(session)
+        account = MyPlexAccount(token="secrettoken", session=session)
+        plex = PlexServer(BASEURL, "secrettoken", session=session)
+        titles = [plex.library.sections()[0].title, plex.library.sections()[0].title]
+    return cassette, account, titles
+
+
+def test_cassette_record(tmpdir):
+    path = str(tmpdir.join("plex.json.gz"))
+    cassette, account, titles = _record(path, mode="record")
+    assert cassette.mode == "record"
+    assert account.username == "testuser"
+    assert titles == ["Movies", "Films"]
+    assert [i["url"] for i in cassette.interactions] == [
+        "https://plex.tv/users/account",
+        BASEURL + "/",
+        BASEURL + "/library",
+        BASEURL + "/library/sections",
+        BASEURL + "/library/sections",
+    ]
+    with gzip.open(path, "rt") as handle:
+        data = handle.read()
+    assert "secrettoken" not in data
+    assert "faketoken" not in data
+
+
+def test_cassette_replay(tmpdir):
+    path = str(tmpdir.join("plex.json.gz"))
+    _record(path)
+    cassette = Cassette(path, latency=0)
+    assert cassette.mode == "replay"
+    session = cassette.session()
+    account = MyPlexAccount(token="othertoken", session=session)
+    assert account.username == "testuser"
+    assert account.authenticationToken == "REDACTED"
+    plex = PlexServer(BASEURL, "othertoken", session=session)
+    assert plex.machineIdentifier == "abc123"
+    # repeated requests replay the recorded responses in order, then the last one
+    titles = [plex.library.sections()[0].title for _ in range(3)]
+    assert titles == ["Movies", "Films", "Films"]
+    with pytest.raises(requests.ConnectionError):
+        plex.query("/status/sessions")
+    assert cassette.misses == [("GET", BASEURL + "/status/sessions")]
+
+
+def test_cassette_replay_latency(tmpdir):
+    path = str(tmpdir.join("plex.json.gz"))
+    cassette, _, _ = _record(path)
+    for interaction in cassette.interactions:
+        interaction["elapsed"] = 0.05
+    cassette.save()
+    session = Cassette(path, latency=2).session()
+    start = time.time()
+    PlexServer(BASEURL, "othertoken", session=session)
+    assert time.time() - start >= 0.1
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import os
+from xml.etree import ElementTree
+
+from plexapi.downloads import COMPLETED, DownloadManager
+from plexapi.media import MediaPart
+from plexapi.server import PlexServer
+
+
+def test_downloads_DownloadManager(tmpdir, episode):
+    manager = DownloadManager(maxworkers=2, savepath=str(tmpdir))
+    jobs = manager.add(episode)
+    assert manager.run() == jobs
+    assert all(job.state == COMPLETED for job in jobs)
+    assert manager.status()["completed"] == len(jobs)
+    assert manager.downloaded == manager.total
+
+
+def test_downloads_DownloadManager_priority(tmpdir, requests_mock):
+    requests_mock.get("http://plex.local/", text='<MediaContainer machineIdentifier="abc"/>')
+    plex = PlexServer("http://plex.local", "token")
+    parts = []
+    for i in range(4):
+        elem = ElementTree.fromstring(
+            '<Part key="/library/parts/%s/file.mkv" file="/media/file%s.mkv" size="%s"/>' % (i, i, 100 * (i + 1)))
+        parts.append(MediaPart(plex, elem))
+        requests_mock.get("http://plex.local/library/parts/%s/file.mkv?download=1" % i, content=b"x" * 100 * (i + 1))
+    manager = DownloadManager(maxworkers=1, savepath=str(tmpdir), ratelimit=100000)
+    manager.add(parts[:2], priority=1)
+    urgent = manager.add(parts[2:], priority=-1)
+    # join() starts the workers when they are not running
+    jobs = manager.join()
+    assert [job.state for job in jobs] == [COMPLETED] * 4
+    assert requests_mock.request_history[1].url.endswith(urgent[0].part.key + "?download=1")
+    assert os.path.getsize(urgent[1].filepath) == 400
+    assert manager.status()["downloaded"] == manager.total == 1000
+
+
+def test_downloads_DownloadManager_restart(tmpdir, requests_mock):
+    requests_mock.get("http://plex.local/", text='<MediaContainer machineIdentifier="abc"/>')
+    plex = PlexServer("http://plex.local", "token")
+    elem = ElementTree.fromstring('<Part key="/library/parts/1/file.mkv" file="/media/file.mkv" size="1000"/>')
+    part = MediaPart(plex, elem)
+    # the connection drops after 300 bytes and the server ignores the range of the retry
+    requests_mock.get("http://plex.local/library/parts/1/file.mkv?download=1", [
+        {"content": b"x" * 300, "headers": {"Accept-Ranges": "bytes", "Content-Length": "1000"}},
+        {"content": b"x" * 1000},
+    ])
+    manager = DownloadManager(maxworkers=1, savepath=str(tmpdir))
+    jobs = manager.add(part)
+    assert [job.state for job in manager.join()] == [COMPLETED]
+    assert os.path.getsize(jobs[0].filepath) == 1000
+    assert jobs[0].downloaded == 1000
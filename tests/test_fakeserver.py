@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from plexapi.exceptions import BadRequest, NotFound, Unauthorized
+from plexapi.server import PlexServer
+
+from . import conftest as utils
+from .fakeserver import payloads
+
+
+def test_fakeserver_library(fakeplex, fakeserver_size):
+    assert fakeplex.machineIdentifier == "fakeserver0"
+    section = fakeplex.library.section("TV Shows")
+    shows = section.search(container_size=fakeserver_size // 3)
+    assert len(shows) == fakeserver_size
+    show = fakeplex.fetchItem(shows[-1].ratingKey)
+    assert show.title == shows[-1].title
+    seasons = show.seasons()
+    assert [season.index for season in seasons] == [1, 2]
+    assert len(seasons[1].episodes()) == 12
+    episodes = show.episodes()
+    assert len(episodes) == 24
+    assert episodes[-1].seasonEpisode == "s02e12"
+    assert episodes[-1].show().ratingKey == show.ratingKey
+    assert len(section.search(libtype="episode", maxresults=50)) == 50
+    assert len(fakeplex.library.section("Music").get("Artist 1").tracks()) == 20
+    with pytest.raises(NotFound):
+        fakeplex.fetchItem(payloads.ratingKey("movie", fakeserver_size))
+
+
+def test_fakeserver_paging(fakeplex, fakeserver):
+    movies = fakeplex.library.section("Movies").search(container_size=30, maxresults=75)
+    assert [movie.title for movie in movies[:2]] == ["Movie 0", "Movie 1"]
+    assert len(movies) == 75
+    assert fakeserver.requests["GET /library/sections/1/all"] == 3
+
+
+def test_fakeserver_sessions_history(fakeplex, fakeserver):
+    sessions = fakeplex.sessions()
+    assert len(sessions) == fakeserver.sessions
+    assert sessions[0].usernames == ["user2"]
+    assert sessions[0].players[0].title == "Player 1"
+    history = fakeplex.history()
+    assert len(history) == fakeserver.history
+    assert history[0].viewedAt > history[1].viewedAt
+    assert len(fakeplex.history(accountID=1)) == len(range(0, fakeserver.history, 3))
+    assert len(fakeplex.history(mindate=datetime.now() - timedelta(hours=10))) == 10
+
+
+def test_fakeserver_hubsearch(fakeplex):
+    results = fakeplex.search("7", limit=2)
+    assert [item.title for item in results] == ["Movie 7", "Movie 17", "Show 7", "Show 17",
+                                                "Artist 7", "Artist 17", "IMG_000007", "IMG_000017"]
+
+
+def test_fakeserver_errors(fakeplex, fakeserver):
+    with pytest.raises(Unauthorized):
+        PlexServer(fakeserver.url, "wrong-token")
+    fakeserver.errorRate = 1
+    with pytest.raises(BadRequest):
+        fakeplex.library.sections()
+    fakeserver.errorRate, fakeserver.latency = 0, 0.05
+    start = time.time()
+    fakeplex.library.sections()
+    assert time.time() - start >= 0.05
+
+
+def test_fakeserver_alerts(fakeplex, fakeserver):
+    pytest.importorskip("websocket")
+    alerts = []
+    listener = fakeplex.startAlertListener(alerts.append)
+    try:
+        utils.wait_until(lambda: fakeserver.notify("timeline", {"itemID": "1", "state": 5}), delay=0.05, timeout=5)
+        assert fakeserver.notifyPlaying() == 1
+        utils.wait_until(lambda: len(alerts) == 2, delay=0.05, timeout=5)
+    finally:
+        listener.stop()
+    assert alerts[0]["type"] == "timeline"
+    assert alerts[0]["TimelineEntry"] == [{"itemID": "1", "state": 5}]
+    assert len(alerts[1]["PlaySessionStateNotification"]) == fakeserver.sessions
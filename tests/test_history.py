@@ -95,3 +95,50 @@ def test_history_UserSection(account, shared_username, plex):
         account.user(shared_username).server(plex.friendlyName).section("Movies")
     )
     history = userSharedServerSection.history()
+
+
+def test_history_iterHistory(requests_mock):
+    import re
+    from urllib.parse import parse_qsl, urlsplit
+
+    from plexapi.server import PlexServer
+
+    baseurl = "http://plex.history:32400"
+    plays = [(1000, 1), (1000, 2), (2000, 3), (3000, 4), (4000, 5)]
+
+    def history(request, context):
+        params = dict(parse_qsl(urlsplit(request.url).query))
+        assert params["sort"] == "viewedAt:asc"
+        entries = [p for p in sorted(plays) if p[0] > int(params.get("viewedAt>", -1))]
+        start, size = int(params["X-Plex-Container-Start"]), int(params["X-Plex-Container-Size"])
+        items = "".join('<Video ratingKey="%s" type="movie" title="Movie" viewedAt="%s" '
+                        'historyKey="/status/sessions/history/%s"/>' % (key, viewedAt, key)
+                        for viewedAt, key in entries[start:start + size])
+        return '<MediaContainer size="%s">%s</MediaContainer>' % (len(entries[start:start + size]), items)
+
+    requests_mock.get(baseurl + "/", text='<MediaContainer machineIdentifier="hist"/>')
+    requests_mock.get(re.compile(re.escape(baseurl + "/status/sessions/history/all")), text=history)
+    plex = PlexServer(baseurl, "token")
+    plays_iter = plex.iterHistory(container_size=2)
+    assert [item.historyKey[-1] for item in plays_iter] == ["1", "2", "3", "4", "5"]
+    cursor = plays_iter.cursor
+    assert cursor == "hist=4000:5"
+    # new plays in the same second as the cursor and later are returned, nothing else
+    plays.extend([(4000, 6), (5000, 7)])
+    plays_iter = plex.iterHistory(cursor=cursor)
+    assert [item.historyKey[-1] for item in plays_iter] == ["6", "7"]
+    assert plays_iter.cursor == "hist=5000:7"
+    assert list(plex.iterHistory(cursor=plays_iter.cursor)) == []
+    # resumes after the last consumed play
+    plays_iter = plex.iterHistory()
+    next(plays_iter), next(plays_iter)
+    assert [item.historyKey[-1] for item in plex.iterHistory(plays_iter.cursor)] == ["3", "4", "5", "6", "7"]
+    with pytest.raises(BadRequest):
+        plex.iterHistory(cursor="garbage")
+
+
+def test_history_iterHistory_fakeserver(fakeplex, fakeserver):
+    plays = fakeplex.iterHistory(container_size=300)
+    viewedAt = [item.viewedAt for item in plays]
+    assert len(viewedAt) == fakeserver.history and viewedAt == sorted(viewedAt)
+    assert list(fakeplex.iterHistory(cursor=plays.cursor)) == []
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+import re
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+from plexapi.alert import AlertInvalidator
+from plexapi.exceptions import NotFound
+from plexapi.index import LibraryIndex
+from plexapi.server import PlexServer
+
+BASEURL = "http://plex.index:32400"
+SECTIONS_XML = (
+    '<MediaContainer size="1"><Directory key="1" type="movie" title="Movies" uuid="abcd" '
+    'agent="com.plexapp.agents.imdb" scanner="Plex Movie Scanner" language="en"/></MediaContainer>'
+)
+MOVIE_XML = (
+    '<Video ratingKey="{key}" key="/library/metadata/{key}" type="movie" title="{title}" year="2008" '
+    'addedAt="1500000000" updatedAt="{updatedAt}"><Media id="{key}"><Part id="{key}" file="/movies/{title}.mkv" '
+    'size="100"/></Media><Genre tag="{genre}"/><Role tag="Actor {key}"/></Video>'
+)
+
+
+class MockSection(object):
+    """ Serves /library/sections/1/all for the movies, honoring the container paging and
+        the updatedAt>> filter.
+    """
+
+    def __init__(self, requests_mock, movies):
+        self.movies = movies
+        self.requests = []
+        requests_mock.get(BASEURL + "/", text='<MediaContainer machineIdentifier="index1"/>')
+        requests_mock.get(BASEURL + "/library", text="<MediaContainer/>")
+        requests_mock.get(BASEURL + "/library/sections", text=SECTIONS_XML)
+        requests_mock.get(re.compile(re.escape(BASEURL) + r"/library/sections/1/all"), text=self.all)
+
+    def all(self, request, context):
+        params = dict(parse_qsl(urlsplit(request.url).query))
+        self.requests.append(params)
+        minUpdatedAt = int(params.get("updatedAt>>", -1))
+        movies = [(key, m) for key, m in sorted(self.movies.items()) if m["updatedAt"] > minUpdatedAt]
+        start = int(params["X-Plex-Container-Start"])
+        page = movies[start:start + int(params["X-Plex-Container-Size"])]
+        items = "".join(MOVIE_XML.format(key=key, **movie) for key, movie in page)
+        return '<MediaContainer size="%s" totalSize="%s">%s</MediaContainer>' % (len(page), len(movies), items)
+
+
+def _movie(title, updatedAt=1500000000, genre="Drama"):
+    return {"title": title, "updatedAt": updatedAt, "genre": genre}
+
+
+def test_index_sync(requests_mock):
+    section = MockSection(requests_mock, {i: _movie("Movie %s" % i, 1500000000 + i) for i in range(1, 6)})
+    plex = PlexServer(BASEURL, "token")
+    index = LibraryIndex(plex, container_size=2)
+    # initial load pages through the section
+    assert index.sync() == {"Movies": {"updated": 5, "deleted": 0}}
+    assert len(section.requests) == 3
+    assert index.count(libtype="movie") == 5
+    # nothing changed: one delta page (with the newest movie) and one count request
+    section.requests = []
+    assert index.sync("Movies") == {"Movies": {"updated": 1, "deleted": 0}}
+    assert len(section.requests) == 2
+    # update, add and delete movies
+    section.movies[2] = _movie("Movie 2 (Director's Cut)", updatedAt=1600000000, genre="Comedy")
+    section.movies[6] = _movie("Movie 6", updatedAt=1600000000)
+    del section.movies[5]
+    section.requests = []
+    assert index.sync() == {"Movies": {"updated": 2, "deleted": 1}}
+    assert [params.get("updatedAt>>") for params in section.requests[:1]] == ["1500000004"]
+    assert sorted(row["ratingKey"] for row in index.search()) == [1, 2, 3, 4, 6]
+    assert index.get(5) is None
+    assert index.get(2)["title"] == "Movie 2 (Director's Cut)"
+    assert index.tags(2, "Genre") == ["Comedy"]
+    assert index.parts(6)[0]["file"] == "/movies/Movie 6.mkv"
+
+
+def test_index_search(requests_mock):
+    MockSection(requests_mock, {1: _movie("Alpha"), 2: _movie("Beta", genre="Comedy"), 3: _movie("Alphabet")})
+    plex = PlexServer(BASEURL, "token")
+    index = LibraryIndex(plex)
+    index.sync()
+    assert [row["title"] for row in index.search(title="alpha")] == ["Alpha", "Alphabet"]
+    assert [row["title"] for row in index.search(tag="comedy")] == ["Beta"]
+    assert [row["title"] for row in index.search(tag="Actor 3", tagtype="Role")] == ["Alphabet"]
+    assert len(index.search(year=2008, limit=2)) == 2
+    movie = index.fetchItem(2)
+    assert movie.title == "Beta"
+    assert movie.genres[0].tag == "Comedy"
+    assert movie.media[0].parts[0].file == "/movies/Beta.mkv"
+    with pytest.raises(NotFound):
+        index.fetchItem(4)
+
+
+def test_index_invalidate(requests_mock):
+    section = MockSection(requests_mock, {1: _movie("Alpha"), 2: _movie("Beta"), 3: _movie("Gamma")})
+    plex = PlexServer(BASEURL, "token")
+    index = LibraryIndex(plex)
+    index.sync()
+    section.movies[2] = _movie("Beta 2", genre="Comedy")
+    metadata = requests_mock.get(BASEURL + "/library/metadata/2", text='<MediaContainer librarySectionID="1">%s'
+        '</MediaContainer>' % MOVIE_XML.format(key=2, **section.movies[2]))
+    messages = []
+    invalidator = AlertInvalidator(plex, index, callback=messages.append, delay=0)
+    invalidator({"type": "timeline", "TimelineEntry": [
+        {"identifier": "com.plexapp.plugins.library", "itemID": "2", "sectionID": "1", "state": 5},
+        {"identifier": "com.plexapp.plugins.library", "itemID": "3", "sectionID": "1", "state": 9},
+        {"identifier": "com.plexapp.plugins.library", "itemID": "4", "sectionID": "7", "state": 5},
+        {"identifier": "com.plexapp.plugins.library", "itemID": "1", "sectionID": "1", "state": 1},
+    ]})
+    invalidator({"type": "playing", "PlaySessionStateNotification": []})
+    assert len(messages) == 2
+    assert metadata.call_count == 1
+    assert index.get(2)["title"] == "Beta 2"
+    assert index.tags(2, "Genre") == ["Comedy"]
+    assert index.get(3) is None
+    assert index.get(4) is None
+    assert index.get(1)["title"] == "Alpha"
+    # entries are coalesced until the delay expires (or the invalidator stops)
+    invalidator = AlertInvalidator(plex, index, delay=60)
+    for state in (5, 9, 5):
+        invalidator({"type": "timeline", "TimelineEntry": [{"itemID": "2", "sectionID": "1", "state": state}]})
+    assert metadata.call_count == 1
+    invalidator.stop()
+    assert metadata.call_count == 2
+    assert index.get(2)["title"] == "Beta 2"
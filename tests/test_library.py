@@ -265,3 +265,31 @@ def test_crazy_search(plex, movie):
     assert len(movies.search(container_size=1)) == 4
     assert len(movies.search(container_start=9999, container_size=1)) == 0
     assert len(movies.search(container_start=2, container_size=1)) == 2
+
+
+def test_library_section_bulkEdit(movies, movie, patched_http_call):
+    assert movies.bulkAddLabel([movie], ["bulk"], chunksize=1) == []
+    assert movies.bulkRemoveLabel([movie], ["bulk"]) == []
+    assert movies.bulkEdit([movie.ratingKey], type="movie", **{"userRating": 5}) == []
+
+
+def test_library_section_bulkAddLabel_merge(requests_mock):
+    from plexapi.server import PlexServer
+    baseurl = "http://plex.bulk:32400"
+    requests_mock.get(baseurl + "/", text='<MediaContainer machineIdentifier="bulk"/>')
+    requests_mock.get(baseurl + "/library", text="<MediaContainer/>")
+    requests_mock.get(baseurl + "/library/sections", text=(
+        '<MediaContainer><Directory key="1" type="movie" title="Movies"/></MediaContainer>'))
+    requests_mock.get(baseurl + "/library/metadata/1,2,3", text=(
+        '<MediaContainer librarySectionID="1">'
+        '<Video ratingKey="1" type="movie" title="A"><Label tag="Old"/><Label tag="Kept"/></Video>'
+        '<Video ratingKey="2" type="movie" title="B"/>'
+        '<Video ratingKey="3" type="movie" title="C"><Label tag="Old"/><Label tag="Kept"/></Video>'
+        '</MediaContainer>'))
+    put = requests_mock.put(baseurl + "/library/sections/1/all", text="<MediaContainer/>")
+    movies = PlexServer(baseurl, "token").library.section("Movies")
+    assert movies.bulkAddLabel([1, 2, 3], ["New", "Kept"]) == []
+    # the existing labels are sent along with the new ones, items sharing them in one request
+    edits = sorted((request.qs["id"][0], [request.qs.get("label[%s].tag.tag" % i, [None])[0] for i in range(3)])
+                   for request in put.request_history)
+    assert edits == [("1,3", ["old", "kept", "new"]), ("2", ["new", "kept", None])]
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+from plexapi.alert import PlaySessionStateNotification
+from plexapi.monitor import SessionMonitor
+from plexapi.server import PlexServer
+
+BASEURL = "http://plex.monitor:32400"
+SESSION_XML = (
+    '<Video sessionKey="{key}" ratingKey="1{key}" type="movie" title="Movie {key}" viewOffset="{viewOffset}">'
+    '<User id="1" title="user"/><Player title="Player {key}" state="{state}" machineIdentifier="p{key}"/>'
+    '<Session id="s{key}" bandwidth="4000" location="lan"/>{transcode}</Video>'
+)
+
+
+def _sessions(*sessions):
+    items = "".join(SESSION_XML.format(**dict({"state": "playing", "viewOffset": 0, "transcode": ""}, **s))
+                    for s in sessions)
+    return {"text": '<MediaContainer size="%s">%s</MediaContainer>' % (len(sessions), items)}
+
+
+def test_monitor_poll(requests_mock):
+    requests_mock.get(BASEURL + "/", text='<MediaContainer machineIdentifier="monitor"/>')
+    requests_mock.get(BASEURL + "/status/sessions", [
+        _sessions({"key": 1}, {"key": 2}),
+        _sessions({"key": 1, "viewOffset": 5000}, {"key": 2, "state": "paused"}),
+        _sessions({"key": 1, "viewOffset": 5000, "transcode": '<TranscodeSession key="t1" videoDecision="transcode"/>'}),
+        _sessions({"key": 1, "viewOffset": 5000, "transcode": '<TranscodeSession key="t1" videoDecision="transcode"/>'}),
+    ])
+    monitor = SessionMonitor(PlexServer(BASEURL, "token"))
+    events = monitor.poll()
+    assert [(e.sessionKey, e.event) for e in events] == [("1", "started"), ("2", "started")]
+    assert events[0].changes["title"] == "Movie 1"
+    assert events[0].session["player"] == "Player 1"
+    events = monitor.poll()
+    assert [(e.sessionKey, e.event, e.changes) for e in events] == [
+        ("1", "progress", {"viewOffset": 5000}), ("2", "paused", {"state": "paused"})]
+    events = monitor.poll()
+    assert [(e.sessionKey, e.event) for e in events] == [("1", "transcode"), ("2", "stopped")]
+    assert events[0].changes == {"transcodeKey": "t1", "videoDecision": "transcode"}
+    assert monitor.poll() == []
+    assert list(monitor.sessions) == ["1"]
+
+
+def test_monitor_playing_alerts(requests_mock):
+    requests_mock.get(BASEURL + "/", text='<MediaContainer machineIdentifier="monitor"/>')
+    requests_mock.get(BASEURL + "/status/sessions", **_sessions({"key": 1}))
+    events = []
+    monitor = SessionMonitor(PlexServer(BASEURL, "token"), events.append)
+    monitor.poll()
+    monitor._onPlaying(PlaySessionStateNotification({"sessionKey": "1", "state": "paused", "viewOffset": 1000}))
+    monitor._onPlaying(PlaySessionStateNotification({"sessionKey": "1", "state": "playing", "viewOffset": 1000}))
+    assert [(e.event, e.changes) for e in events] == [
+        ("paused", {"state": "paused", "viewOffset": 1000}), ("resumed", {"state": "playing"})]
+    # unknown sessions wake the polling thread up
+    monitor._onPlaying(PlaySessionStateNotification({"sessionKey": "2", "state": "playing"}))
+    assert monitor._wakeup.is_set()
+    assert monitor.polls == 1
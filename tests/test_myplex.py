@@ -1,5 +1,10 @@
 # -*- coding: utf-8 -*-
+import time
+from xml.etree import ElementTree
+
 import pytest
+import requests
+from plexapi import myplex
 from plexapi.exceptions import BadRequest, NotFound
 
 from . import conftest as utils
@@ -46,6 +51,84 @@ def test_myplex_connect_to_resource(plex, account):
     assert resource.connect(timeout=10)
 
 
+def test_myplex_connect_race(tmpdir, monkeypatch):
+    monkeypatch.setattr(myplex, "CONNECTION_CACHE_PATH", str(tmpdir.join("connections.json")))
+
+    class _Device(object):
+        delays = {"https://local": None, "https://remote": 0.1, "http://local": 3, "http://remote": 3}
+
+        def __init__(self, baseurl, token, timeout):
+            time.sleep(self.delays[baseurl] or 0.2)
+            if self.delays[baseurl] is None:
+                raise requests.exceptions.ConnectTimeout(baseurl)
+            self._baseurl, self._token = baseurl, token
+
+    # the attempts don't run on the shared executor
+    monkeypatch.setattr(myplex.utils, "executor", None)
+    start = time.time()
+    device = myplex._raceConnections("Resource", "Server", _Device, list(_Device.delays), "token", cachekey="abc")
+    assert time.time() - start < 2
+    assert device._baseurl == "https://remote"
+    assert myplex._cachedConnection("abc", list(_Device.delays)) == "https://remote"
+    assert myplex._cachedConnection("abc", ["https://local"]) is None
+
+
+def test_myplex_connect_cached(tmpdir, monkeypatch, requests_mock):
+    monkeypatch.setattr(myplex, "CONNECTION_CACHE_PATH", str(tmpdir.join("connections.json")))
+    resource = myplex.MyPlexResource(None, ElementTree.fromstring(
+        '<Device name="Server" clientIdentifier="abc" provides="server" owned="1" accessToken="token">'
+        '<Connection uri="https://local.plex.direct:32400" address="10.0.0.1" port="32400" local="1"/>'
+        '<Connection uri="https://remote.plex.direct:32400" address="10.0.0.2" port="32400" local="0"/>'
+        '</Device>'))
+    data = '<MediaContainer machineIdentifier="abc"/>'
+    local = requests_mock.get("https://local.plex.direct:32400/", exc=requests.exceptions.ConnectTimeout)
+    remote = requests_mock.get("https://remote.plex.direct:32400/", text=data)
+    requests_mock.get("http://10.0.0.1:32400/", text=data)
+    requests_mock.get("http://10.0.0.2:32400/", text=data)
+    assert resource.connect()._baseurl == "https://remote.plex.direct:32400"
+    # The winner is remembered and tried on its own next time
+    assert resource.connect()._baseurl == "https://remote.plex.direct:32400"
+    assert (local.call_count, remote.call_count) == (1, 2)
+    assert resource.connect(ssl=False)._baseurl == "http://10.0.0.1:32400"
+
+
+def test_myplex_cache(requests_mock):
+    requests_mock.get(myplex.MyPlexAccount.key, text=(
+        '<user id="1" username="me" authenticationToken="token">'
+        '<subscription active="1"/><entitlements/></user>'))
+    account = myplex.MyPlexAccount(token="token")
+    friends = (
+        '<MediaContainer><User id="2" title="Friend" username="friend" email="friend@example.com">'
+        '<Server id="3" machineIdentifier="abc" name="Server"/></User></MediaContainer>')
+    users = requests_mock.get(myplex.MyPlexUser.key, text=friends)
+    requested = requests_mock.get(account.REQUESTED, text='<MediaContainer/>')
+    sections = requests_mock.get(account.PLEXSERVERS.format(machineId="abc"), text=(
+        '<MediaContainer><Server><Section id="10" key="1" title="Movies"/></Server></MediaContainer>'))
+    assert account.user("Friend") is account.user("FRIEND@example.com") is account.user("2")
+    assert account._getSectionIds("abc", ["movies", "1"]) == ["10", "10"]
+    assert account._getSectionIds("abc", ["10"]) == ["10"]
+    with pytest.raises(NotFound):
+        account.user("stranger")
+    assert (users.call_count, requested.call_count, sections.call_count) == (1, 1, 1)
+    account.clearCache("users")
+    assert len(account.users()) == 1
+    assert (users.call_count, sections.call_count) == (2, 1)
+    # a list loaded while the friend is being removed is not kept once the request is done
+    removed = []
+    requests_mock.get(myplex.MyPlexUser.key, text=lambda request, context: (
+        '<MediaContainer/>' if removed else friends))
+
+    def _remove(request, context):
+        account.clearCache("users")  # ex: expired while the request runs
+        account.users()
+        removed.append(True)
+        return '<MediaContainer/>'
+
+    requests_mock.delete(account.FRIENDUPDATE.format(userId=2), text=_remove)
+    account.removeFriend("friend")
+    assert account.users() == []
+
+
 def test_myplex_devices(account):
     devices = account.devices()
     for device in devices:
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import plexapi
+from plexapi.base import PlexObject
+from plexapi.server import PlexServer
+
+BASEURL = "http://plex.profile:32400"
+MOVIES_XML = (
+    '<MediaContainer size="2" librarySectionID="1">'
+    '<Video ratingKey="1" key="/library/metadata/1" type="movie" title="Movie 1">'
+    '<Media id="1"><Part id="1" file="/movie1.mkv"/></Media><Genre tag="Drama"/></Video>'
+    '<Video ratingKey="2" key="/library/metadata/2" type="movie" title="Movie 2"/>'
+    '</MediaContainer>'
+)
+MOVIE_XML = (
+    '<MediaContainer size="1" librarySectionID="1">'
+    '<Video ratingKey="2" key="/library/metadata/2" type="movie" title="Movie 2" summary="Full"/>'
+    '</MediaContainer>'
+)
+
+
+def test_profiler(requests_mock):
+    requests_mock.get(BASEURL + "/", text='<MediaContainer machineIdentifier="abc"/>')
+    requests_mock.get(BASEURL + "/library/sections/1/all", text=MOVIES_XML)
+    requests_mock.get(BASEURL + "/library/metadata/2", text=MOVIE_XML)
+    requests_mock.get(BASEURL + "/library", text="<MediaContainer/>")
+    requests_mock.get(BASEURL + "/library/sections", text=(
+        '<MediaContainer><Directory key="1" type="movie" title="Movies"/></MediaContainer>'))
+    buildItem = PlexObject._buildItem
+    with plexapi.profile(cprofile=True) as p:
+        plex = PlexServer(BASEURL, "token")
+        movies = plex.fetchItems("/library/sections/1/all")
+        assert movies[1].summary == "Full"  # implicit reload
+        movies[0].reload("/library/metadata/2")
+        plex.library.section("Movies").reload()  # overrides PlexObject.reload
+    # the wrappers are removed once the profile stops
+    assert PlexObject._buildItem is buildItem
+    assert set(p.endpoints) == {"/", "/library/sections/{id}/all", "/library/metadata/{id}", "/library",
+                                "/library/sections"}
+    section = p.endpoints["/library/sections/{id}/all"]
+    assert section.calls == 1
+    assert section.objects == 5  # 2 movies, 1 media, 1 part and 1 genre
+    assert section.network > 0 and section.parse > 0 and section.build > 0
+    assert p.endpoints["/library/metadata/{id}"].calls == 2
+    assert p.reloads["Movie"].implicit == 1
+    assert p.reloads["Movie"].explicit == 1
+    assert p.reloads["MovieSection"].explicit == 1
+    assert p.totals.calls == 7
+    assert p.stats().total_calls > 0
+    report = p.report()
+    assert "/library/sections/{id}/all" in report
+    assert "Movie" in report
@@ -142,6 +142,14 @@ def test_server_history(plex, movie):
     movie.markUnwatched()
 
 
+def test_server_markWatched(plex, show):
+    episodes = show.episodes()
+    assert plex.markWatched(episodes, maxworkers=2) == []
+    assert all(episode.reload().isWatched for episode in episodes)
+    assert plex.markUnwatched(episodes, ratelimit=20) == []
+    assert not any(episode.reload().isWatched for episode in episodes)
+
+
 def test_server_Server_query(plex):
     assert plex.query("/")
     with pytest.raises(NotFound):
@@ -287,6 +295,13 @@ def test_server_downloadDatabases(tmpdir, plex):
     assert len(tmpdir.listdir()) > 1
 
 
+def test_server_downloadLogs_stream(tmpdir, plex):
+    filepaths = plex.downloadLogs(savepath=str(tmpdir), stream=True)
+    assert len(filepaths) == len(tmpdir.listdir()) > 1
+    logs = plex.downloadLogs(inmemory=True)
+    assert all(handle.read(1) for handle in logs.values())
+
+
 def test_server_allowMediaDeletion(account):
     plex = PlexServer(utils.SERVER_BASEURL, account.authenticationToken)
     # Check server current allowMediaDeletion setting
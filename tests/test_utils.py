@@ -1,9 +1,19 @@
 # -*- coding: utf-8 -*-
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import subprocess
+import sys
 import time
+import zipfile
 
 import plexapi.utils as utils
 import pytest
-from plexapi.exceptions import NotFound
+import requests
+from plexapi.exceptions import BadRequest, IncompleteDownload, NotFound
 
 
 def test_utils_toDatetime():
@@ -13,6 +23,50 @@ def test_utils_toDatetime():
     # assert str(utils.toDatetime('0'))[:-9] in ['1970-01-01', '1969-12-31']
 
 
+# Max seconds `import plexapi.server` may take in a fresh interpreter
+IMPORT_TIME_BUDGET = 0.5
+
+
+def test_utils_import_time():
+    code = (
+        "import sys, time; start = time.perf_counter(); import plexapi.server; "
+        "print(time.perf_counter() - start); print(' '.join(sys.modules)); "
+        "import plexapi.media; from xml.etree import ElementTree; from plexapi.base import PlexObject; "
+        "obj = PlexObject.__new__(PlexObject); obj._server, obj._initpath = None, '/'; "
+        "print(type(obj._buildItem(ElementTree.fromstring('<Video type=\"movie\"/>'))).__name__)"
+    )
+    output = subprocess.check_output([sys.executable, "-c", code]).decode().split("\n")
+    elapsed, modules = float(output[0]), output[1].split()
+    assert elapsed < IMPORT_TIME_BUDGET
+    for lazy in ("tqdm", "plexapi.alert", "plexapi.client", "plexapi.library", "plexapi.video"):
+        assert lazy not in modules
+    # the first element built imports the modules registering its class
+    assert output[2] == "Movie"
+
+
+def test_utils_lazy_headers():
+    # importing the client module does not build the headers either
+    code = ("import sys, plexapi.client; print('uuid' in sys.modules); "
+            "print(plexapi.BASE_HEADERS['X-Plex-Device'])")
+    env = dict(os.environ, PLEXAPI_HEADER_DEVICE="Lazy", PLEXAPI_HEADER_IDENTIFIER="abc")
+    output = subprocess.check_output([sys.executable, "-c", code], env=env).decode().split()
+    assert output == ["False", "Lazy"]
+
+
+def test_utils_lookupPlexObject():
+    from plexapi.media import Conversion, Genre, VideoStream
+    from plexapi.video import Movie
+
+    assert utils.lookupPlexObject("Video", "movie") is Movie
+    assert utils.lookupPlexObject("Stream", "1") is VideoStream
+    assert utils.lookupPlexObject("Genre") is Genre
+    # unknown types fall back to the tag and are remembered
+    utils.PLEXDISPATCH.pop(("Video", "unknown"), None)
+    assert utils.lookupPlexObject("Video", "unknown") is Conversion
+    assert utils.PLEXDISPATCH[("Video", "unknown")] is Conversion
+    assert utils.lookupPlexObject("Unknown", "movie") is None
+
+
 def test_utils_threaded():
     def _squared(num, results, i, job_is_done_event=None):
         time.sleep(0.5)
@@ -24,6 +78,62 @@ def test_utils_threaded():
     assert (time.time() - starttime) < 1
 
 
+def test_utils_parallel():
+    def _squared(num, delay):
+        time.sleep(delay)
+        if num < 0:
+            raise ValueError(num)
+        return num * num
+
+    listargs = [[-1, 0.1], [2, 0.3], [3, 0.1], [4, 2]]
+    assert utils.parallel(_squared, listargs[:3]) == [None, 4, 9]
+    starttime = time.time()
+    assert utils.parallel(_squared, listargs, mode=utils.FIRST_COMPLETED)[2] == 9
+    assert utils.parallel(_squared, listargs, mode=utils.FIRST_COMPLETED, ordered=True)[:2] == [None, 4]
+    assert utils.parallel(_squared, listargs, timeout=0.5) == [None, 4, 9, None]
+    assert (time.time() - starttime) < 1.5
+
+
+def test_utils_parallel_nested(monkeypatch):
+    # calls made from the shared executor threads don't wait on the (busy) shared executor
+    from concurrent.futures import ThreadPoolExecutor
+    monkeypatch.setattr(utils, "_executor", ThreadPoolExecutor(1, initializer=utils._markExecutorThread))
+
+    def _outer(num):
+        return sum(utils.parallel(lambda n: n * n, [[num], [num + 1]], timeout=2))
+
+    assert utils.parallel(_outer, [[1], [2]], timeout=5) == [5, 13]
+    utils._executor.shutdown()
+
+
+def test_utils_runAll():
+    running, peak = [0], [0]
+
+    def _squared(num):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        running[0] -= 1
+        if num < 0:
+            raise ValueError(num)
+        return num * num
+
+    futures = utils.runAll(_squared, [[2], [-1], [3], [4]], maxworkers=2)
+    assert all(future.done() for future in futures)
+    assert [future.result() for future in futures if not future.exception()] == [4, 9, 16]
+    assert isinstance(futures[1].exception(), ValueError)
+    assert peak[0] <= 2
+
+
+def test_utils_RateLimiter():
+    limiter = utils.RateLimiter(20, burst=1)
+    starttime = time.time()
+    for _ in range(5):
+        limiter.wait()
+    assert 0.15 < (time.time() - starttime) < 1
+    utils.RateLimiter(None).wait(10)
+
+
 @pytest.mark.req_client
 def test_utils_downloadSessionImages():
     # TODO: Implement test_utils_downloadSessionImages()
@@ -44,6 +154,44 @@ def test_utils_joinArgs():
     assert utils.joinArgs(test_dict) == "?genre=action&type=1337"
 
 
+def test_utils_projection(requests_mock):
+    assert utils.projectionArgs() == {}
+    args = utils.projectionArgs(["title", "year", "Genre"], exclude=["Role", "summary", "key"])
+    assert args["includeFields"] == "key,ratingKey,title,type,year"
+    assert args["excludeFields"] == "summary"
+    excluded = args["excludeElements"].split(",")
+    assert "Genre" not in excluded and "Media" in excluded and "Role" in excluded
+    # servers ignoring the arguments are trimmed before building the objects
+    from plexapi.server import PlexServer
+    baseurl = "http://plex.projection:32400"
+    requests_mock.get(baseurl + "/", text='<MediaContainer machineIdentifier="abc"/>')
+    all = requests_mock.get(baseurl + "/library/sections/1/all", text=(
+        '<MediaContainer size="1"><Video ratingKey="1" key="/library/metadata/1" type="movie" title="Movie" '
+        'year="2008" summary="Long"><Media id="1"/><Genre tag="Drama"/><Role tag="Actor"/></Video></MediaContainer>'))
+    plex = PlexServer(baseurl, "token")
+    movie = plex.fetchItems("/library/sections/1/all", fields=["title", "year", "Genre"])[0]
+    assert all.last_request.qs["includefields"] == ["key,ratingkey,title,type,year"]
+    assert (movie.title, movie.year) == ("Movie", 2008)
+    assert [genre.tag for genre in movie.genres] == ["Drama"]
+    assert movie._data.attrib.get("summary") is None
+    assert movie._data.find("Media") is None and movie._data.find("Role") is None
+    movie = plex.fetchItems("/library/sections/1/all", exclude=["summary", "Role"])[0]
+    assert movie._data.find("Media") is not None and movie._data.find("Role") is None
+    assert "summary" not in movie._data.attrib
+    # only listing elements keeps every attribute, as the server does
+    assert "includeFields" not in utils.projectionArgs(["Media"])
+    movie = plex.fetchItems("/library/sections/1/all", fields=["Media"])[0]
+    assert movie._data.attrib["summary"] == "Long" and movie._data.find("Genre") is None
+    assert movie._data.find("Media") is not None
+    # filters can't look at the fields left out
+    assert plex.fetchItems("/library/sections/1/all", fields=["title"], title__startswith="Mov")
+    assert plex.fetchItems("/library/sections/1/all", fields=["Media"], media__id=1)
+    with pytest.raises(BadRequest):
+        plex.fetchItems("/library/sections/1/all", fields=["title"], year=2008)
+    with pytest.raises(BadRequest):
+        plex.fetchItems("/library/sections/1/all", exclude=["Role"], role__tag="Actor")
+
+
 def test_utils_cast():
     int_int = utils.cast(int, 1)
     int_str = utils.cast(int, "1")
@@ -78,7 +226,139 @@ def test_utils_download(plex, episode):
     )
 
 
+def _mock_ranged_download(requests_mock, data, url="http://plex.local/file", drop=None):
+    dropped = []
+
+    def _content(request, context):
+        context.headers["Accept-Ranges"] = "bytes"
+        match = re.match(r"bytes=(\d+)-(\d*)", request.headers.get("Range", ""))
+        if not match:
+            context.headers["Content-Length"] = str(len(data))
+            return data
+        start, end = int(match.group(1)), match.group(2)
+        end = int(end) if end else len(data) - 1
+        context.status_code = 206
+        if start == drop and not dropped:  # the connection drops once
+            dropped.append(start)
+            end = start + 999
+        return data[start:end + 1]
+
+    requests_mock.get(url, content=_content)
+    return url
+
+
+def test_utils_download_segments(tmpdir, requests_mock):
+    data = os.urandom(300000)
+    url = _mock_ranged_download(requests_mock, data)
+    filepath = utils.download(url, "token", filename="file.bin", savepath=str(tmpdir),
+                              chunksize=4096, segments=4)
+    assert open(filepath, "rb").read() == data
+    assert not os.path.exists(filepath + ".part")
+
+
+def test_utils_download_resume(tmpdir, requests_mock):
+    data = os.urandom(100000)
+    url = _mock_ranged_download(requests_mock, data)
+    with open(os.path.join(str(tmpdir), "file.bin.part"), "wb") as handle:
+        handle.write(data[:30000])
+    filepath = utils.download(url, "token", filename="file.bin", savepath=str(tmpdir), resume=True)
+    assert open(filepath, "rb").read() == data
+    assert requests_mock.last_request.headers["Range"] == "bytes=30000-"
+
+
+def test_utils_download_segments_resume(tmpdir, requests_mock):
+    data = os.urandom(100000)
+    url = _mock_ranged_download(requests_mock, data, drop=50000)
+    savepath = str(tmpdir)
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        utils.download(url, "token", filename="file.bin", savepath=savepath, chunksize=4096, segments=2, retries=0)
+    # the partially written segments are not left to be resumed as a complete file
+    assert os.listdir(savepath) == []
+    filepath = utils.download(url, "token", filename="file.bin", savepath=savepath, resume=True)
+    assert open(filepath, "rb").read() == data
+
+
+def test_utils_download_errors(tmpdir, requests_mock):
+    data = os.urandom(10000)
+    url = "http://plex.local/file"
+    with open(os.path.join(str(tmpdir), "file.bin.part"), "wb") as handle:
+        handle.write(data[:3000])
+    # the resumed request fails: the error page is not appended to the file
+    requests_mock.get(url, [{"content": data, "headers": {"Accept-Ranges": "bytes", "Content-Length": "10000"}},
+                            {"content": b"Server Error", "status_code": 500}])
+    with pytest.raises(IncompleteDownload):
+        utils.download(url, "token", filename="file.bin", savepath=str(tmpdir), resume=True, retries=0)
+    assert open(os.path.join(str(tmpdir), "file.bin.part"), "rb").read() == data[:3000]
+
+
+def test_utils_download_gzip(tmpdir, requests_mock):
+    data = os.urandom(1000) * 50
+    body = gzip.compress(data)
+    url = "http://plex.local/file"
+    requests_mock.get(url, content=body, headers={"Content-Encoding": "gzip", "Content-Length": str(len(body)),
+                                                  "Accept-Ranges": "bytes"})
+    with open(os.path.join(str(tmpdir), "file.bin.part"), "wb") as handle:
+        handle.write(data[:100])
+    # the encoded Content-Length is not compared and the encoded body is not resumed
+    filepath = utils.download(url, "token", filename="file.bin", savepath=str(tmpdir), resume=True,
+                              segments=4, checksum="sha1", manifest=True)
+    assert open(filepath, "rb").read() == data
+    assert not os.path.exists(filepath + ".part")
+    assert "Range" not in requests_mock.last_request.headers
+    with pytest.raises(IncompleteDownload):
+        utils.download(url, "token", filename="other.bin", savepath=str(tmpdir), size=len(data) + 1)
+
 
 def test_millisecondToHumanstr():
     res = utils.millisecondToHumanstr(1000)
     assert res == "00:00:01:0000"
+
+
+def test_utils_download_verify(tmpdir, requests_mock):
+    data = os.urandom(50000)
+    url = _mock_ranged_download(requests_mock, data)
+    savepath = str(tmpdir)
+    filepath = utils.download(url, "token", filename="file.bin", savepath=savepath,
+                              size=len(data), checksum="sha1", manifest=True)
+    with open(os.path.join(savepath, utils.MANIFEST_FILENAME)) as handle:
+        entry = json.load(handle)["file.bin"]
+    assert entry["checksum"] == hashlib.sha1(data).hexdigest()
+    # already listed in the manifest; no request is made
+    calls = requests_mock.call_count
+    assert utils.download(url, "token", filename="file.bin", savepath=savepath, manifest=True) == filepath
+    assert requests_mock.call_count == calls
+    with pytest.raises(IncompleteDownload):
+        utils.download(url, "token", filename="other.bin", savepath=savepath, size=len(data) + 1)
+
+
+class _Unseekable(io.RawIOBase):
+    """ Write-only file which makes zipfile use data descriptors like streamed archives. """
+
+    def __init__(self):
+        self.data = b""
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.data += data
+        return len(data)
+
+
+@pytest.mark.parametrize("stored", [False, True])
+def test_utils_unzipStream(tmpdir, stored):
+    entries = {"Plex Media Server.log": os.urandom(20000) * 3, "logs/other.log": b"hello" * 1000}
+    if stored:
+        entries["stored.txt"] = b"stored" * 100
+    target = _Unseekable()
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries.items():
+            ztype = zipfile.ZIP_STORED if name == "stored.txt" else zipfile.ZIP_DEFLATED
+            archive.writestr(zipfile.ZipInfo(name), data, compress_type=ztype)
+        archive.writestr("../evil.log", b"nope")
+    result = utils.unzipStream(io.BytesIO(target.data), inmemory=True, chunksize=4096)
+    assert {name: handle.read() for name, handle in result.items() if name in entries} == entries
+    filepaths = utils.unzipStream(io.BytesIO(target.data), savepath=str(tmpdir), chunksize=4096)
+    assert len(filepaths) == len(entries) + 1
+    assert all(path.startswith(str(tmpdir)) for path in filepaths)
+    assert open(os.path.join(str(tmpdir), "logs", "other.log"), "rb").read() == entries["logs/other.log"]
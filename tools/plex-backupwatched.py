@@ -40,13 +40,10 @@ def _iter_sections(plex, opts):
 
 
 def _iter_items(section):
-    if section.type == 'movie':
-        for movie in section.all():
-            yield movie
-    elif section.type == 'show':
-        for show in section.all():
-            for episode in show.episodes():
-                yield episode
+    # Search episodes directly rather than walking each show (one request per show).
+    libtype = 'episode' if section.type == 'show' else section.type
+    for item in section.search(libtype=libtype):
+        yield item
 
 
 def backup_watched(plex, opts):
@@ -59,7 +56,6 @@ def backup_watched(plex, opts):
             if not opts.watchedonly or item.isWatched:
                 ikey = _item_key(item)
                 data[skey][ikey] = item.isWatched
-                import pprint; pprint.pprint(item.__dict__); break
     print('Writing backup file to %s' % opts.filepath)
     with open(opts.filepath, 'w') as handle:
         json.dump(dict(data), handle, sort_keys=True, indent=2)
@@ -70,19 +66,23 @@ def restore_watched(plex, opts):
     with open(opts.filepath, 'r') as handle:
         source = json.load(handle)
     # Find the differences
-    differences = defaultdict(lambda: dict())
+    watched, unwatched = [], []
     for section in _iter_sections(plex, opts):
         print('Finding differences in %s..' % section.title)
         skey = section.title.lower()
         for item in _iter_items(section):
             ikey = _item_key(item)
-            sval = source.get(skey,{}).get(ikey)
+            sval = source.get(skey, {}).get(ikey)
             if sval is None:
-                raise SystemExit('%s not found' % ikey)
-            if (sval is not None and item.isWatched != sval) and (not opts.watchedonly or sval):
-                differences[skey][ikey] = {'isWatched':sval, 'item':item}
-    print('Applying %s differences to destination' % len(differences))
-    import pprint; pprint.pprint(differences)
+                print('%s not found in backup, skipping' % ikey)
+                continue
+            if item.isWatched != sval and (not opts.watchedonly or sval):
+                (watched if sval else unwatched).append(item)
+    print('Applying %s differences to destination' % (len(watched) + len(unwatched)))
+    failures = plex.markWatched(watched, maxworkers=opts.workers)
+    failures += plex.markUnwatched(unwatched, maxworkers=opts.workers)
+    for item, err in failures:
+        print('Failed to restore %s: %s' % (_item_key(item), err))
 
 
 if __name__ == '__main__':
@@ -95,6 +95,7 @@ if __name__ == '__main__':
     parser.add_argument('-s', '--servername', help='Plex server name')
     parser.add_argument('-w', '--watchedonly', default=False, action='store_true', help='Only backup or restore watched items.')
     parser.add_argument('-l', '--libraries', help='Only backup or restore the specified libraries (comma seperated).')
+    parser.add_argument('-t', '--workers', default=8, type=int, help='Number of concurrent requests when restoring.')
     opts = parser.parse_args()
     account = utils.getMyPlexAccount(opts)
     plex = _find_server(account, opts.servername)